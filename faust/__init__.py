@@ -120,12 +120,22 @@ if typing.TYPE_CHECKING:  # pragma: no cover
     from .models import Model, ModelOptions, Record             # noqa: E402
     from .sensors import Monitor, Sensor                        # noqa: E402
     from .serializers import Codec                              # noqa: E402
+    from .sketches import CountMinSketch, HyperLogLog, TopK      # noqa: E402
     from .streams import Stream, StreamT, current_event         # noqa: E402
+    from .tables.globaltable import GlobalTable                 # noqa: E402
+    from .tables.numeric import NumericTable                   # noqa: E402
+    from .tables.objects import (                               # noqa: E402
+        CounterTable,
+        ListTable,
+        SetTable,
+    )
+    from .tables.sketches import SketchTable                    # noqa: E402
     from .tables.table import Table                             # noqa: E402
     from .topics import Topic, TopicT                           # noqa: E402
     from .types.settings import Settings                        # noqa: E402
     from .windows import (                                      # noqa: E402
         HoppingWindow,
+        PanedWindow,
         TumblingWindow,
         SlidingWindow,
         Window,
@@ -150,14 +160,24 @@ __all__ = [
     'Codec',
     'Service',
     'ServiceT',
+    'CountMinSketch',
+    'HyperLogLog',
+    'TopK',
     'Stream',
     'StreamT',
     'current_event',
+    'GlobalTable',
+    'SetTable',
+    'ListTable',
+    'CounterTable',
+    'NumericTable',
+    'SketchTable',
     'Table',
     'Topic',
     'TopicT',
     'Settings',
     'HoppingWindow',
+    'PanedWindow',
     'TumblingWindow',
     'SlidingWindow',
     'Window',
@@ -177,16 +197,22 @@ all_by_module: Mapping[str, Sequence[str]] = {
     'faust.models': ['ModelOptions', 'Record'],
     'faust.sensors': ['Monitor', 'Sensor'],
     'faust.serializers': ['Codec'],
+    'faust.sketches': ['CountMinSketch', 'HyperLogLog', 'TopK'],
     'faust.streams': [
         'Stream',
         'StreamT',
         'current_event',
     ],
+    'faust.tables.globaltable': ['GlobalTable'],
+    'faust.tables.numeric': ['NumericTable'],
+    'faust.tables.objects': ['SetTable', 'ListTable', 'CounterTable'],
+    'faust.tables.sketches': ['SketchTable'],
     'faust.tables.table': ['Table'],
     'faust.topics': ['Topic', 'TopicT'],
     'faust.types.settings': ['Settings'],
     'faust.windows': [
         'HoppingWindow',
+        'PanedWindow',
         'TumblingWindow',
         'SlidingWindow',
         'Window',
@@ -202,6 +202,8 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
 
     _on_revoked_timeout = None
 
+    _rebalance_revoked: Set[TP]
+
     def __init__(self,
                  id: str,
                  *,
@@ -239,6 +241,10 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
         # Any additional services added using the @app.service decorator.
         self._extra_services = []
 
+        # The assignment before a cooperative rebalance started,
+        # see _on_partitions_revoked_cooperative.
+        self._rebalance_revoked = set()
+
         # The configuration source object/module passed to ``config_by_object``
         # for introspectio purposes.
         self._config_source = config_source
@@ -682,6 +688,122 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
                 **kwargs))
         return table.using_window(window) if window else table
 
+    def GlobalTable(self,
+                    name: str,
+                    *,
+                    default: Callable[[], Any] = None,
+                    window: WindowT = None,
+                    partitions: int = None,
+                    help: str = None,
+                    **kwargs: Any) -> TableT:
+        """Define new global table.
+
+        Like :meth:`Table`, but every worker reads all partitions
+        of the table, so lookups never need to go to another worker.
+        The table is recovered before the worker starts processing events.
+
+        Examples:
+            >>> rates = app.GlobalTable('currency_rates', default=float)
+        """
+        GlobalTable = (self.conf.GlobalTable if self.finalized
+                       else symbol_by_name('faust:GlobalTable'))
+        table = self.tables.add(
+            GlobalTable(
+                self,
+                name=name,
+                default=default,
+                beacon=self.beacon,
+                partitions=partitions,
+                help=help,
+                **kwargs))
+        return table.using_window(window) if window else table
+
+    def SetTable(self, name: str, *,
+                 partitions: int = None,
+                 help: str = None,
+                 **kwargs: Any) -> TableT:
+        """Define new table of sets.
+
+        Only the members added/discarded are sent to the changelog.
+
+        Examples:
+            >>> subscribers = app.SetTable('subscribers')
+            >>> subscribers['topic'].add('account')
+        """
+        return self._new_table(
+            'SetTable', name, partitions=partitions, help=help, **kwargs)
+
+    def ListTable(self, name: str, *,
+                  partitions: int = None,
+                  help: str = None,
+                  **kwargs: Any) -> TableT:
+        """Define new table of lists.
+
+        Only the items appended are sent to the changelog.
+        """
+        return self._new_table(
+            'ListTable', name, partitions=partitions, help=help, **kwargs)
+
+    def CounterTable(self, name: str, *,
+                     partitions: int = None,
+                     help: str = None,
+                     **kwargs: Any) -> TableT:
+        """Define new table of counters.
+
+        Only the increments are sent to the changelog.
+
+        Examples:
+            >>> page_views = app.CounterTable('page_views_by_country')
+            >>> page_views['/about'].incr('NO')
+        """
+        return self._new_table(
+            'CounterTable', name, partitions=partitions, help=help, **kwargs)
+
+    def NumericTable(self, name: str, *,
+                     value_type: Type = int,
+                     partitions: int = None,
+                     help: str = None,
+                     **kwargs: Any) -> TableT:
+        """Define new table of numbers, stored in typed arrays.
+
+        ``value_type`` is :class:`int` or :class:`float`,
+        and missing keys have the value zero.
+
+        Examples:
+            >>> word_counts = app.NumericTable('word_counts')
+            >>> word_counts.increment_many(['the', 'fox', 'the'])
+        """
+        return self._new_table(
+            'NumericTable', name,
+            value_type=value_type, partitions=partitions, help=help,
+            **kwargs)
+
+    def SketchTable(self, name: str, *,
+                    sketch: Any,
+                    partitions: int = None,
+                    help: str = None,
+                    **kwargs: Any) -> TableT:
+        """Define new table of sketches (see :mod:`faust.sketches`).
+
+        ``sketch`` is the sketch for missing keys, or a sketch type.
+
+        Examples:
+            >>> visitors = app.SketchTable('visitors', sketch=HyperLogLog)
+            >>> visitors['/about'] += 'user@example.com'
+            >>> visitors['/about'].count()
+            1
+        """
+        return self._new_table(
+            'SketchTable', name,
+            sketch=sketch, partitions=partitions, help=help, **kwargs)
+
+    def _new_table(self, setting: str, name: str,
+                   **kwargs: Any) -> TableT:
+        Table = (getattr(self.conf, setting) if self.finalized
+                 else symbol_by_name(f'faust:{setting}'))
+        return self.tables.add(
+            Table(self, name=name, beacon=self.beacon, **kwargs))
+
     def page(self, path: str, *,
              base: Type[View] = View) -> Callable[[PageArg], Type[Site]]:
         def _decorator(fun: PageArg) -> Type[Site]:
@@ -812,6 +934,8 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
         """
         if self.should_stop:
             return self._on_rebalance_when_stopped()
+        if self.conf.broker_cooperative_rebalance:
+            return await self._on_partitions_revoked_cooperative(revoked)
         session_timeout = self.conf.broker_session_timeout
         with flight_recorder(self.log, timeout=session_timeout) as on_timeout:
             self._on_revoked_timeout = on_timeout
@@ -819,8 +943,6 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
                 self.log.dev('ON PARTITIONS REVOKED')
                 on_timeout.info('fetcher.stop()')
                 await self._stop_fetcher()
-                on_timeout.info('tables.stop_standbys()')
-                await self.tables._stop_standbys()
                 assignment = self.consumer.assignment()
                 if assignment:
                     on_timeout.info('flow_control.suspend()')
@@ -860,6 +982,80 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
             finally:
                 self._on_revoked_timeout = None
 
+    async def _on_partitions_revoked_cooperative(
+            self, revoked: Set[TP]) -> None:
+        # The consumer always revokes every partition, we do not know
+        # which partitions move until the new assignment arrives
+        # (see _on_partitions_assigned_cooperative).  Meanwhile agents
+        # keep processing the messages already fetched.
+        # The fetcher is stopped for all partitions, as table recovery
+        # uses it to read the changelogs: fetching for partitions we
+        # keep resumes after the partitions assigned are recovered.
+        session_timeout = self.conf.broker_session_timeout
+        with flight_recorder(self.log, timeout=session_timeout) as on_timeout:
+            try:
+                self.log.dev('ON PARTITIONS REVOKED (COOPERATIVE)')
+                self._rebalance_revoked = set(revoked)
+                on_timeout.info('fetcher.stop()')
+                await self._stop_fetcher()
+                if self.consumer.assignment():
+                    on_timeout.info('consumer.commit()')
+                    await self.consumer.commit()
+            except Exception as exc:
+                on_timeout.info('on partitions revoked crashed: %r', exc)
+                await self.crash(exc)
+
+    async def _on_partitions_assigned_cooperative(
+            self, assigned: Set[TP]) -> None:
+        previous, self._rebalance_revoked = self._rebalance_revoked, set()
+        revoked = previous - assigned
+        new = assigned - previous
+        session_timeout = self.conf.broker_session_timeout
+        with flight_recorder(self.log, timeout=session_timeout) as on_timeout:
+            self._on_revoked_timeout = on_timeout
+            try:
+                if revoked:
+                    # make sure nothing is processed for the revoked
+                    # partitions once we hand them over.
+                    on_timeout.info('consumer.wait_empty()')
+                    await self.consumer.wait_empty()
+                    on_timeout.info('agents.on_partitions_revoked()')
+                    await self.agents.on_partitions_revoked(revoked)
+                    on_timeout.info('topics.on_partitions_revoked()')
+                    await self.topics.on_partitions_revoked(revoked)
+                # also suspends standbys and stops ongoing recovery.
+                on_timeout.info('tables.on_partitions_revoked()')
+                await self.tables.on_partitions_revoked(revoked)
+                if revoked:
+                    on_timeout.info('+send signal: on_partitions_revoked')
+                    await self.on_partitions_revoked.send(revoked)
+                    on_timeout.info('-send signal: on_partitions_revoked')
+                on_timeout.info('agents.on_partitions_assigned()')
+                await self.agents.on_partitions_assigned(new)
+                on_timeout.info('topics.wait_for_subscriptions()')
+                await self.topics.wait_for_subscriptions()
+                on_timeout.info('consumer.pause_partitions()')
+                await self.consumer.pause_partitions(new)
+                on_timeout.info('topics.on_partitions_assigned()')
+                await self.topics.on_partitions_assigned(assigned)
+                on_timeout.info('tables.on_partitions_assigned()')
+                await self.tables.on_partitions_assigned(new)
+                on_timeout.info('+send signal: on_partitions_assigned')
+                await self.on_partitions_assigned.send(new)
+                on_timeout.info('-send signal: on_partitions_assigned')
+                changelog_topics = self.tables.changelog_topics
+                if any(tp.topic not in changelog_topics for tp in revoked):
+                    # The leader does not hand over partitions in the
+                    # same rebalance: rejoin so that the new owner
+                    # gets the partitions we just gave up.
+                    on_timeout.info('consumer.request_rebalance()')
+                    self.consumer.request_rebalance()
+            except Exception as exc:
+                on_timeout.info('on partitions assigned crashed: %r', exc)
+                await self.crash(exc)
+            finally:
+                self._on_revoked_timeout = None
+
     async def _stop_fetcher(self) -> None:
         await self._fetcher.stop()
         # Reset fetcher service state so that we can restart it
@@ -880,8 +1076,10 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
         """
         if self.should_stop:
             return self._on_rebalance_when_stopped()
-        session_timeout = self.conf.broker_session_timeout
         self.unassigned = not assigned
+        if self.conf.broker_cooperative_rebalance:
+            return await self._on_partitions_assigned_cooperative(assigned)
+        session_timeout = self.conf.broker_session_timeout
         with flight_recorder(self.log, timeout=session_timeout) as on_timeout:
             try:
                 on_timeout.info('fetcher.stop()')
@@ -1125,7 +1323,13 @@ class App(AppT, ServiceProxy, ServiceCallbacks):
         Responsible for partition assignment.
         """
         return self.conf.PartitionAssignor(
-            self, replicas=self.conf.table_standby_replicas)
+            self,
+            replicas=self.conf.table_standby_replicas,
+            max_migrations=self.conf.table_max_migrations,
+            max_warmups=self.conf.table_max_warmup_replicas,
+            acceptable_recovery_lag=self.conf.table_acceptable_recovery_lag,
+            cooperative=self.conf.broker_cooperative_rebalance,
+        )
 
     @cached_property
     def _leader_assignor(self) -> LeaderAssignorT:
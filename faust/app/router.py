@@ -6,7 +6,7 @@ from faust.types.app import AppT
 from faust.types.assignor import PartitionAssignorT
 from faust.types.core import K
 from faust.types.router import HostToPartitionMap, RouterT
-from faust.types.tables import CollectionT
+from faust.types.tables import CollectionT, GlobalTableT
 from faust.types.web import Request, Response, Web
 
 
@@ -21,6 +21,9 @@ class Router(RouterT):
 
     def key_store(self, table_name: str, key: K) -> URL:
         table = self._get_table(table_name)
+        if isinstance(table, GlobalTableT):
+            # every worker has all keys of global tables.
+            return URL(self.app.conf.canonical_url)
         topic = self._get_table_topic(table)
         k = self._get_serialized_key(table, key)
         return self._assignor.key_store(topic, k)
@@ -1,13 +1,14 @@
 """Client Assignment."""
 import copy
-from typing import List, MutableMapping, Sequence, Set, Tuple
+from typing import List, MutableMapping, Sequence, Set, Tuple, cast
 from faust.models import Record
 from faust.types import TP
-from faust.types.assignor import HostToPartitionMap
+from faust.types.assignor import HostToPartitionMap, TopicToOffsetMap
 from faust.types.tables import TableManagerT
 
 R_COPART_ASSIGNMENT = """
-<{name} actives={self.actives} standbys={self.standbys} topics={self.topics}>
+<{name} actives={self.actives} standbys={self.standbys} \
+warmups={self.warmups} topics={self.topics}>
 """.strip()
 
 
@@ -16,14 +17,17 @@ class CopartitionedAssignment:
 
     actives: Set[int]
     standbys: Set[int]
+    warmups: Set[int]  # Standbys to take over the active partition from.
     topics: Set[str]
 
     def __init__(self,
                  actives: Set[int] = None,
                  standbys: Set[int] = None,
-                 topics: Set[str] = None) -> None:
+                 topics: Set[str] = None,
+                 warmups: Set[int] = None) -> None:
         self.actives = actives or set()
         self.standbys = standbys or set()
+        self.warmups = warmups or set()
         self.topics = topics or set()
 
     def validate(self) -> None:
@@ -48,8 +52,11 @@ class CopartitionedAssignment:
     def assign_partition(self, partition: int, active: bool) -> None:
         self.get_assigned_partitions(active).add(partition)
 
-    def unassign_extras(self, capacity: int, replicas: int) -> None:
-        while len(self.actives) > capacity:
+    def unassign_extras(self, capacity: int, replicas: int,
+                        active_capacity: int = None) -> None:
+        if active_capacity is None:
+            active_capacity = capacity
+        while len(self.actives) > active_capacity:
             self.actives.pop()
         while len(self.standbys) > capacity * replicas:
             self.standbys.pop()
@@ -57,6 +64,11 @@ class CopartitionedAssignment:
     def partition_assigned(self, partition: int, active: bool) -> bool:
         return partition in self.get_assigned_partitions(active)
 
+    def assign_warmup(self, partition: int) -> None:
+        assert partition not in self.actives, 'Already active for partition'
+        self.standbys.add(partition)
+        self.warmups.add(partition)
+
     def promote_standby_to_active(self, standby_partition: int) -> None:
         assert standby_partition in self.standbys, 'Not standby for partition'
         self.standbys.remove(standby_partition)
@@ -86,6 +98,14 @@ class ClientAssignment(Record,
     actives: MutableMapping[str, List[int]]  # Topic -> Partition
     standbys: MutableMapping[str, List[int]]  # Topic -> Partition
 
+    # Subset of standbys that are warm-up replicas, never set to None.
+    warmups: MutableMapping[str, List[int]] = cast(
+        MutableMapping[str, List[int]], None)
+
+    def __post_init__(self) -> None:
+        if self.warmups is None:
+            self.warmups = {}
+
     @property
     def active_tps(self) -> Set[TP]:
         return self._get_tps(active=True)
@@ -94,6 +114,14 @@ class ClientAssignment(Record,
     def standby_tps(self) -> Set[TP]:
         return self._get_tps(active=False)
 
+    @property
+    def warmup_tps(self) -> Set[TP]:
+        return {
+            TP(topic=topic, partition=partition)
+            for topic, partitions in self.warmups.items()
+            for partition in partitions
+        }
+
     def _get_tps(self, active: bool) -> Set[TP]:
         assignment = self.actives if active else self.standbys
         return {
@@ -121,6 +149,8 @@ class ClientAssignment(Record,
         for topic in assignment.topics:
             self.actives[topic] = list(assignment.actives)
             self.standbys[topic] = list(assignment.standbys)
+            if assignment.warmups:
+                self.warmups[topic] = list(assignment.warmups)
 
     def copartitioned_assignment(
             self, topics: Set[str]) -> CopartitionedAssignment:
@@ -152,3 +182,14 @@ class ClientMetadata(Record,
     assignment: ClientAssignment
     url: str
     changelog_distribution: HostToPartitionMap
+
+    # Local changelog offsets, optional as only sent by members joining
+    # the group (see PartitionAssignor.metadata), never set to None.
+    changelog_offsets: TopicToOffsetMap = cast(TopicToOffsetMap, None)
+
+    def __post_init__(self) -> None:
+        if self.changelog_offsets is None:
+            self.changelog_offsets = {}
+
+    def changelog_offset(self, topic: str, partition: int) -> int:
+        return self.changelog_offsets.get(topic, {}).get(str(partition), -1)
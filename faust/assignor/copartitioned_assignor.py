@@ -1,12 +1,24 @@
 """Copartitioned Assignor."""
 from itertools import cycle
 from math import ceil
-from typing import Iterable, Iterator, MutableMapping, Optional, Sequence, Set
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 from mode.utils.compat import Counter
 from .client_assignment import CopartitionedAssignment
 
 __all__ = ['CopartitionedAssignor']
 
+Candidate = Tuple[str, CopartitionedAssignment]
+
 
 class CopartitionedAssignor:
     """Copartitioned Assignor.
@@ -16,7 +28,13 @@ class CopartitionedAssignor:
     The assignment is sticky which uses the following heuristics:
 
     - Maintain existing assignments as long as within capacity for each client
-    - Assign actives to standbys when possible (within capacity)
+    - Assign actives to the standby with the most recent changelog offset,
+      or to a client having local state for the partition (within capacity)
+    - Move at most ``max_migrations`` actives from live clients, picking
+      partitions that are cheapest to recover elsewhere
+    - Only move actives to clients that are caught up (less than
+      ``acceptable_recovery_lag`` behind), otherwise keep the partition
+      where it is and assign a warm-up replica to take it over later
     - Assign in order to fill capacity of the clients
 
     We optimize for not over utilizing resources instead of under-utilizing
@@ -32,16 +50,25 @@ class CopartitionedAssignor:
     num_partitions: int
     replicas: int
     topics: Set[str]
+    max_migrations: Optional[int]
+    max_warmups: int
+    acceptable_recovery_lag: int
 
     _num_clients: int
     _client_assignments: MutableMapping[str, CopartitionedAssignment]
+    _offsets: Mapping[str, Mapping[int, int]]
+    _pending_warmups: List[Tuple[str, int]]
 
     def __init__(self,
                  topics: Iterable[str],
                  cluster_asgn: MutableMapping[str, CopartitionedAssignment],
                  num_partitions: int,
                  replicas: int,
-                 capacity: int = None) -> None:
+                 capacity: int = None,
+                 offsets: Mapping[str, Mapping[int, int]] = None,
+                 max_migrations: int = None,
+                 max_warmups: int = 0,
+                 acceptable_recovery_lag: int = 0) -> None:
         self._num_clients = len(cluster_asgn)
         assert self._num_clients, "Should assign to at least 1 client"
         self.num_partitions = num_partitions
@@ -56,14 +83,98 @@ class CopartitionedAssignor:
             'Not enough capacity'
 
         self._client_assignments = cluster_asgn
+        self._offsets = offsets or {}
+        self.max_migrations = max_migrations
+        self.max_warmups = max_warmups
+        self.acceptable_recovery_lag = acceptable_recovery_lag
+        self._pending_warmups = []
 
     def get_assignment(self) -> MutableMapping[str, CopartitionedAssignment]:
-        for copartitioned in self._client_assignments.values():
-            copartitioned.unassign_extras(self.capacity, self.replicas)
+        self._unassign_extras()
         self._assign(active=True)
         self._assign(active=False)
+        self._assign_warmups()
         return self._client_assignments
 
+    def _unassign_extras(self) -> None:
+        budget = self.max_migrations
+        for client, copartitioned in self._client_assignments.items():
+            # Give up the partitions that are cheapest to recover elsewhere
+            # first, and keep the rest (over capacity) if we are out of
+            # migration budget.
+            extras = copartitioned.num_assigned(active=True) - self.capacity
+            if budget is not None:
+                extras = min(extras, budget)
+            if extras > 0:
+                cheapest = sorted(
+                    copartitioned.actives,
+                    key=lambda p: self._migration_cost(client, p),
+                )
+                moved, stuck = 0, []
+                for partition in cheapest:
+                    if moved >= extras:
+                        break
+                    if self._needs_warmup(client, partition):
+                        stuck.append((client, partition))
+                        continue
+                    copartitioned.unassign_partition(partition, active=True)
+                    moved += 1
+                self._pending_warmups.extend(stuck[:extras - moved])
+                if budget is not None:
+                    budget -= moved
+            copartitioned.unassign_extras(
+                self.capacity, self.replicas,
+                active_capacity=max(
+                    self.capacity, copartitioned.num_assigned(active=True)),
+            )
+
+    def _needs_warmup(self, client: str, partition: int) -> bool:
+        # An active can move right away if some client that has room for
+        # it is caught up, otherwise it stays and we warm up a replica.
+        if not self.max_warmups:
+            return False
+        position = self._position(client, partition)
+        if position < 0:
+            return False  # no state, nothing to recover.
+        return not any(
+            self._position(other, partition) >= (
+                position - self.acceptable_recovery_lag)
+            for other, assignment in self._client_assignments.items()
+            if other != client and
+            not self._client_exhausted(assignment, active=True)
+        )
+
+    def _assign_warmups(self) -> None:
+        for owner, partition in self._pending_warmups[:self.max_warmups]:
+            candidates = [
+                (other, assignment)
+                for other, assignment in self._client_assignments.items()
+                if other != owner and
+                not assignment.partition_assigned(partition, active=True) and
+                partition not in assignment.warmups and
+                (assignment.num_assigned(active=True) +
+                 len(assignment.warmups)) < self.capacity
+            ]
+            if candidates:
+                # the most caught up client, of those the least loaded.
+                _, target = max(candidates, key=lambda c: (
+                    self._position(c[0], partition),
+                    -c[1].num_assigned(active=True),
+                ))
+                target.assign_warmup(partition)
+
+    def _position(self, client: str, partition: int) -> int:
+        # Changelog offset the client has state for, -1 for no state.
+        return self._offsets.get(client, {}).get(partition, -1)
+
+    def _migration_cost(self, client: str, partition: int) -> int:
+        # How far behind the most caught up other client is.
+        return self._position(client, partition) - max(
+            (self._position(other, partition)
+             for other in self._client_assignments if other != client),
+            default=-1,
+        )
+
     def _all_assigned(self, active: bool) -> bool:
         assigned_counts = self._assigned_partition_counts(active)
         total_assigns = self._total_assigns_per_partition(active)
@@ -128,30 +239,41 @@ class CopartitionedAssignor:
                           active: bool, client_limit: int=None) -> bool:
         if client_limit is None:
             client_limit = self._get_client_limit(active)
-        return assignemnt.num_assigned(active) == client_limit
+        # clients can be over capacity when out of migration budget.
+        return assignemnt.num_assigned(active) >= client_limit
 
     def _find_promotable_standby(self, partition: int,
-                                 candidates: Iterator[CopartitionedAssignment],
+                                 candidates: Iterator[Candidate],
                                  ) -> Optional[CopartitionedAssignment]:
-        # Round robin to find standby until we make a full cycle
+        # Make a full round robin cycle to find the client that is most
+        # caught up for the partition: a standby, or a client that still
+        # has local state from a previous assignment.
+        # Ties go to the first one found, and standbys always win over
+        # clients we know nothing about.
+        best: Optional[CopartitionedAssignment] = None
+        best_position = -1
         for _ in range(self._num_clients):
-            assignment = next(candidates)
+            client, assignment = next(candidates)
+            position = self._position(client, partition)
+            has_state = (
+                position >= 0 or
+                assignment.partition_assigned(partition, active=False)
+            )
             can_assign = (
-                assignment.partition_assigned(partition, active=False) and
+                has_state and
                 self._can_assign(assignment, partition, active=True)
             )
-            if can_assign:
-                return assignment
-        return None
+            if can_assign and (best is None or position > best_position):
+                best, best_position = assignment, position
+        return best
 
     def _find_round_robin_assignable(self, partition: int,
-                                     candidates: Iterator[
-                                         CopartitionedAssignment],
+                                     candidates: Iterator[Candidate],
                                      active: bool,
                                      ) -> Optional[CopartitionedAssignment]:
         # Round robin and assign until we make a full circle
         for _ in range(self._num_clients):
-            assignment = next(candidates)
+            _, assignment = next(candidates)
             if self._can_assign(assignment, partition, active):
                 return assignment
         return None
@@ -169,7 +291,7 @@ class CopartitionedAssignor:
         # filled assignment such that the partition can be assigned to it
         # - This guarantees eventual assignment of all partitions
         client_limit = self._get_client_limit(active)
-        candidates = cycle(self._client_assignments.values())
+        candidates = cycle(self._client_assignments.items())
         unassigned = list(unassigned)
         while unassigned:
             partition = unassigned.pop(0)
@@ -180,7 +302,8 @@ class CopartitionedAssignor:
                 # For actives we first try to find a standby to assign to
                 assign_to = self._find_promotable_standby(partition,
                                                           candidates)
-                if assign_to is not None:
+                if (assign_to is not None and
+                        assign_to.partition_assigned(partition, active=False)):
                     # Unassign standby which will be promoted
                     assign_to.unassign_partition(partition, active=False)
             else:
@@ -1,6 +1,15 @@
 """Partition assignor."""
 from collections import defaultdict
-from typing import Iterable, List, MutableMapping, Sequence, Set, cast
+from typing import (
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Sequence,
+    Set,
+    Tuple,
+    cast,
+)
 
 from rhkafka.cluster import ClusterMetadata
 from rhkafka.coordinator.assignors.abstract import AbstractPartitionAssignor
@@ -15,6 +24,7 @@ from faust.types.app import AppT
 from faust.types.assignor import (
     HostToPartitionMap,
     PartitionAssignorT,
+    TopicToOffsetMap,
     TopicToPartitionMap,
 )
 from faust.types.tables import TableManagerT
@@ -64,13 +74,21 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):
     _standby_tps: Set[TP]
     _tps_url: MutableMapping[TP, str]
 
-    def __init__(self, app: AppT, replicas: int = 0) -> None:
+    def __init__(self, app: AppT, replicas: int = 0,
+                 max_migrations: int = None,
+                 max_warmups: int = 0,
+                 acceptable_recovery_lag: int = 0,
+                 cooperative: bool = False) -> None:
         AbstractPartitionAssignor.__init__(self)
         self.app = app
         self._table_manager = self.app.tables
         self._assignment = ClientAssignment(actives={}, standbys={})
         self._changelog_distribution = {}
         self.replicas = replicas
+        self.max_migrations = max_migrations
+        self.max_warmups = max_warmups
+        self.acceptable_recovery_lag = acceptable_recovery_lag
+        self.cooperative = cooperative
         self._member_urls = {}
         self._tps_url = {}
         self._active_tps = set()
@@ -95,8 +113,16 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):
             assignment=self._assignment,
             url=str(self._url),
             changelog_distribution=self.changelog_distribution,
+            changelog_offsets=self._changelog_offsets(),
         )
 
+    def _changelog_offsets(self) -> TopicToOffsetMap:
+        offsets: TopicToOffsetMap = defaultdict(dict)
+        for tp, offset in self._table_manager.changelog_offsets.items():
+            if offset >= 0:
+                offsets[tp.topic][str(tp.partition)] = offset
+        return offsets
+
     @property
     def _url(self) -> URL:
         return self.app.conf.canonical_url
@@ -210,16 +236,118 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):
                     cluster_asgn=assgn,
                     num_partitions=num_partitions,
                     replicas=self.replicas,
+                    offsets=self._copartitioned_offsets(
+                        topics, num_partitions, clients_metadata),
+                    max_migrations=self.max_migrations,
+                    max_warmups=self.max_warmups,
+                    acceptable_recovery_lag=self.acceptable_recovery_lag,
                 )
                 # Update client assignments for copartitioned group
                 for client, copart_assn in assignor.get_assignment().items():
                     assignments[client].add_copartitioned_assignment(
                         copart_assn)
 
+        if self.cooperative:
+            self._withhold_moved_actives(assignments, clients_metadata)
+
+        self._global_table_standbys(
+            assignments, self._table_manager.global_changelog_topics, cluster)
+
+        warmups = {
+            member_id: assignment.warmups
+            for member_id, assignment in assignments.items()
+            if assignment.warmups
+        }
+        if warmups:
+            logger.info('Assigned warm-up replicas: %r', warmups)
         changelog_distribution = self._get_changelog_distribution(assignments)
         res = self._protocol_assignments(assignments, changelog_distribution)
         return res
 
+    @classmethod
+    def _copartitioned_offsets(
+            cls, topics: Set[str],
+            num_partitions: int,
+            clients_metadata: ClientMetadataMapping,
+    ) -> MutableMapping[str, Mapping[int, int]]:
+        # How far the local state of each client is for the partitions
+        # of the group (partitions it has no state for are left out).
+        #
+        # Changelog topics of the group have unrelated offsets, so the
+        # lag of every topic is taken from the highest offset any client
+        # has for it (the closest we know to the highwater).  The tables
+        # are recovered in parallel, so the client is as far behind as
+        # its largest lag, returned as the position ``ceiling - lag``.
+        highest: MutableMapping[Tuple[str, int], int] = {}
+        for metadata in clients_metadata.values():
+            for topic in topics & metadata.changelog_offsets.keys():
+                for partition in range(num_partitions):
+                    offset = metadata.changelog_offset(topic, partition)
+                    if offset > highest.get((topic, partition), -1):
+                        highest[topic, partition] = offset
+        offsets: MutableMapping[str, Mapping[int, int]] = {}
+        for client, metadata in clients_metadata.items():
+            positions: MutableMapping[int, int] = {}
+            for partition in range(num_partitions):
+                ceiling, lag, has_state = 0, 0, False
+                for topic in topics:
+                    best = highest.get((topic, partition))
+                    if best is None:
+                        continue  # no client has state for it.
+                    offset = metadata.changelog_offset(topic, partition)
+                    has_state = has_state or offset >= 0
+                    ceiling = max(ceiling, best + 1)
+                    lag = max(lag, best - offset)
+                if has_state:
+                    positions[partition] = ceiling - lag
+            offsets[client] = positions
+        return offsets
+
+    @classmethod
+    def _withhold_moved_actives(
+            cls,
+            assignments: ClientAssignmentMapping,
+            clients_metadata: ClientMetadataMapping) -> None:
+        # With cooperative rebalancing an active partition moving between
+        # two members is only revoked from the old owner in this
+        # rebalance.  The old owner then triggers another rebalance after
+        # it stopped processing the partition, and the partition is
+        # assigned to the new owner in that one.
+        owners = {
+            TP(topic, partition): member_id
+            for member_id, metadata in clients_metadata.items()
+            for topic, partitions in metadata.assignment.actives.items()
+            for partition in partitions
+        }
+        for member_id, assignment in assignments.items():
+            for topic, partitions in assignment.actives.items():
+                moved = [
+                    p for p in partitions
+                    if owners.get(TP(topic, p), member_id) != member_id
+                ]
+                if moved:
+                    logger.info('Withholding %r partitions %r from %r',
+                                topic, moved, member_id)
+                    assignment.actives[topic] = [
+                        p for p in partitions if p not in moved]
+                    # start reading the changelog until then.
+                    standbys = assignment.standbys.setdefault(topic, [])
+                    standbys.extend(p for p in moved if p not in standbys)
+
+    @classmethod
+    def _global_table_standbys(
+            cls,
+            assignments: ClientAssignmentMapping,
+            topics: Set[str],
+            cluster: ClusterMetadata) -> None:
+        # Every member reads all partitions of global tables:
+        # the partitions it is not active for are assigned as standbys.
+        for topic in topics:
+            partitions = set(cluster.partitions_for_topic(topic) or ())
+            for assignment in assignments.values():
+                actives = set(assignment.actives.get(topic, ()))
+                assignment.standbys[topic] = sorted(partitions - actives)
+
     def _protocol_assignments(
             self,
             assignments: ClientAssignmentMapping,
@@ -270,6 +398,9 @@ class PartitionAssignor(AbstractPartitionAssignor, PartitionAssignorT):
             for partition in partitions
         }
 
+    def assigned_warmups(self) -> Set[TP]:
+        return self._assignment.warmup_tps
+
     def assigned_actives(self) -> Set[TP]:
         return {
             TP(topic, partition)
@@ -1,6 +1,26 @@
 """Join strategies."""
-from typing import Any, Optional, Tuple
-from .types import EventT, FieldDescriptorT, JoinT, JoinableT
+from itertools import count
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    cast,
+)
+from .exceptions import ImproperlyConfigured
+from .windows import SlidingWindow
+from .types import (
+    EventT,
+    FieldDescriptorT,
+    JoinT,
+    JoinableT,
+    StreamT,
+    TopicT,
+)
+from .types.tables import CollectionT
 
 __all__ = [
     'Join',
@@ -10,18 +30,181 @@ __all__ = [
     'OuterJoin',
 ]
 
+#: Marks keys missing from the table in prefetched values.
+_MISSING = object()
+
+#: Marks keys that were not prefetched.
+_NOT_FETCHED = object()
+
 
 class Join(JoinT):
     """Base class for join strategies."""
 
+    #: Table values prefetched for the events taken from the channel
+    #: by the stream, see :meth:`prefetch`.
+    _prefetched: Dict[Any, Any]
+    _prefetched_version: int = -1
+
     def __init__(self, *, stream: JoinableT,
-                 fields: Tuple[FieldDescriptorT, ...]) -> None:
+                 fields: Tuple[FieldDescriptorT, ...],
+                 buffer: CollectionT = None) -> None:
         self.fields = {field.model: field for field in fields}
+        self.sides = tuple(field.model for field in fields)
         self.stream = stream
+        self.buffer = buffer
+        self._joined: Optional[StreamT] = None
+        self._prefetched = {}
 
     async def process(self, event: EventT) -> Optional[EventT]:
         raise NotImplementedError()
 
+    async def on_stream_start(self, stream: StreamT) -> None:
+        if self.is_table_join:
+            table = cast(CollectionT, self.stream)
+            if table.window is not None:
+                raise ImproperlyConfigured(
+                    f'Cannot join stream with windowed table {table.name}')
+            self._verify_copartitioned(stream, table)
+            self._joined = stream
+        elif self.is_windowed_join:
+            buffer = cast(CollectionT, self.buffer)
+            self._verify_buffer(buffer)
+            self._verify_copartitioned(stream, buffer)
+            self._joined = stream
+
+    @property
+    def is_table_join(self) -> bool:
+        return isinstance(self.stream, CollectionT)
+
+    @property
+    def is_windowed_join(self) -> bool:
+        return self.buffer is not None
+
+    def _verify_buffer(self, buffer: CollectionT) -> None:
+        if len(self.sides) != 2:
+            raise ImproperlyConfigured(
+                f'Windowed join needs one field for each side, '
+                f'got {len(self.sides)}')
+        window = buffer.window
+        if not isinstance(window, SlidingWindow):
+            raise ImproperlyConfigured(
+                f'Join buffer {buffer.name} must be a sliding window table')
+        expires = window.expires
+        if expires is None:
+            raise ImproperlyConfigured(
+                f'Join buffer {buffer.name} must expire, '
+                f'or it keeps every event forever')
+        if expires < max(window.before, window.after):
+            raise ImproperlyConfigured(
+                f'Join buffer {buffer.name} expires before the join window '
+                f'closes: expires must be at least max(before, after)')
+
+    def _verify_copartitioned(self, stream: StreamT,
+                              table: CollectionT) -> None:
+        channel = stream.channel
+        if not isinstance(channel, TopicT):
+            return
+        default = stream.app.conf.topic_partitions
+        stream_partitions = channel.partitions or default
+        table_partitions = table.partitions or default
+        if stream_partitions != table_partitions:
+            raise ImproperlyConfigured(
+                f'Cannot join stream {stream.shortlabel} with table '
+                f'{table.name}: the stream has {stream_partitions} '
+                f'partitions, the table has {table_partitions}. '
+                f'Streams must be co-partitioned with the table they '
+                f'are joined with, use group_by to repartition the stream.')
+
+    async def prefetch(self, events: Sequence[Any]) -> None:
+        # Called by the stream with the events it took from the channel,
+        # the rows for all of them are fetched using a single multi-get.
+        self._prefetched.clear()
+        if not self.is_table_join:
+            return
+        table = cast(CollectionT, self.stream)
+        version = table.version
+        self._prefetched = await self._fetch(
+            self._key_for(event.value, event)
+            for event in events if isinstance(event, EventT))
+        self._prefetched_version = version
+
+    async def _lookup(self, value: Any) -> Tuple[bool, Any]:
+        # Returns (found, table_value) for stream value.
+        table = cast(CollectionT, self.stream)
+        stream = self._joined
+        key = self._key_for(
+            value, stream.current_event if stream is not None else None)
+        if table.version != self._prefetched_version:
+            # the table changed since the rows were fetched.
+            self._prefetched.clear()
+        row = self._prefetched.get(key, _NOT_FETCHED)
+        if row is _NOT_FETCHED:
+            row = (await self._fetch([key]))[key]
+        return row is not _MISSING, row
+
+    async def _fetch(self, keys: Iterable[Any]) -> Dict[Any, Any]:
+        table = cast(CollectionT, self.stream)
+        keys = list(keys)
+        found = await table.data.get_many_async(keys)
+        return {key: found.get(key, _MISSING) for key in keys}
+
+    async def _windowed_join(self, value: Any) -> List[Tuple[Any, Any]]:
+        # Returns (side0, side1) pairs for value and the values buffered
+        # for the other side with the same key, in the join window.
+        # A side 1 value at t1 joins a side 0 value at t0 when
+        # t0 - before <= t1 <= t0 + after.
+        buffer = cast(CollectionT, self.buffer)
+        window = cast(SlidingWindow, buffer.window)
+        stream = cast(StreamT, self._joined)
+        event = stream.current_event
+        if event is None:
+            raise RuntimeError('Cannot join streams outside of stream')
+        side = self.sides.index(type(value))
+        key = self.fields[type(value)].getattr(value)
+        timestamp = event.message.timestamp
+        before, after = window.before, window.after
+
+        # Buffered values are stored in the window range of their
+        # timestamp, so the timestamp is the window start + before.
+        if side == 0:
+            start, end = timestamp - before, timestamp + after
+        else:
+            start, end = timestamp - after, timestamp + before
+        # Every value is stored under its own key, so adding a value
+        # sends only that value to the changelog: values with the same
+        # timestamp are in slots 1, 2, ... next to the value in slot 0.
+        other = 1 - side
+        model = self.sides[other]
+        data = buffer.data
+        matches = []
+        for window_range, item in data.iterwindows(
+                (other, key, 0), start - before, end - before):
+            matches.append(model.from_data(item))
+            for slot in count(1):
+                item = data.get(((other, key, slot), window_range), _MISSING)
+                if item is _MISSING:
+                    break
+                matches.append(model.from_data(item))
+
+        # The buffer expires old values, see SlidingWindow.stale_before.
+        for window_range in window.ranges(timestamp):
+            for slot in count():
+                window_key = ((side, key, slot), window_range)
+                if window_key not in data:
+                    buffer[window_key] = value
+                    break
+        if side == 0:
+            return [(value, match) for match in matches]
+        return [(match, value) for match in matches]
+
+    def _key_for(self, value: Any, event: Optional[EventT]) -> Any:
+        field = self.fields.get(type(value))
+        if field is not None:
+            return field.getattr(value)
+        if event is None:
+            raise RuntimeError('Cannot join table outside of stream')
+        return event.key
+
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, type(self)):
             return (other.fields == self.fields and
@@ -37,11 +220,37 @@ class RightJoin(Join):
 
 
 class LeftJoin(Join):
-    """Left-join strategy."""
+    """Left-join strategy.
+
+    Joined with a table, the stream yields ``(value, row)`` tuples,
+    where row is :const:`None` if the key is not in the table.
+    """
+
+    async def process(self, value: Any) -> Any:
+        if not self.is_table_join:
+            raise NotImplementedError()
+        found, row = await self._lookup(value)
+        return value, (row if found else None)
 
 
 class InnerJoin(Join):
-    """Inner-join strategy."""
+    """Inner-join strategy.
+
+    Joined with a table, the stream yields ``(value, row)`` tuples,
+    and skips values where the key is not in the table.
+
+    Joined with a buffer table, the stream yields a list of
+    ``(value0, value1)`` tuples for the values of the other side
+    in the join window, and skips values with no match.
+    """
+
+    async def process(self, value: Any) -> Any:
+        if self.is_windowed_join:
+            return await self._windowed_join(value) or None
+        if not self.is_table_join:
+            raise NotImplementedError()
+        found, row = await self._lookup(value)
+        return (value, row) if found else None
 
 
 class OuterJoin(Join):
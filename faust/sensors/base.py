@@ -1,5 +1,5 @@
 """Base-interface for sensors."""
-from typing import Any, Iterator, Set
+from typing import Any, Iterator, Mapping, Set
 
 from mode import Service
 
@@ -80,6 +80,20 @@ class Sensor(SensorT, Service):
     def on_send_completed(self, producer: ProducerT, state: Any) -> None:
         """Message successfully sent."""
 
+    def on_store_stats(self, name: str, stats: Mapping[str, float]) -> None:
+        """Table storage engine reported resource usage statistics."""
+        ...
+
+    def on_table_recovery(self, table: CollectionT, kind: str,
+                          stats: Mapping[TP, Mapping[str, Any]]) -> None:
+        """Table changelog reader reported progress.
+
+        ``kind`` is ``"active"`` for recovery, or ``"standby"``
+        for standby replication, and ``stats`` has the highwater,
+        offset, records/s, bytes/s and ETA for every changelog partition.
+        """
+        ...
+
 
 class SensorDelegate(SensorDelegateT):
     """A class that delegates sensor methods to a list of sensors."""
@@ -163,5 +177,14 @@ class SensorDelegate(SensorDelegateT):
         for sensor in self._sensors:
             sensor.on_send_completed(producer, state[sensor])
 
+    def on_store_stats(self, name: str, stats: Mapping[str, float]) -> None:
+        for sensor in self._sensors:
+            sensor.on_store_stats(name, stats)
+
+    def on_table_recovery(self, table: CollectionT, kind: str,
+                          stats: Mapping[TP, Mapping[str, Any]]) -> None:
+        for sensor in self._sensors:
+            sensor.on_table_recovery(table, kind, stats)
+
     def __repr__(self) -> str:
         return f'<{type(self).__name__}: {self._sensors!r}>'
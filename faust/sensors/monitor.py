@@ -135,6 +135,15 @@ class Monitor(ServiceProxy, Sensor, KeywordReduce):
     #: Arbitrary counts added by apps
     metric_counts: Counter[str] = cast(Counter[str], None)
 
+    #: Resource usage reported by table storage engines, by engine name.
+    stores: MutableMapping[str, Mapping[str, float]] = cast(
+        MutableMapping[str, Mapping[str, float]], None)
+
+    #: Table recovery progress by kind (active/standby), table name,
+    #: and changelog partition.
+    recovery: MutableMapping[str, MutableMapping[str, Mapping]] = cast(
+        MutableMapping[str, MutableMapping[str, Mapping]], None)
+
     def __init__(self,
                  *,
                  max_avg_history: int = MAX_AVG_HISTORY,
@@ -156,6 +165,9 @@ class Monitor(ServiceProxy, Sensor, KeywordReduce):
                  messages_s: int = 0,
                  events_runtime_avg: float = 0.0,
                  topic_buffer_full: Counter[TopicT] = None,
+                 stores: MutableMapping[str, Mapping[str, float]] = None,
+                 recovery: MutableMapping[
+                     str, MutableMapping[str, Mapping]] = None,
                  **kwargs: Any) -> None:
         self.max_avg_history = max_avg_history
         self.max_commit_latency_history = max_commit_latency_history
@@ -183,6 +195,9 @@ class Monitor(ServiceProxy, Sensor, KeywordReduce):
         self.time: Callable[[], float] = monotonic
 
         self.metric_counts = Counter()
+        self.stores = {} if stores is None else stores
+        self.recovery = (
+            {'active': {}, 'standby': {}} if recovery is None else recovery)
 
     def asdict(self) -> Mapping:
         return {
@@ -205,6 +220,8 @@ class Monitor(ServiceProxy, Sensor, KeywordReduce):
                 name: table.asdict() for name, table in self.tables.items()
             },
             'metric_counts': self._metric_counts_dict(),
+            'stores': self.stores,
+            'recovery': self.recovery,
         }
 
     def _events_by_stream_dict(self) -> MutableMapping[str, int]:
@@ -322,6 +339,16 @@ class Monitor(ServiceProxy, Sensor, KeywordReduce):
     def on_send_completed(self, producer: ProducerT, state: Any) -> None:
         self.send_latency.append(self.time() - cast(float, state))
 
+    def on_store_stats(self, name: str, stats: Mapping[str, float]) -> None:
+        self.stores[name] = dict(stats)
+
+    def on_table_recovery(self, table: CollectionT, kind: str,
+                          stats: Mapping[TP, Mapping[str, Any]]) -> None:
+        self.recovery.setdefault(kind, {})[table.name] = {
+            tp.partition: dict(partition_stats)
+            for tp, partition_stats in stats.items()
+        }
+
     def count(self, metric_name: str, count: int = 1) -> None:
         self.metric_counts[metric_name] += count
 
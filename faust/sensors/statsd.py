@@ -2,7 +2,7 @@
 import re
 import typing
 from time import monotonic
-from typing import Any, Pattern, cast
+from typing import Any, Mapping, Pattern, cast
 
 from mode.utils.objects import cached_property
 
@@ -134,6 +134,21 @@ class StatsdMonitor(Monitor):
             self._time(monotonic() - cast(float, state)),
             rate=self.rate)
 
+    def on_store_stats(self, name: str, stats: Mapping[str, float]) -> None:
+        super().on_store_stats(name, stats)
+        for key, value in stats.items():
+            self.client.gauge(f'store.{name}.{key}', value, rate=self.rate)
+
+    def on_table_recovery(self, table: CollectionT, kind: str,
+                          stats: Mapping[TP, Mapping[str, Any]]) -> None:
+        super().on_table_recovery(table, kind, stats)
+        prefix = f'recovery.{kind}.{table.name}'
+        for key in ('remaining', 'records_s', 'bytes_s'):
+            self.client.gauge(
+                f'{prefix}.{key}',
+                sum(partition[key] for partition in stats.values()),
+                rate=self.rate)
+
     def count(self, metric_name: str, count: int = 1) -> None:
         super().count(metric_name, count=count)
         self.client.incr(metric_name, count=count, rate=self.rate)
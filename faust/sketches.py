@@ -0,0 +1,368 @@
+"""Sketches: fixed size summaries of a stream of items.
+
+Sketches answer questions about all items added to them (how many
+distinct items, how often was this item seen, what items are seen
+most often) approximately, using memory bounded by their parameters
+no matter how many items are added.
+
+Sketches of the same type and parameters can be merged using ``|``,
+e.g. to combine the sketches of several windows.  Merging is
+associative and commutative.
+
+``sketch + item`` returns a copy with the item added,
+so sketches can be used as table values like numbers
+(``table[key] += item``).  Sketches are serialized as the base64
+encoding of their compact binary form (see :meth:`Sketch.to_bytes`).
+"""
+import abc
+import math
+import struct
+import sys
+from array import array
+from base64 import b64decode, b64encode
+from hashlib import blake2b
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Tuple, Type, TypeVar
+
+from faust.utils import json
+
+__all__ = ['Sketch', 'HyperLogLog', 'CountMinSketch', 'TopK']
+
+S = TypeVar('S', bound='Sketch')
+HLL = TypeVar('HLL', bound='HyperLogLog')
+CMS = TypeVar('CMS', bound='CountMinSketch')
+TK = TypeVar('TK', bound='TopK')
+
+
+def _item_hash(item: Any) -> Tuple[int, int]:
+    # Python's hash() is randomized for every process, sketches
+    # are shared between workers so must agree on the hash.
+    if not isinstance(item, bytes):
+        item = json.dumps(item).encode()
+    digest = blake2b(item, digest_size=16).digest()
+    return (int.from_bytes(digest[:8], 'little'),
+            int.from_bytes(digest[8:], 'little'))
+
+
+def _hashable(item: Any) -> Any:
+    # JSON has no tuples, so tuple items are decoded as lists.
+    if isinstance(item, list):
+        return tuple(_hashable(i) for i in item)
+    return item
+
+
+class Sketch(abc.ABC):
+    """Base class for sketches."""
+
+    @classmethod
+    @abc.abstractmethod
+    def from_bytes(cls: Type[S], data: bytes) -> S:
+        """Create sketch from binary form (see :meth:`to_bytes`)."""
+        ...
+
+    @classmethod
+    def from_data(cls: Type[S], data: Any, *,
+                  preferred_type: Type = None) -> S:
+        """Create sketch from JSON form (see :meth:`__json__`).
+
+        Like :meth:`faust.Record.from_data`, so that sketch types can
+        be used as the ``value_type`` of tables and topics.
+        """
+        if isinstance(data, cls):
+            return data
+        return cls.from_bytes(b64decode(data))
+
+    @abc.abstractmethod
+    def add(self, item: Any) -> None:
+        """Add item to the sketch."""
+        ...
+
+    @abc.abstractmethod
+    def merge(self: S, other: S) -> S:
+        """Return new sketch summarizing the items of both sketches."""
+        ...
+
+    @abc.abstractmethod
+    def to_bytes(self) -> bytes:
+        """Return compact binary form of the sketch."""
+        ...
+
+    def copy(self: S) -> S:
+        return self.from_bytes(self.to_bytes())
+
+    def update(self, items: Iterable[Any]) -> None:
+        """Add every item in iterable to the sketch."""
+        for item in items:
+            self.add(item)
+
+    def _check_compatible(self, other: 'Sketch') -> None:
+        if type(other) is not type(self) or other.params != self.params:
+            raise ValueError(f'Cannot merge {self!r} with {other!r}')
+
+    @property
+    @abc.abstractmethod
+    def params(self) -> Tuple:
+        """Parameters that must be the same for sketches to be merged."""
+        ...
+
+    def __json__(self) -> str:
+        return b64encode(self.to_bytes()).decode()
+
+    def __add__(self: S, item: Any) -> S:
+        sketch = self.copy()
+        sketch.add(item)
+        return sketch
+
+    def __iadd__(self: S, item: Any) -> S:
+        self.add(item)
+        return self
+
+    def __or__(self: S, other: S) -> S:
+        return self.merge(other)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Sketch):
+            return (type(other) is type(self) and
+                    other.to_bytes() == self.to_bytes())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        params = ', '.join(map(repr, self.params))
+        return f'<{type(self).__name__}({params})>'
+
+
+class HyperLogLog(Sketch):
+    """Estimates the number of distinct items.
+
+    Uses ``2 ** precision`` bytes, and the estimate has
+    a typical relative error of ``1.04 / sqrt(2 ** precision)``
+    (1.6% for the default precision of 12).
+
+    Examples:
+        >>> visitors = HyperLogLog()
+        >>> visitors.update(['alice', 'bob', 'alice'])
+        >>> visitors.count()
+        2
+    """
+
+    def __init__(self, precision: int = 12) -> None:
+        if not 4 <= precision <= 16:
+            raise ValueError('HyperLogLog precision must be 4 to 16')
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    @classmethod
+    def from_bytes(cls: Type[HLL], data: bytes) -> HLL:
+        sketch = cls(data[0])
+        sketch.registers[:] = data[1:]
+        return sketch
+
+    @property
+    def params(self) -> Tuple:
+        return (self.precision,)
+
+    def add(self, item: Any) -> None:
+        h, _ = _item_hash(item)
+        bits = 64 - self.precision
+        # register chosen by the first bits, and the position
+        # of the first 1-bit in the rest is the rank.
+        index = h >> bits
+        rank = bits - (h & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        """Return estimated number of distinct items added."""
+        registers = self.registers
+        m = len(registers)
+        estimate = self._alpha(m) * m * m / math.fsum(
+            2.0 ** -r for r in registers)
+        zeros = registers.count(0)
+        if zeros and estimate <= 2.5 * m:
+            # linear counting is more accurate for small counts.
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    @staticmethod
+    def _alpha(m: int) -> float:
+        if m >= 128:
+            return 0.7213 / (1 + 1.079 / m)
+        return {16: 0.673, 32: 0.697, 64: 0.709}[m]
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        self._check_compatible(other)
+        sketch = type(self)(self.precision)
+        sketch.registers[:] = bytes(map(max, self.registers, other.registers))
+        return sketch
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + bytes(self.registers)
+
+
+class CountMinSketch(Sketch):
+    """Estimates how many times items were added.
+
+    Uses ``width * depth`` 64-bit counters.  The estimate is never
+    too low, and is at most ``2 / width`` of the total count too high
+    with probability ``1 - 0.5 ** depth``.
+
+    Examples:
+        >>> views = CountMinSketch()
+        >>> views.add('/about', 3)
+        >>> views['/about']
+        3
+    """
+
+    _header = struct.Struct('<IIq')
+
+    def __init__(self, width: int = 1024, depth: int = 4) -> None:
+        if width < 1 or depth < 1:
+            raise ValueError('CountMinSketch width and depth must be >= 1')
+        self.width = width
+        self.depth = depth
+        #: Sum of all counts added.
+        self.total = 0
+        self.counters = array('q', bytes(8 * width * depth))
+
+    @classmethod
+    def from_bytes(cls: Type[CMS], data: bytes) -> CMS:
+        width, depth, total = cls._header.unpack_from(data)
+        sketch = cls(width, depth)
+        sketch.total = total
+        counters = array('q', data[cls._header.size:])
+        if sys.byteorder == 'big':
+            counters.byteswap()
+        sketch.counters = counters
+        return sketch
+
+    @property
+    def params(self) -> Tuple:
+        return (self.width, self.depth)
+
+    def _indices(self, item: Any) -> List[int]:
+        h1, h2 = _item_hash(item)
+        width = self.width
+        return [row * width + (h1 + row * h2) % width
+                for row in range(self.depth)]
+
+    def add(self, item: Any, n: int = 1) -> None:
+        counters = self.counters
+        for i in self._indices(item):
+            counters[i] += n
+        self.total += n
+
+    def estimate(self, item: Any) -> int:
+        """Return estimated number of times item was added."""
+        counters = self.counters
+        return min(counters[i] for i in self._indices(item))
+
+    def __getitem__(self, item: Any) -> int:
+        return self.estimate(item)
+
+    def merge(self, other: 'CountMinSketch') -> 'CountMinSketch':
+        self._check_compatible(other)
+        sketch = type(self)(self.width, self.depth)
+        sketch.total = self.total + other.total
+        sketch.counters = array(
+            'q', map(int.__add__, self.counters, other.counters))
+        return sketch
+
+    def to_bytes(self) -> bytes:
+        counters = self.counters
+        if sys.byteorder == 'big':
+            counters = array('q', counters)
+            counters.byteswap()
+        return (self._header.pack(self.width, self.depth, self.total) +
+                counters.tobytes())
+
+
+class TopK(Sketch):
+    """Finds the items added most often (Space-Saving algorithm).
+
+    Keeps counts for at most ``capacity`` items (three times ``k``
+    by default): when full, the item with the lowest count is replaced,
+    and the new item gets its count.  Counts are never too low, and at
+    most the total count divided by ``capacity`` too high.
+
+    Items must be JSON serializable, and hashable after being
+    deserialized (e.g. :class:`str`, :class:`int`, or tuples of these:
+    JSON arrays are deserialized as tuples).
+
+    Examples:
+        >>> pages = TopK(k=2)
+        >>> pages.update(['/', '/about', '/', '/faq', '/'])
+        >>> pages.top(1)
+        [('/', 3)]
+    """
+
+    def __init__(self, k: int = 10, capacity: int = None) -> None:
+        self.k = k
+        self.capacity = capacity or 3 * k
+        if self.capacity < k:
+            raise ValueError('TopK capacity must be at least k')
+        #: Count, and how much it may be too high, by item.
+        self.counts: Dict[Any, List[int]] = {}
+
+    @classmethod
+    def from_bytes(cls: Type[TK], data: bytes) -> TK:
+        k, capacity, counts = json.loads(data.decode())
+        sketch = cls(k, capacity)
+        sketch.counts = {
+            _hashable(item): [n, error] for item, n, error in counts
+        }
+        return sketch
+
+    @property
+    def params(self) -> Tuple:
+        return (self.k, self.capacity)
+
+    def add(self, item: Any, n: int = 1) -> None:
+        counts = self.counts
+        try:
+            counts[item][0] += n
+        except KeyError:
+            if len(counts) < self.capacity:
+                counts[item] = [n, 0]
+            else:
+                # replace the item with the lowest count.
+                lowest = min(counts, key=lambda i: counts[i][0])
+                floor = counts.pop(lowest)[0]
+                counts[item] = [floor + n, floor]
+
+    def top(self, n: int = None) -> List[Tuple[Any, int]]:
+        """Return the ``n`` items added most often (at most ``k``)."""
+        n = self.k if n is None else min(n, self.k)
+        counts = sorted(
+            ((item, count) for item, (count, _) in self.counts.items()),
+            key=itemgetter(1), reverse=True)
+        return counts[:n]
+
+    def _floor(self) -> int:
+        # items not counted were added at most this many times.
+        if len(self.counts) < self.capacity:
+            return 0
+        return min(count for count, _ in self.counts.values())
+
+    def merge(self, other: 'TopK') -> 'TopK':
+        self._check_compatible(other)
+        floors = self._floor(), other._floor()
+        counts: Dict[Any, List[int]] = {}
+        for item in {**self.counts, **other.counts}:
+            count = error = 0
+            for sketch, floor in zip((self, other), floors):
+                n, e = sketch.counts.get(item, (floor, floor))
+                count += n
+                error += e
+            counts[item] = [count, error]
+        sketch = type(self)(self.k, self.capacity)
+        sketch.counts = dict(sorted(
+            counts.items(), key=lambda i: i[1][0],
+            reverse=True)[:self.capacity])
+        return sketch
+
+    def to_bytes(self) -> bytes:
+        return json.dumps([
+            self.k,
+            self.capacity,
+            [[item, n, error] for item, (n, error) in self.counts.items()],
+        ]).encode()
@@ -0,0 +1,251 @@
+"""In-memory table storage keeping numbers in typed arrays.
+
+Values are kept in one compact array of machine integers or doubles
+(:mod:`numpy` if installed, else :mod:`array`) indexed by slot,
+instead of one Python object for every value.  Used by
+:class:`faust.NumericTable`.
+"""
+from array import array
+from itertools import repeat
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+)
+from yarl import URL
+from faust.exceptions import ImproperlyConfigured
+from faust.streams import current_event
+from faust.types import AppT
+from . import memory
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # noqa
+
+__all__ = ['ArrayData', 'Store']
+
+#: Array type codes for the supported value types.
+TYPECODES: Mapping[Type, str] = {int: 'q', float: 'd'}
+
+Number = Union[int, float]
+
+
+class ArrayData(MutableMapping):
+    """Mapping of key to number, keeping the numbers in a typed array.
+
+    Every key is given a slot in :attr:`_values`, and the partition
+    the key is stored in is kept in :attr:`owners` for the same slot.
+    Slots of deleted keys are reused.
+    """
+
+    #: Keys of windowed tables are not indexed (see memory.Store).
+    windows: Optional[Dict] = None
+
+    def __init__(self, typecode: str, *, use_numpy: bool = None) -> None:
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        self.typecode = typecode
+        self.use_numpy = use_numpy
+        self.slots: Dict[Any, int] = {}
+        self.owners = array('i')
+        self._values = self._new_values(16)
+        self.free: List[int] = []
+        self.counts: Dict[int, int] = {}
+
+    def _new_values(self, size: int) -> Any:
+        if self.use_numpy:
+            return numpy.zeros(size, dtype=self.typecode)
+        return array(self.typecode, bytes(
+            array(self.typecode).itemsize * size))
+
+    @property
+    def partitions(self) -> Set[int]:
+        return set(self.counts)
+
+    def set_for_partition(self, partition: int, key: Any, value: Any) -> None:
+        self._values[self._slot_for(key, partition)] = value
+
+    def increment_many(self, partition: int,
+                       keys: Sequence[Any],
+                       deltas: Union[Number, Sequence[Number]]) -> Dict:
+        """Add deltas to the values of keys, keys missing starting at zero.
+
+        Keys may repeat, and ``deltas`` is either one delta for every
+        key, or the same delta for all keys.
+
+        Returns:
+            Dict: the new value of every key changed.
+        """
+        slots = [self._slot_for(key, partition) for key in keys]
+        values = self._values
+        if self.use_numpy:
+            # unbuffered, so slots repeating add up.
+            numpy.add.at(values, slots, deltas)
+        else:
+            slot_deltas: Iterable[Number]
+            if isinstance(deltas, Sequence):
+                slot_deltas = deltas
+            else:
+                slot_deltas = repeat(deltas)
+            for slot, delta in zip(slots, slot_deltas):
+                values[slot] += delta
+        get = self._get
+        return {key: get(slot) for key, slot in zip(keys, slots)}
+
+    def apply_batch(self, partition: int,
+                    batch: memory.PartitionBatch) -> None:
+        to_set, to_delete = batch
+        for key, value in to_set.items():
+            self.set_for_partition(partition, key, value)
+        for key in to_delete:
+            self.pop(key, None)
+
+    def drop_partition(self, partition: int) -> int:
+        """Remove all keys in partition, returning the number removed."""
+        owners = self.owners
+        keys = [key for key, slot in self.slots.items()
+                if owners[slot] == partition]
+        for key in keys:
+            del self[key]
+        return len(keys)
+
+    def sizes(self) -> Mapping[int, int]:
+        return dict(self.counts)
+
+    def _slot_for(self, key: Any, partition: int) -> int:
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.slots[key] = self._allocate(partition)
+            self._count(partition, 1)
+        elif self.owners[slot] != partition:
+            # keys are only moved when written to from another partition,
+            # e.g. a stream that is not co-partitioned with the table.
+            self._count(self.owners[slot], -1)
+            self._count(partition, 1)
+            self.owners[slot] = partition
+        return slot
+
+    def _allocate(self, partition: int) -> int:
+        if self.free:
+            slot = self.free.pop()
+            self.owners[slot] = partition
+            return slot
+        slot = len(self.owners)
+        self.owners.append(partition)
+        if slot >= len(self._values):
+            self._grow(len(self._values))
+        return slot
+
+    def _grow(self, size: int) -> None:
+        if self.use_numpy:
+            self._values = numpy.concatenate(
+                (self._values, self._new_values(size)))
+        else:
+            self._values.extend(self._new_values(size))
+
+    def _count(self, partition: int, n: int) -> None:
+        count = self.counts[partition] = self.counts.get(partition, 0) + n
+        if not count:
+            del self.counts[partition]
+
+    def _get(self, slot: int) -> Number:
+        value = self._values[slot]
+        return value.item() if self.use_numpy else value
+
+    def _partition_for_key(self, key: Any) -> int:
+        event = current_event()
+        if event is not None:
+            return event.message.partition
+        slot = self.slots.get(key)
+        return self.owners[slot] if slot is not None else 0
+
+    def __getitem__(self, key: Any) -> Number:
+        return self._get(self.slots[key])
+
+    def __setitem__(self, key: Any, value: Number) -> None:
+        self.set_for_partition(self._partition_for_key(key), key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        slot = self.slots.pop(key)
+        self._count(self.owners[slot], -1)
+        self._values[slot] = 0
+        self.free.append(slot)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.slots
+
+    def __iter__(self) -> Iterator:
+        return iter(self.slots)
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def clear(self) -> None:
+        self.slots.clear()
+        self.owners = array('i')
+        self._values = self._new_values(16)
+        self.free.clear()
+        self.counts.clear()
+
+
+class Store(memory.Store):
+    """Table storage keeping numeric values in typed arrays.
+
+    The ``value_type`` of the table must be :class:`int`
+    (stored as 64-bit integers) or :class:`float`.
+    """
+
+    def __init__(self, url: Optional[Union[str, URL]], app: AppT,
+                 **kwargs: Any) -> None:
+        # created by the table (Collection.StateStore), not by URL.
+        super().__init__(url or 'arrays://', app, **kwargs)
+        try:
+            typecode = TYPECODES[cast(Type, self.value_type)]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'Array store value_type must be int or float, '
+                f'not {self.value_type!r}')
+        self.data: ArrayData = ArrayData(typecode)  # type: ignore
+
+    def on_init(self) -> None:
+        ...  # data is created in __init__, when value_type is known.
+
+    @property
+    def windowed(self) -> bool:
+        return False
+
+    @windowed.setter
+    def windowed(self, windowed: bool) -> None:
+        if windowed:
+            raise NotImplementedError('Array store cannot be windowed')
+
+    def increment_many(self, keys: Sequence[Any],
+                       deltas: Union[Number, Sequence[Number]],
+                       partition: int) -> Dict:
+        """Add deltas to values of keys in partition, as one operation.
+
+        Returns:
+            Dict: the new value of every key changed.
+        """
+        return self.data.increment_many(partition, keys, deltas)
+
+    def set_many(self, items: Iterable[Tuple[Any, Any]],
+                 partition: int) -> None:
+        set_for_partition = self.data.set_for_partition
+        keys = []
+        for key, value in items:
+            set_for_partition(partition, key, value)
+            keys.append(key)
+        self._index_expiry(keys, partition)
@@ -1,11 +1,16 @@
 """Base class for table storage drivers."""
 import abc
-from collections import ItemsView, KeysView, ValuesView
+import struct
+from collections import ItemsView, KeysView, ValuesView, defaultdict
+from operator import itemgetter
 from typing import (
     Any,
     Callable,
+    DefaultDict,
     Iterable,
     Iterator,
+    List,
+    Mapping,
     Optional,
     Set,
     Tuple,
@@ -20,17 +25,49 @@ from faust.types import (
     CodecArg,
     CollectionT,
     EventT,
+    Message,
     ModelArg,
     StoreT,
     TP,
+    WindowRange,
 )
 
 __all__ = ['Store', 'SerializedStore']
 
+#: Changelog message as stored: the message (for the offset), the key
+#: and the value in the form stored (None to delete the key).
+#: The key is None for messages not written by a table.
+ChangelogEntry = Tuple[Message, Optional[bytes], Optional[bytes]]
+
+_SIGN_BIT = 1 << 63
+_ALL_BITS = (1 << 64) - 1
+
+
+def encode_timestamp(timestamp: float) -> bytes:
+    """Encode timestamp as 8 bytes sorting in timestamp order."""
+    # IEEE 754 doubles sort as integers once the sign bit is flipped
+    # for positive numbers, and all bits are flipped for negative numbers.
+    bits, = struct.unpack('>Q', struct.pack('>d', timestamp))
+    bits = bits ^ _ALL_BITS if bits & _SIGN_BIT else bits | _SIGN_BIT
+    return bits.to_bytes(8, 'big')
+
+
+def decode_timestamp(data: bytes) -> float:
+    """Decode timestamp encoded by :func:`encode_timestamp`."""
+    bits = int.from_bytes(data, 'big')
+    bits = bits ^ _SIGN_BIT if bits & _SIGN_BIT else bits ^ _ALL_BITS
+    timestamp, = struct.unpack('>d', struct.pack('>Q', bits))
+    return timestamp
+
 
 class Store(StoreT, Service):
     """Base class for table storage drivers."""
 
+    #: Keys by the time they expire at, for every partition.
+    _expiry_buckets: DefaultDict[int, DefaultDict[float, Set[Any]]]
+
+    _windowed: bool = False
+
     def __init__(self,
                  url: Union[str, URL],
                  app: AppT,
@@ -49,16 +86,120 @@ class Store(StoreT, Service):
         self.value_type = value_type
         self.key_serializer = key_serializer
         self.value_serializer = value_serializer
+        self._expiry_buckets = defaultdict(lambda: defaultdict(set))
+
+    @property
+    def windowed(self) -> bool:
+        return self._windowed
+
+    @windowed.setter
+    def windowed(self, windowed: bool) -> None:
+        self._windowed = windowed
 
     def persisted_offset(self, tp: TP) -> Optional[int]:
         raise NotImplementedError('In-memory store only, does not persist.')
 
+    def persisted_offset_if_open(self, tp: TP) -> Optional[int]:
+        return self.persisted_offset(tp)
+
     def set_persisted_offset(self, tp: TP, offset: int) -> None:
         ...
 
     async def need_active_standby_for(self, tp: TP) -> bool:
         return True
 
+    async def apply_changelog_batch_async(
+            self, batch: Iterable[EventT],
+            to_key: Callable[[Any], Any],
+            to_value: Callable[[Any], Any]) -> None:
+        self.apply_changelog_batch(batch, to_key=to_key, to_value=to_value)
+
+    async def get_async(self, key: Any, default: Any = None) -> Any:
+        return self.get(key, default)
+
+    async def get_many_async(self, keys: Iterable[Any]) -> Mapping[Any, Any]:
+        """Get values for many keys, as one operation if possible.
+
+        Keys missing from the store are not in the mapping returned.
+        """
+        return {key: self[key] for key in keys if key in self}
+
+    async def set_async(self, key: Any, value: Any) -> None:
+        self[key] = value
+
+    async def del_async(self, key: Any) -> None:
+        del self[key]
+
+    def set_many(self, items: Iterable[Tuple[Any, Any]],
+                 partition: int) -> None:
+        """Set many keys in partition, as one operation if possible.
+
+        The keys are also indexed for expiry, if :attr:`key_expires`
+        is set.
+        """
+        keys = []
+        for key, value in items:
+            self[key] = value
+            keys.append(key)
+        self._index_expiry(keys, partition)
+
+    def _index_expiry(self, keys: Iterable[Any], partition: int) -> None:
+        key_expires = self.key_expires
+        if key_expires is not None:
+            for key in keys:
+                self.set_expiry(key, partition, key_expires(key))
+
+    def iterwindows(self, key: Any,
+                    start: float = None,
+                    end: float = None,
+                    *,
+                    reverse: bool = False) -> Iterator[Tuple[Any, Any]]:
+        """Iterate over windows of windowed table key.
+
+        Yields ``(window_range, value)`` tuples for windows starting
+        between ``start`` and ``end`` (inclusive), in window order.
+
+        Stores keeping keys sorted should override this,
+        the default implementation scans all keys in the store.
+        """
+        windows = [
+            (WindowRange(*window_range), value)
+            for (k, window_range), value in self.items()
+            if k == key and
+            (start is None or window_range[0] >= start) and
+            (end is None or window_range[0] <= end)
+        ]
+        windows.sort(key=itemgetter(0), reverse=reverse)
+        return iter(windows)
+
+    def set_expiry(self, key: Any, partition: int, timestamp: float) -> None:
+        """Index key to be deleted by :meth:`expire` after timestamp.
+
+        Stores persisting data should also persist this index,
+        so keys still expire after a restart.
+        """
+        self._expiry_buckets[partition][timestamp].add(key)
+
+    def expire(self, partition: int, before: float) -> int:
+        """Delete keys in partition expiring at or before timestamp.
+
+        Returns:
+            int: the number of keys deleted.
+        """
+        buckets = self._expiry_buckets.get(partition)
+        if not buckets:
+            return 0
+        expired = 0
+        for timestamp in [ts for ts in buckets if ts <= before]:
+            for key in buckets.pop(timestamp):
+                # may have been deleted already.
+                self.pop(key, None)
+                expired += 1
+        return expired
+
+    async def expire_async(self, partition: int, before: float) -> int:
+        return self.expire(partition, before)
+
     async def on_partitions_assigned(self, table: CollectionT,
                                      assigned: Set[TP]) -> None:
         ...
@@ -122,7 +263,14 @@ class _SerializedStoreItemsView(ItemsView):
 
 
 class SerializedStore(Store):
-    """Base class for table storage drivers requiring serialization."""
+    """Base class for table storage drivers requiring serialization.
+
+    Keys of windowed tables are stored in a binary format sorting
+    all windows of a key together, in order of the window start:
+    the length of the serialized key (4 bytes), the serialized key,
+    and the window start and end timestamps (8 bytes each,
+    see :func:`encode_timestamp`).
+    """
 
     @abc.abstractmethod
     def _get(self, key: bytes) -> Optional[bytes]:  # pragma: no cover
@@ -162,21 +310,152 @@ class SerializedStore(Store):
     def _clear(self) -> None:  # pragma: no cover
         ...
 
+    # Stores doing blocking I/O can override these to
+    # do the work outside of the event loop thread.
+
+    async def _get_async(self, key: bytes) -> Optional[bytes]:
+        return self._get(key)
+
+    async def _get_many_async(
+            self, keys: List[bytes]) -> List[Optional[bytes]]:
+        return [self._get(key) for key in keys]
+
+    async def _set_async(self, key: bytes, value: Optional[bytes]) -> None:
+        self._set(key, value)
+
+    async def _del_async(self, key: bytes) -> None:
+        self._del(key)
+
     def apply_changelog_batch(self, batch: Iterable[EventT],
                               to_key: Callable[[Any], Any],
                               to_value: Callable[[Any], Any]) -> None:
-        for event in batch:
-            key = event.message.key
+        self._apply_changelog_entries(
+            self._event_entries(batch, to_key, to_value))
+
+    def apply_raw_changelog_batch(self, batch: Iterable[Message]) -> None:
+        """Apply batch of changelog messages, without decoding them.
+
+        The keys and values are stored in serialized form,
+        so recovery can skip deserializing the changelog.
+        """
+        self._apply_changelog_entries(self._message_entries(batch))
+
+    async def apply_raw_changelog_batch_async(
+            self, batch: Iterable[Message]) -> None:
+        self.apply_raw_changelog_batch(batch)
+
+    def _apply_changelog_entries(
+            self, entries: Iterable[ChangelogEntry]) -> None:
+        for message, key, value in entries:
             if key is None:
                 raise TypeError(
-                    f'Changelog entry is missing key: {event.message}')
-            value = event.message.value
+                    f'Changelog entry is missing key: {message}')
             if value is None:
                 self._del(key)
             else:
-                # keys/values are already JSON serialized in the message
                 self._set(key, value)
 
+    def _message_entries(
+            self, batch: Iterable[Message]) -> Iterator[ChangelogEntry]:
+        # keys/values are already JSON serialized in the message.
+        for message in batch:
+            key = message.key
+            yield (message,
+                   self._changelog_key(key) if key is not None else None,
+                   message.value)
+
+    def _event_entries(
+            self, batch: Iterable[EventT],
+            to_key: Callable[[Any], Any],
+            to_value: Callable[[Any], Any]) -> Iterator[ChangelogEntry]:
+        # The key and value of events can differ from their message
+        # (e.g. operations replayed into values by the table),
+        # so they are serialized again.
+        for event in batch:
+            message = event.message
+            if message.key is None:
+                yield message, None, None
+                continue
+            value = (None if message.value is None
+                     else self._encode_value(to_value(event.value)))
+            yield message, self._encode_key(to_key(event.key)), value
+
+    def _encode_key(self, key: Any) -> bytes:
+        if self.windowed:
+            key, (start, end) = key
+            return (self._window_key_prefix(key) +
+                    encode_timestamp(start) + encode_timestamp(end))
+        return super()._encode_key(key)
+
+    def _decode_key(self, key: Optional[bytes]) -> Any:
+        if self.windowed and key is not None:
+            size = int.from_bytes(key[:4], 'big') + 4
+            return (
+                super()._decode_key(key[4:size]),
+                WindowRange(decode_timestamp(key[size:size + 8]),
+                            decode_timestamp(key[size + 8:size + 16])),
+            )
+        return super()._decode_key(key)
+
+    def _window_key_prefix(self, key: Any) -> bytes:
+        # the length is included so that no key is a prefix of another.
+        encoded = super()._encode_key(key)
+        return len(encoded).to_bytes(4, 'big') + encoded
+
+    def iterwindows(self, key: Any,
+                    start: float = None,
+                    end: float = None,
+                    *,
+                    reverse: bool = False) -> Iterator[Tuple[Any, Any]]:
+        # Compares the serialized key, as keys decoded from JSON
+        # are not always equal to the original (e.g. tuples).
+        prefix = self._window_key_prefix(key)
+        offset = len(prefix)
+        windows = []
+        for stored_key, value in self._iteritems():
+            if not stored_key.startswith(prefix):
+                continue
+            window_start = decode_timestamp(stored_key[offset:offset + 8])
+            if ((start is None or window_start >= start) and
+                    (end is None or window_start <= end)):
+                window_end = decode_timestamp(
+                    stored_key[offset + 8:offset + 16])
+                windows.append((WindowRange(window_start, window_end), value))
+        windows.sort(key=itemgetter(0), reverse=reverse)
+        decode = self._decode_value
+        return iter([(window_range, decode(value))
+                     for window_range, value in windows])
+
+    def _changelog_key(self, key: bytes) -> bytes:
+        # Changelog messages for windowed tables have the
+        # ``(key, window_range)`` tuple serialized as the key.
+        if self.windowed:
+            return self._encode_key(super()._decode_key(key))
+        return key
+
+    async def get_async(self, key: Any, default: Any = None) -> Any:
+        value = await self._get_async(self._encode_key(key))
+        if value is None:
+            return default
+        return self._decode_value(value)
+
+    async def get_many_async(self, keys: Iterable[Any]) -> Mapping[Any, Any]:
+        keys = list(keys)
+        values = await self._get_many_async(
+            [self._encode_key(key) for key in keys])
+        return {
+            key: self._decode_value(value)
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    async def set_async(self, key: Any, value: Any) -> None:
+        await self._set_async(
+            self._encode_key(key), self._encode_value(value))
+
+    async def del_async(self, key: Any) -> None:
+        await self._del_async(self._encode_key(key))
+
     def __getitem__(self, key: Any) -> Any:
         value = self._get(self._encode_key(key))
         if value is None:
@@ -0,0 +1,82 @@
+"""Storage for table checkpoints.
+
+Checkpoints are directories created by the RocksDB store,
+see :setting:`table_checkpoint_interval`.  A checkpoint store
+makes them available to other workers recovering the same partitions.
+"""
+import abc
+import shutil
+from pathlib import Path
+from typing import Type, Union
+from mode.utils.imports import FactoryMapping
+from yarl import URL
+
+__all__ = [
+    'CheckpointStore',
+    'FileCheckpointStore',
+    'by_name',
+    'by_url',
+]
+
+
+class CheckpointStore(abc.ABC):
+    """Base class for checkpoint storage.
+
+    The methods are blocking and called from the store I/O threads.
+    """
+
+    url: URL
+
+    def __init__(self, url: Union[str, URL]) -> None:
+        self.url = URL(url)
+
+    @abc.abstractmethod
+    def upload(self, name: str, path: Path) -> None:
+        """Upload checkpoint directory, replacing previous checkpoint."""
+        ...
+
+    @abc.abstractmethod
+    def download(self, name: str, path: Path) -> bool:
+        """Download checkpoint into directory.
+
+        Returns:
+            bool: :const:`False` if there is no checkpoint by that name.
+        """
+        ...
+
+
+class FileCheckpointStore(CheckpointStore):
+    """Store checkpoints in a directory (e.g. network file system mount)."""
+
+    @property
+    def root(self) -> Path:
+        return Path(self.url.path)
+
+    def upload(self, name: str, path: Path) -> None:
+        target = self.root / name
+        tmp = target.with_name(f'{target.name}.tmp')
+        old = target.with_name(f'{target.name}.old')
+        shutil.rmtree(str(tmp), ignore_errors=True)
+        shutil.copytree(str(path), str(tmp))
+        # replace in two steps, so there is always a complete copy.
+        if target.exists():
+            shutil.rmtree(str(old), ignore_errors=True)
+            target.rename(old)
+        tmp.rename(target)
+        shutil.rmtree(str(old), ignore_errors=True)
+
+    def download(self, name: str, path: Path) -> bool:
+        source = self.root / name
+        if not source.exists():
+            return False
+        shutil.rmtree(str(path), ignore_errors=True)
+        shutil.copytree(str(source), str(path))
+        return True
+
+
+CHECKPOINT_STORES: FactoryMapping[Type[CheckpointStore]] = FactoryMapping(
+    file='faust.stores.checkpoints:FileCheckpointStore',
+)
+CHECKPOINT_STORES.include_setuptools_namespace('faust.checkpoints')
+by_name = CHECKPOINT_STORES.by_name
+by_url = CHECKPOINT_STORES.by_url
@@ -2,22 +2,184 @@
 from typing import (
     Any,
     Callable,
+    Dict,
     Iterable,
+    Iterator,
+    Mapping,
     MutableMapping,
     Optional,
     Set,
     Tuple,
 )
 from mode.utils.collections import FastUserDict
-from faust.types import EventT, TP
+from faust.streams import current_event
+from faust.types import CollectionT, EventT, TP, WindowRange
 from . import base
 
+#: Keys set and keys deleted by a changelog batch for one partition.
+PartitionBatch = Tuple[Dict[Any, Any], Set[Any]]
+
+
+class PartitionedData(MutableMapping):
+    """Mapping keeping one dictionary for every partition.
+
+    Keys are stored in the partition of the event being processed
+    (which is also the partition the changelog entry is written to),
+    and an index of key to partition is kept for lookups.
+    This way all keys in a partition can be dropped at once
+    when the partition is no longer assigned to us.
+    """
+
+    def __init__(self) -> None:
+        self.partitions: Dict[int, Dict[Any, Any]] = {}
+        self.key_index: Dict[Any, int] = {}
+        #: Windows of every key, for windowed tables (see index_windows).
+        self.windows: Optional[Dict[Any, Set[Tuple[float, float]]]] = None
+
+    def index_windows(self) -> None:
+        """Keep index of windows by key, keys being (key, window_range)."""
+        if self.windows is None:
+            self.windows = {}
+            for key in self.key_index:
+                self._index_window(key)
+
+    def for_partition(self, partition: int) -> Dict[Any, Any]:
+        try:
+            return self.partitions[partition]
+        except KeyError:
+            data = self.partitions[partition] = {}
+            return data
+
+    def set_for_partition(self, partition: int, key: Any, value: Any) -> None:
+        self._move_key(key, partition)
+        self.for_partition(partition)[key] = value
+        self.key_index[key] = partition
+        if self.windows is not None:
+            self._index_window(key)
+
+    def apply_batch(self, partition: int, batch: PartitionBatch) -> None:
+        to_set, to_delete = batch
+        for key in to_set:
+            self._move_key(key, partition)
+        self.for_partition(partition).update(to_set)
+        self.key_index.update(dict.fromkeys(to_set, partition))
+        if self.windows is not None:
+            for key in to_set:
+                self._index_window(key)
+        for key in to_delete:
+            self.pop(key, None)
+
+    def drop_partition(self, partition: int) -> int:
+        """Remove all keys in partition, returning the number removed."""
+        data = self.partitions.pop(partition, None)
+        if not data:
+            return 0
+        key_index = self.key_index
+        for key in data:
+            del key_index[key]
+        if self.windows is not None:
+            for key in data:
+                self._unindex_window(key)
+        return len(data)
+
+    def sizes(self) -> Mapping[int, int]:
+        return {
+            partition: len(data)
+            for partition, data in self.partitions.items()
+        }
+
+    def _move_key(self, key: Any, partition: int) -> None:
+        # keys are only moved when written to from another partition,
+        # e.g. a stream that is not co-partitioned with the table.
+        owner = self.key_index.get(key)
+        if owner is not None and owner != partition:
+            del self.partitions[owner][key]
+
+    def _index_window(self, key: Any) -> None:
+        k, (start, end) = key
+        windows = self.windows
+        assert windows is not None
+        try:
+            windows[k].add((start, end))
+        except KeyError:
+            windows[k] = {(start, end)}
+
+    def _unindex_window(self, key: Any) -> None:
+        k, (start, end) = key
+        windows = self.windows
+        assert windows is not None
+        key_windows = windows[k]
+        key_windows.discard((start, end))
+        if not key_windows:
+            del windows[k]
+
+    def _partition_for_key(self, key: Any) -> int:
+        event = current_event()
+        if event is not None:
+            return event.message.partition
+        return self.key_index.get(key, 0)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.partitions[self.key_index[key]][key]
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        self.set_for_partition(self._partition_for_key(key), key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        del self.partitions[self.key_index.pop(key)][key]
+        if self.windows is not None:
+            self._unindex_window(key)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self.key_index
+
+    def __iter__(self) -> Iterator:
+        return iter(self.key_index)
+
+    def __len__(self) -> int:
+        return len(self.key_index)
+
+    def clear(self) -> None:
+        self.partitions.clear()
+        self.key_index.clear()
+        if self.windows is not None:
+            self.windows.clear()
+
 
 class Store(base.Store, FastUserDict):
-    """Table storage using an in-memory dictionary."""
+    """Table storage using an in-memory dictionary for every partition."""
 
     def on_init(self) -> None:
-        self.data: MutableMapping = {}
+        self.data: PartitionedData = PartitionedData()
+
+    @property
+    def windowed(self) -> bool:
+        return self.data.windows is not None
+
+    @windowed.setter
+    def windowed(self, windowed: bool) -> None:
+        if windowed:
+            self.data.index_windows()
+
+    def iterwindows(self, key: Any,
+                    start: float = None,
+                    end: float = None,
+                    *,
+                    reverse: bool = False) -> Iterator[Tuple[Any, Any]]:
+        windows = self.data.windows
+        if windows is None:
+            return super().iterwindows(key, start, end, reverse=reverse)
+        ranges = sorted(
+            (window_range for window_range in windows.get(key, ())
+             if (start is None or window_range[0] >= start) and
+             (end is None or window_range[0] <= end)),
+            reverse=reverse,
+        )
+        data = self.data
+        return iter([
+            (WindowRange(*window_range), data[key, window_range])
+            for window_range in ranges
+        ])
 
     def _clear(self) -> None:
         self.data.clear()
@@ -25,32 +187,73 @@ class Store(base.Store, FastUserDict):
     def apply_changelog_batch(self, batch: Iterable[EventT],
                               to_key: Callable[[Any], Any],
                               to_value: Callable[[Any], Any]) -> None:
-        # default store does not do serialization, so we need
-        # to convert these raw json serialized keys to proper structures
-        # (E.g. regenerate tuples in WindowedKeys etc).
-        to_delete: Set[Any] = set()
-        delete_key = self.data.pop
-        self.data.update(self._create_batch_iterator(
-            to_delete.add, to_key, to_value, batch))
-        for key in to_delete:
-            delete_key(key, None)
+        apply_batch = self.data.apply_batch
+        for partition, partition_batch in self._changelog_batches(
+                batch, to_key, to_value).items():
+            apply_batch(partition, partition_batch)
+            self._index_expiry(partition_batch[0], partition)
 
-    def _create_batch_iterator(
+    def set_many(self, items: Iterable[Tuple[Any, Any]],
+                 partition: int) -> None:
+        to_set = dict(items)
+        self.data.apply_batch(partition, (to_set, set()))
+        self._index_expiry(to_set, partition)
+
+    def _changelog_batches(
             self,
-            mark_as_delete: Callable[[Any], None],
+            batch: Iterable[EventT],
             to_key: Callable[[Any], Any],
-            to_value: Callable[[Any], Any],
-            batch: Iterable[EventT]) -> Iterable[Tuple[Any, Any]]:
+            to_value: Callable[[Any], Any]) -> Mapping[int, PartitionBatch]:
+        # default store does not do serialization, so we need
+        # to convert these raw json serialized keys to proper structures
+        # (E.g. regenerate tuples in WindowedKeys etc).
+        batches: Dict[int, PartitionBatch] = {}
         for event in batch:
+            partition = event.message.partition
+            try:
+                to_set, to_delete = batches[partition]
+            except KeyError:
+                to_set, to_delete = batches[partition] = ({}, set())
             key = to_key(event.key)
             # to delete keys in the table we set the raw value to None
             if event.message.value is None:
-                mark_as_delete(key)
-                continue
-            yield key, to_value(event.value)
+                to_set.pop(key, None)
+                to_delete.add(key)
+            else:
+                to_delete.discard(key)
+                to_set[key] = to_value(event.value)
+        return batches
 
     def persisted_offset(self, tp: TP) -> Optional[int]:
         return None
 
     def reset_state(self) -> None:
         ...
+
+    def partition_sizes(self) -> Mapping[int, int]:
+        """Return the number of keys stored for every partition."""
+        return self.data.sizes()
+
+    async def on_partitions_assigned(self, table: CollectionT,
+                                     assigned: Set[TP]) -> None:
+        # All partitions are revoked in an eager rebalance, so data is
+        # only dropped here for partitions we did not get back.
+        # Standby partitions are in the assignment too.
+        assignor = self.app.assignor
+        topic = table.changelog_topic.get_topic_name()
+        owned_tps = assignor.assigned_actives() | assignor.assigned_standbys()
+        owned = {tp.partition for tp in owned_tps if tp.topic == topic}
+        dropped = set(self.data.partitions) - owned
+        for partition in dropped:
+            self.data.drop_partition(partition)
+            self._expiry_buckets.pop(partition, None)
+        if dropped:
+            # what the changelog reader read before is gone now.
+            self.app.tables.reset_offsets(
+                TP(topic, partition) for partition in dropped)
+            self.log.info('Dropped data for partitions no longer '
+                          'assigned: %r', sorted(dropped))
+        self.app.sensors.on_store_stats(
+            f'memory.{self.table_name}',
+            {f'size.{partition}': size
+             for partition, size in self.partition_sizes().items()})
@@ -1,42 +1,90 @@
 """RocksDB storage."""
+import asyncio
+import heapq
 import math
 import shutil
+import statistics
 import typing
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import suppress
+from operator import itemgetter
 from pathlib import Path
+from time import monotonic
 from typing import (
     Any,
     Callable,
+    ClassVar,
     DefaultDict,
+    Deque,
     Dict,
     Iterable,
     Iterator,
+    List,
     Mapping,
     MutableMapping,
     NamedTuple,
     Optional,
     Set,
     Tuple,
+    TypeVar,
     Union,
     cast,
 )
+from weakref import WeakKeyDictionary
 
+from mode import Service
 from mode.utils.collections import LRUCache
 from yarl import URL
 
 from faust.exceptions import ImproperlyConfigured
 from faust.streams import current_event
-from faust.types import AppT, CollectionT, EventT, TP
+from faust.types import (
+    AppT,
+    CollectionT,
+    EventT,
+    Message,
+    TP,
+    WindowRange,
+)
 from faust.utils import platforms
 
 from . import base
+from . import checkpoints
+from .base import decode_timestamp, encode_timestamp
 
 _max_open_files = platforms.max_open_files()
 if _max_open_files is not None:
     _max_open_files = math.ceil(_max_open_files * 0.90)
 DEFAULT_MAX_OPEN_FILES = _max_open_files
 
+#: Fraction of :setting:`table_memory_budget` reserved for write buffers
+#: (memtables), the rest is shared by the block caches.
+WRITE_BUFFER_RATIO = 0.25
+
+#: Fraction of the block cache budget used for compressed blocks.
+COMPRESSED_CACHE_RATIO = 0.2
+
+#: Write buffers are never made smaller than this (4 MiB).
+MIN_WRITE_BUFFER_SIZE = 4 * 1024 ** 2
+
+#: Name of file in checkpoint directories storing the changelog offset.
+CHECKPOINT_OFFSET_FILE = 'OFFSET'
+
+#: Number of threads used for blocking RocksDB operations.
+IO_THREADS = 4
+
+#: Number of latency values to keep for every type of operation.
+MAX_LATENCY_HISTORY = 100
+
+#: Version of the format of partition databases, stored in the database.
+#: Version 2 stores the keys of windowed tables sorted by window
+#: (see :meth:`faust.stores.base.SerializedStore._encode_key`),
+#: databases without a version have windowed keys stored as JSON.
+FORMAT_VERSION = 2
+
+T = TypeVar('T')
+
 try:
     import rocksdb
 except ImportError:
@@ -100,38 +148,299 @@ class RocksDBOptions:
             self.block_cache_compressed_size = block_cache_compressed_size
         self.extra_options = kwargs
 
-    def open(self, path: Path, *, read_only: bool = False) -> DB:
-        return rocksdb.DB(str(path), self.as_options(), read_only=read_only)
+    def open(self, path: Path, *,
+             read_only: bool = False,
+             resources: 'RocksDBResources' = None) -> DB:
+        return rocksdb.DB(
+            str(path), self.as_options(resources), read_only=read_only)
 
-    def as_options(self) -> Options:
+    def as_options(self, resources: 'RocksDBResources' = None) -> Options:
+        if resources is not None:
+            write_buffer_size = resources.write_buffer_size_for(self)
+            block_cache = resources.block_cache
+            block_cache_compressed = resources.block_cache_compressed
+        else:
+            write_buffer_size = self.write_buffer_size
+            block_cache = rocksdb.LRUCache(self.block_cache_size)
+            block_cache_compressed = rocksdb.LRUCache(
+                self.block_cache_compressed_size)
         return rocksdb.Options(
             create_if_missing=True,
             max_open_files=self.max_open_files,
-            write_buffer_size=self.write_buffer_size,
+            write_buffer_size=write_buffer_size,
             max_write_buffer_number=self.max_write_buffer_number,
             target_file_size_base=self.target_file_size_base,
             table_factory=rocksdb.BlockBasedTableFactory(
                 filter_policy=rocksdb.BloomFilterPolicy(
                     self.bloom_filter_size),
-                block_cache=rocksdb.LRUCache(self.block_cache_size),
-                block_cache_compressed=rocksdb.LRUCache(
-                    self.block_cache_compressed_size),
+                block_cache=block_cache,
+                block_cache_compressed=block_cache_compressed,
             ),
             **self.extra_options)
 
 
+class RocksDBResources(Service):
+    """Process-wide RocksDB resources shared by all partition databases.
+
+    Every :class:`Store` opens one database per partition, so if every
+    database had its own block cache and write buffers, memory usage would
+    grow with the number of partitions assigned to the worker.
+
+    Instead the block cache (and compressed block cache) is shared
+    by every database in the process, and the write buffers are sized
+    from the same memory budget (:setting:`table_memory_budget`).
+
+    Notes:
+        :pypi:`python-rocksdb` does not expose RocksDB's
+        ``WriteBufferManager`` or ``RateLimiter``, so the write buffer
+        budget is enforced by dividing it between the partition databases
+        assigned to this worker at the time each database is opened.
+    """
+
+    _instances: ClassVar[MutableMapping[AppT, 'RocksDBResources']]
+    _instances = WeakKeyDictionary()
+
+    #: Total memory budget in bytes, or :const:`None` to use the sizes
+    #: from :class:`RocksDBOptions`.
+    memory_budget: Optional[int]
+
+    #: Write buffer budget in bytes shared by all databases,
+    #: :const:`None` if there's no memory budget.
+    write_buffer_budget: Optional[int]
+
+    block_cache_size: int
+    block_cache_compressed_size: int
+
+    #: Number of reads served from memory (memtable or block cache).
+    cache_hits: int = 0
+
+    #: Number of reads that had to go to disk.
+    cache_misses: int = 0
+
+    #: How often we send stats to the sensors (in seconds).
+    stats_interval: float = 10.0
+
+    #: Number of threads used for blocking operations.
+    io_threads: int = IO_THREADS
+
+    _dbs: Set[DB]
+    _executors: List[ThreadPoolExecutor]
+    _latency: DefaultDict[str, Deque[float]]
+
+    @classmethod
+    def for_app(cls, app: AppT) -> 'RocksDBResources':
+        """Return the resources shared by all stores in this process.
+
+        The resources are owned by the table manager, and stopped
+        only after all tables (and their stores) are stopped.
+        """
+        try:
+            return cls._instances[app]
+        except KeyError:
+            resources = cls._instances[app] = cls(app, loop=app.loop)
+            app.tables.add_dependency(resources)
+            return resources
+
+    def __init__(self,
+                 app: AppT,
+                 *,
+                 memory_budget: int = None,
+                 options: RocksDBOptions = None,
+                 io_threads: int = None,
+                 **kwargs: Any) -> None:
+        self.app = app
+        if io_threads is not None:
+            self.io_threads = io_threads
+        if memory_budget is None:
+            memory_budget = app.conf.table_memory_budget
+        self.memory_budget = memory_budget
+        if memory_budget:
+            write_buffer_budget = int(memory_budget * WRITE_BUFFER_RATIO)
+            cache_budget = memory_budget - write_buffer_budget
+            compressed_size = int(cache_budget * COMPRESSED_CACHE_RATIO)
+            self.write_buffer_budget = write_buffer_budget
+            self.block_cache_size = cache_budget - compressed_size
+            self.block_cache_compressed_size = compressed_size
+        else:
+            options = options or RocksDBOptions()
+            self.write_buffer_budget = None
+            self.block_cache_size = options.block_cache_size
+            self.block_cache_compressed_size = (
+                options.block_cache_compressed_size)
+        self.block_cache = rocksdb.LRUCache(self.block_cache_size)
+        self.block_cache_compressed = rocksdb.LRUCache(
+            self.block_cache_compressed_size)
+        self._dbs = set()
+        self._executors = []
+        self._latency = defaultdict(
+            lambda: deque(maxlen=MAX_LATENCY_HISTORY))
+        super().__init__(**kwargs)
+
+    async def on_stop(self) -> None:
+        # wait for pending writes to complete, in a separate thread
+        # so that the event loop is not blocked meanwhile.
+        executors, self._executors = self._executors, []
+        if executors:
+            await self.loop.run_in_executor(
+                None, self._shutdown_executors, executors)
+
+    def _shutdown_executors(self, executors: List[ThreadPoolExecutor]) -> None:
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+    def executor_for(self, partition: int) -> ThreadPoolExecutor:
+        # Every partition is always handled by the same single-threaded
+        # executor, so operations on a partition complete in the
+        # order they were submitted.
+        if not self._executors:
+            self._executors.extend(
+                ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix=f'rocksdb-io-{i}',
+                )
+                for i in range(self.io_threads)
+            )
+        return self._executors[partition % len(self._executors)]
+
+    def submit(self, partition: int,
+               fun: Callable[..., T], *args: Any) -> Future:
+        """Submit blocking operation on partition to the I/O thread pool."""
+        return self.executor_for(partition).submit(fun, *args)
+
+    async def run(self, op: str, partition: int,
+                  fun: Callable[..., T], *args: Any) -> T:
+        """Run blocking operation on partition in the I/O thread pool."""
+        return await self.wait(op, self.submit(partition, fun, *args))
+
+    async def wait(self, op: str, future: Future) -> T:
+        """Wait for operation submitted to the I/O thread pool."""
+        time_start = monotonic()
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            self._latency[op].append(monotonic() - time_start)
+
+    def add_db(self, db: DB) -> None:
+        self._dbs.add(db)
+
+    def remove_db(self, db: DB) -> None:
+        self._dbs.discard(db)
+
+    def write_buffer_size_for(self, options: RocksDBOptions) -> int:
+        """Return write buffer size to use for new database."""
+        if self.write_buffer_budget is None:
+            return options.write_buffer_size
+        per_db = self.write_buffer_budget // (
+            options.max_write_buffer_number * self._expected_dbs())
+        return max(min(per_db, options.write_buffer_size),
+                   MIN_WRITE_BUFFER_SIZE)
+
+    def _expected_dbs(self) -> int:
+        # One database for every changelog partition assigned to us,
+        # active or standby.
+        assignor = self.app.assignor
+        changelog_topics = self.app.tables.changelog_topics
+        assigned = assignor.assigned_actives() | assignor.assigned_standbys()
+        return max(
+            sum(1 for tp in assigned if tp.topic in changelog_topics),
+            len(self._dbs) + 1,
+        )
+
+    def get(self, db: DB, key: bytes) -> Optional[bytes]:
+        """Read key from database, recording cache hits and misses."""
+        # bloom filter: false positives possible, but not false negatives
+        may_exist, value = db.key_may_exist(key, fetch=True)
+        if not may_exist:
+            return None
+        if value is not None:
+            # found in memtable or block cache
+            self.cache_hits += 1
+            return value
+        self.cache_misses += 1
+        return db.get(key)
+
+    def stats(self) -> Mapping[str, float]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            'memory_budget': self.memory_budget or 0,
+            'open_dbs': len(self._dbs),
+            'block_cache_capacity': self.block_cache_size,
+            'block_cache_usage': self._max_property(
+                b'rocksdb.block-cache-usage'),
+            'memtable_usage': self._sum_property(
+                b'rocksdb.cur-size-all-mem-tables'),
+            'table_readers_usage': self._sum_property(
+                b'rocksdb.estimate-table-readers-mem'),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_hit_rate': self.cache_hits / lookups if lookups else 0.0,
+            **{f'{op}_latency': statistics.median(latency)
+               for op, latency in self._latency.items() if latency},
+        }
+
+    def _int_properties(self, prop: bytes) -> Iterator[int]:
+        for db in list(self._dbs):
+            value = db.get_property(prop)
+            if value is not None:
+                yield int(value)
+
+    def _sum_property(self, prop: bytes) -> int:
+        return sum(self._int_properties(prop))
+
+    def _max_property(self, prop: bytes) -> int:
+        # The block cache is shared, so every database reports the
+        # same usage.
+        return max(self._int_properties(prop), default=0)
+
+    @Service.task
+    async def _report_stats(self) -> None:
+        while not self.should_stop:
+            await self.sleep(self.stats_interval)
+            self.app.sensors.on_store_stats('rocksdb', self.stats())
+
+
 class Store(base.SerializedStore):
     """RocksDB table storage."""
 
     offset_key = b'__faust\0offset__'
 
+    #: Key storing the format version of the database (FORMAT_VERSION).
+    format_key = b'__faust\0format__'
+
+    #: Prefix of the index of keys by the time they expire at,
+    #: kept in the partition database next to the data.
+    #: Keys have the expiry time in milliseconds encoded as a big endian
+    #: integer after the prefix, so entries are sorted by time.
+    expiry_prefix = b'__faust\0expires__'
+
     #: Decides the size of the K=>TopicPartition index (10_000).
     key_index_size: int
 
     #: Used to configure the RocksDB settings for table stores.
     options: RocksDBOptions
 
+    #: Block cache and write buffer budget shared by all stores.
+    resources: RocksDBResources
+
+    #: Total time (in seconds) spent retrying to open locked databases
+    #: after partitions are assigned.
+    open_retry_budget: float = 30.0
+
+    #: Where checkpoints are uploaded to (:setting:`table_checkpoint_url`).
+    checkpoint_store: Optional[checkpoints.CheckpointStore] = None
+
+    #: Initial time to wait before retrying to open a locked database,
+    #: doubled for every retry up to :attr:`open_retry_backoff_max`.
+    open_retry_backoff: float = 0.1
+    open_retry_backoff_max: float = 2.0
+
+    #: Partition databases, only ever modified by the event loop thread
+    #: (the I/O threads may be iterating over them).
     _dbs: MutableMapping[int, DB]
+
+    #: Databases currently being opened in the I/O thread pool.
+    _opening: MutableMapping[int, Future]
+
     _key_index: LRUCache[bytes, int]
 
     def __init__(self,
@@ -148,23 +457,42 @@ class Store(base.SerializedStore):
         if not self.url.path:
             self.url /= self.table_name
         self.options = RocksDBOptions(**options or {})
+        self.resources = RocksDBResources.for_app(app)
+        checkpoint_url = app.conf.table_checkpoint_url
+        if checkpoint_url:
+            self.checkpoint_store = checkpoints.by_url(checkpoint_url)(
+                checkpoint_url)
         self.key_index_size = key_index_size
         self._dbs = {}
-        self._key_index = LRUCache(limit=self.key_index_size)
+        self._opening = {}
+        # the key index is also accessed by the I/O threads.
+        self._key_index = LRUCache(
+            limit=self.key_index_size, thread_safety=True)
+
+    async def on_start(self) -> None:
+        # shared by all stores, so may already be started.
+        await self.resources.maybe_start()
 
     def persisted_offset(self, tp: TP) -> Optional[int]:
-        offset = self._db_for_partition(tp.partition).get(self.offset_key)
+        return self._persisted_offset(self._db_for_partition(tp.partition))
+
+    def persisted_offset_if_open(self, tp: TP) -> Optional[int]:
+        db = self._dbs.get(tp.partition)
+        return self._persisted_offset(db) if db is not None else None
+
+    def _persisted_offset(self, db: DB) -> Optional[int]:
+        offset = db.get(self.offset_key)
         if offset:
             return int(offset)
         return None
 
     def set_persisted_offset(self, tp: TP, offset: int) -> None:
-        self._db_for_partition(tp.partition).put(
-            self.offset_key, str(offset).encode())
+        self._run_sync(tp.partition, self._db_for_partition(tp.partition).put,
+                       self.offset_key, str(offset).encode())
 
     async def need_active_standby_for(self, tp: TP) -> bool:
         try:
-            self._db_for_partition(tp.partition)
+            await self._db_for_partition_async(tp.partition)
         except rocksdb.errors.RocksIOError as exc:
             if 'lock' not in repr(exc):
                 raise
@@ -176,57 +504,375 @@ class Store(base.SerializedStore):
                               batch: Iterable[EventT],
                               to_key: Callable[[Any], Any],
                               to_value: Callable[[Any], Any]) -> None:
+        self._apply_changelog_entries(
+            self._event_entries(batch, to_key, to_value))
+
+    async def apply_changelog_batch_async(
+            self, batch: Iterable[EventT],
+            to_key: Callable[[Any], Any],
+            to_value: Callable[[Any], Any]) -> None:
+        await self._apply_changelog_entries_async(
+            self._event_entries(batch, to_key, to_value))
+
+    def apply_raw_changelog_batch(self, batch: Iterable[Message]) -> None:
+        self._apply_changelog_entries(self._message_entries(batch))
+
+    async def apply_raw_changelog_batch_async(
+            self, batch: Iterable[Message]) -> None:
+        await self._apply_changelog_entries_async(
+            self._message_entries(batch))
+
+    def _apply_changelog_entries(
+            self, entries: Iterable[base.ChangelogEntry]) -> None:
+        # Partitions are written in parallel, see _run_sync.
+        submit = self.resources.submit
+        futures = [
+            submit(partition,
+                   self._db_for_partition(partition).write, write_batch)
+            for partition, write_batch in self._changelog_batches(entries)
+        ]
+        for future in futures:
+            future.result()
+
+    async def _apply_changelog_entries_async(
+            self, entries: Iterable[base.ChangelogEntry]) -> None:
+        # Partitions are written in parallel, every partition
+        # in the executor that owns it.
+        # Shielded: the offsets for the batch are already recorded,
+        # so the writes must complete even if we are cancelled.
+        await asyncio.shield(asyncio.gather(*[
+            self._write_batch_async(partition, write_batch)
+            for partition, write_batch in self._changelog_batches(entries)
+        ], loop=self.loop), loop=self.loop)
+
+    async def _write_batch_async(self, partition: int, batch: Any) -> None:
+        db = await self._db_for_partition_async(partition)
+        await self.resources.run('write', partition, db.write, batch)
+
+    def _changelog_batches(
+            self,
+            entries: Iterable[base.ChangelogEntry],
+    ) -> Iterator[Tuple[int, Any]]:
         batches: DefaultDict[int, rocksdb.WriteBatch]
         batches = defaultdict(rocksdb.WriteBatch)
         tp_offsets: Dict[TP, int] = {}
-        for event in batch:
-            tp, offset = event.message.tp, event.message.offset
+        key_expires = self.key_expires
+        for msg, key, value in entries:
+            tp, offset = msg.tp, msg.offset
             tp_offsets[tp] = (
                 offset if tp not in tp_offsets
                 else max(offset, tp_offsets[tp])
             )
-            msg = event.message
-            if msg.value is None:
-                batches[msg.partition].delete(msg.key)
+            if key is None:
+                continue  # not written by a table.
+            if value is None:
+                batches[msg.partition].delete(key)
             else:
-                batches[msg.partition].put(msg.key, msg.value)
-
-        for partition, batch in batches.items():
-            self._db_for_partition(partition).write(batch)
+                batches[msg.partition].put(key, value)
+                if key_expires is not None:
+                    expires = key_expires(self._decode_key(key))
+                    batches[msg.partition].put(
+                        self._expiry_key(key, expires), b'')
 
+        # The offset is written in the same batch as the data,
+        # so they are always consistent.
         for tp, offset in tp_offsets.items():
-            self.set_persisted_offset(tp, offset)
+            batches[tp.partition].put(self.offset_key, str(offset).encode())
+        return iter(batches.items())
+
+    def set_many(self, items: Iterable[Tuple[Any, Any]],
+                 partition: int) -> None:
+        # The values and their expiry index are written in one batch.
+        key_expires = self.key_expires
+        key_index = self._key_index
+        write_batch = rocksdb.WriteBatch()
+        for key, value in items:
+            encoded_key = self._encode_key(key)
+            write_batch.put(encoded_key, self._encode_value(value))
+            if key_expires is not None:
+                write_batch.put(
+                    self._expiry_key(encoded_key, key_expires(key)), b'')
+            key_index[encoded_key] = partition
+        self._run_sync(
+            partition, self._db_for_partition(partition).write, write_batch)
+
+    def iterwindows(self, key: Any,
+                    start: float = None,
+                    end: float = None,
+                    *,
+                    reverse: bool = False) -> Iterator[Tuple[Any, Any]]:
+        # All windows of a key are stored next to each other,
+        # so this is one seek per database.  They are normally all in
+        # the same partition, but we merge in case the key moved.
+        prefix = self._window_key_prefix(key)
+        yield from heapq.merge(*[
+            self._iterwindows_db(db, prefix, start, end, reverse)
+            for db in self._dbs.values()
+        ], key=itemgetter(0), reverse=reverse)
+
+    def _iterwindows_db(self, db: DB, prefix: bytes,
+                        start: Optional[float],
+                        end: Optional[float],
+                        reverse: bool) -> Iterator[Tuple[Any, Any]]:
+        offset = len(prefix)
+        it = db.iteritems()  # noqa: B301
+        if reverse:
+            it = reversed(it)
+            # windows with the same start differ by the end timestamp.
+            it.seek_for_prev(
+                prefix + (encode_timestamp(end) if end is not None
+                          else b'\xff' * 8) + b'\xff' * 8)
+        else:
+            it.seek(prefix + (encode_timestamp(start)
+                              if start is not None else b''))
+        for key, value in it:
+            if not key.startswith(prefix):
+                break
+            window_start = decode_timestamp(key[offset:offset + 8])
+            if reverse and start is not None and window_start < start:
+                break
+            if not reverse and end is not None and window_start > end:
+                break
+            window_end = decode_timestamp(key[offset + 8:offset + 16])
+            yield (WindowRange(window_start, window_end),
+                   self._decode_value(value))
+
+    def set_expiry(self, key: Any, partition: int, timestamp: float) -> None:
+        self._run_sync(
+            partition, self._db_for_partition(partition).put,
+            self._expiry_key(self._encode_key(key), timestamp), b'')
+
+    def expire(self, partition: int, before: float) -> int:
+        db = self._dbs.get(partition)
+        if db is None:
+            return 0
+        return self._expire_db(db, before)
+
+    async def expire_async(self, partition: int, before: float) -> int:
+        db = self._dbs.get(partition)
+        if db is None:
+            return 0
+        return await self.resources.run(
+            'expire', partition, self._expire_db, db, before)
+
+    def _expire_db(self, db: DB, before: float) -> int:
+        prefix = self.expiry_prefix
+        offset = len(prefix) + 8
+        # index keys sorting before this expire at or before `before`.
+        end = prefix + (int(before * 1000) + 1).to_bytes(8, 'big')
+        write_batch = rocksdb.WriteBatch()
+        expired = 0
+        it = db.iterkeys()  # noqa: B301
+        it.seek(prefix)
+        for index_key in it:
+            if index_key >= end:
+                break
+            write_batch.delete(index_key[offset:])
+            write_batch.delete(index_key)
+            expired += 1
+        if expired:
+            # the data and the index are deleted in one atomic write.
+            db.write(write_batch)
+        return expired
+
+    def _expiry_key(self, key: bytes, timestamp: float) -> bytes:
+        return (self.expiry_prefix +
+                int(timestamp * 1000).to_bytes(8, 'big') +
+                key)
 
     def _set(self, key: bytes, value: Optional[bytes]) -> None:
-        event = current_event()
-        assert event is not None
-        partition = event.message.partition
+        self._set_for_partition(self._current_partition(), key, value)
+
+    async def _set_async(self, key: bytes, value: Optional[bytes]) -> None:
+        partition = self._current_partition()
+        db = await self._db_for_partition_async(partition)
+        self._key_index[key] = partition
+        await self.resources.run('put', partition, db.put, key, value)
+
+    def _set_for_partition(self, partition: int,
+                           key: bytes, value: Optional[bytes]) -> None:
         db = self._db_for_partition(partition)
         self._key_index[key] = partition
-        db.put(key, value)
+        self._run_sync(partition, db.put, key, value)
+
+    def _run_sync(self, partition: int,
+                  fun: Callable[..., T], *args: Any) -> T:
+        # Writes from synchronous table operations block, but still
+        # run in the executor of the partition, so they cannot be
+        # reordered with asynchronous writes already in progress.
+        return self.resources.submit(partition, fun, *args).result()
+
+    def _current_partition(self) -> int:
+        event = current_event()
+        assert event is not None
+        return event.message.partition
+
+    def _partition_for_key(self, key: bytes) -> int:
+        # The executor to use when reading a key: the partition
+        # it was last seen in, or the partition of the current event.
+        try:
+            return self._key_index[key]
+        except KeyError:
+            event = current_event()
+            return event.message.partition if event is not None else 0
+
+    async def _get_async(self, key: bytes) -> Optional[bytes]:
+        return await self.resources.run(
+            'get', self._partition_for_key(key), self._get, key)
+
+    async def _get_many_async(
+            self, keys: List[bytes]) -> List[Optional[bytes]]:
+        # one trip to the I/O thread for all the keys.
+        if not keys:
+            return []
+        return await self.resources.run(
+            'get_many', self._partition_for_key(keys[0]),
+            self._get_many, keys)
+
+    def _get_many(self, keys: List[bytes]) -> List[Optional[bytes]]:
+        get = self._get
+        return [get(key) for key in keys]
 
     def _db_for_partition(self, partition: int) -> DB:
+        # Must be called by the event loop thread.
+        try:
+            return self._dbs[partition]
+        except KeyError:
+            opening = self._opening.get(partition)
+            if opening is not None:
+                # Being opened in the I/O thread pool: we cannot open
+                # the database twice, and must not block the event loop
+                # waiting for it.
+                if not opening.done():
+                    raise RuntimeError(
+                        f'Database for partition {partition} of table '
+                        f'{self.table_name} is still being opened')
+                return self._add_db(partition, opening.result())
+            return self._add_db(
+                partition, self._open_for_partition(partition))
+
+    async def _db_for_partition_async(self, partition: int) -> DB:
         try:
             return self._dbs[partition]
         except KeyError:
-            db = self._dbs[partition] = self._open_for_partition(partition)
-            return db
+            future = self._opening.get(partition)
+            if future is None:
+                future = self._opening[partition] = self.resources.submit(
+                    partition, self._open_for_partition, partition)
+            try:
+                db: DB = await self.resources.wait('open', future)
+            finally:
+                if self._opening.get(partition) is future:
+                    del self._opening[partition]
+            return self._add_db(partition, db)
+
+    def _add_db(self, partition: int, db: DB) -> DB:
+        # The database may have been added while we were waiting for it.
+        db = self._dbs.setdefault(partition, db)
+        self.resources.add_db(db)
+        return db
 
     def _open_for_partition(self, partition: int) -> DB:
-        return self.options.open(self.partition_path(partition))
+        # Called by the I/O threads, so must not modify the store.
+        path = self.partition_path(partition)
+        if not path.exists():
+            # no local data: start from the latest checkpoint if any,
+            # so recovery only needs to read the changelog after it.
+            self._restore_checkpoint(partition)
+        db = self.options.open(path, resources=self.resources)
+        stored_version = db.get(self.format_key)
+        version = int(stored_version) if stored_version else None
+        if version is not None and version > FORMAT_VERSION:
+            self._close_db(db)
+            raise ImproperlyConfigured(
+                f'Database {path} has format version {version}, '
+                f'this version of Faust supports up to {FORMAT_VERSION}')
+        if version is None and self.windowed and not self._is_empty(db):
+            # Written by an older version of Faust, storing windowed
+            # keys as JSON: the keys cannot be decoded, so the database
+            # is removed (with its offset) and recovered from the changelog.
+            self.log.warn(
+                'Database %s has an old format: rebuilding it from the '
+                'changelog', path)
+            self._close_db(db)
+            del db
+            shutil.rmtree(path)
+            db = self.options.open(path, resources=self.resources)
+        if version != FORMAT_VERSION:
+            db.put(self.format_key, str(FORMAT_VERSION).encode())
+        return db
+
+    def _is_empty(self, db: DB) -> bool:
+        it = db.iterkeys()  # noqa: B301
+        it.seek_to_first()
+        return next(iter(it), None) is None
+
+    @Service.task
+    async def _checkpointer(self) -> None:
+        interval = self.app.conf.table_checkpoint_interval
+        if not interval:
+            return
+        while not self.should_stop:
+            await self.sleep(interval)
+            for partition in list(self._dbs):
+                await self.resources.run(
+                    'checkpoint', partition, self.checkpoint, partition)
+
+    def checkpoint(self, partition: int) -> None:
+        """Take checkpoint of partition database.
+
+        The checkpoint contains the changelog offset stored with the
+        data, recovery from it will continue at that offset.
+
+        Note:
+            This is blocking and should run in the I/O thread pool.
+        """
+        db = self._dbs.get(partition)
+        if db is None:
+            return
+        offset = db.get(self.offset_key)
+        if offset is None:
+            # no data recovered or written yet.
+            return
+        path = self.checkpoint_path(partition)
+        engine = rocksdb.BackupEngine(str(path))
+        engine.create_backup(db, flush_before_backup=True)
+        engine.purge_old_backups(1)
+        (path / CHECKPOINT_OFFSET_FILE).write_bytes(offset)
+        self.log.info('Checkpoint of partition %r at offset %s',
+                      partition, offset.decode())
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.upload(
+                self.checkpoint_name(partition), path)
+
+    def _restore_checkpoint(self, partition: int) -> Optional[int]:
+        path = self.checkpoint_path(partition)
+        if self.checkpoint_store is not None:
+            self.checkpoint_store.download(
+                self.checkpoint_name(partition), path)
+        offset_file = path / CHECKPOINT_OFFSET_FILE
+        if not offset_file.exists():
+            return None
+        db_path = str(self.partition_path(partition))
+        rocksdb.BackupEngine(str(path)).restore_latest_backup(
+            db_path, db_path)
+        offset = int(offset_file.read_bytes())
+        self.log.info('Restored partition %r from checkpoint at offset %r',
+                      partition, offset)
+        return offset
+
+    def checkpoint_name(self, partition: int) -> str:
+        return f'{self.app.conf.id}-{self.basename}-{partition}'
+
+    def checkpoint_path(self, partition: int) -> Path:
+        return self.with_suffix(
+            self.partition_path(partition), suffix='.checkpoint')
 
     def _get(self, key: bytes) -> Optional[bytes]:
         dbvalue = self._get_bucket_for_key(key)
         if dbvalue is None:
             return None
-        db, value = dbvalue
-
-        if value is None:
-            if db.key_may_exist(key)[0]:
-                value = db.get(key)
-                if value is not None:
-                    return value
-        return value
+        return dbvalue.value
 
     def _get_bucket_for_key(self, key: bytes) -> Optional[_DBValueTuple]:
         dbs: Iterable[PartitionDB]
@@ -234,30 +880,49 @@ class Store(base.SerializedStore):
             partition = self._key_index[key]
             dbs = [PartitionDB(partition, self._dbs[partition])]
         except KeyError:
-            dbs = cast(Iterable[PartitionDB], self._dbs.items())
+            dbs = cast(Iterable[PartitionDB], list(self._dbs.items()))
 
+        get = self.resources.get
         for partition, db in dbs:
-            if db.key_may_exist(key)[0]:
-                value = db.get(key)
-                if value is not None:
-                    self._key_index[key] = partition
-                    return _DBValueTuple(db, value)
+            value = get(db, key)
+            if value is not None:
+                self._key_index[key] = partition
+                return _DBValueTuple(db, value)
         return None
 
     def _del(self, key: bytes) -> None:
-        for db in self._dbs_for_key(key):
-            db.delete(key)
+        submit = self.resources.submit
+        futures = [
+            submit(partition, self._dbs[partition].delete, key)
+            for partition in self._partitions_for_key(key)
+        ]
+        for future in futures:
+            future.result()
+
+    async def _del_async(self, key: bytes) -> None:
+        partitions = self._partitions_for_key(key)
+        run = self.resources.run
+        await asyncio.gather(*[
+            run('delete', partition, self._dbs[partition].delete, key)
+            for partition in partitions
+        ], loop=self.loop)
 
     async def on_partitions_revoked(self, table: CollectionT,
                                     revoked: Set[TP]) -> None:
-        for tp in revoked:
-            if tp.topic in table.changelog_topic.topics:
-                db = self._dbs.pop(tp.partition, None)
-                if db is not None:
-                    del(db)
-        import gc
-        gc.collect()  # XXX RocksDB has no .close() method :X
+        time_start = monotonic()
+        partitions = {
+            tp.partition for tp in revoked
+            if tp.topic in table.changelog_topic.topics
+        }
+        # Closed in the executor owning the partition, so that
+        # any pending operations for the partition complete first.
+        await asyncio.gather(*[
+            self._close_db_for_partition_async(partition)
+            for partition in partitions
+        ], loop=self.loop)
         self._key_index.clear()
+        self.log.info('Closed %r databases in %.3fs',
+                      len(partitions), monotonic() - time_start)
 
     async def on_partitions_assigned(self, table: CollectionT,
                                      assigned: Set[TP]) -> None:
@@ -265,36 +930,65 @@ class Store(base.SerializedStore):
         standby_tps = self.app.assignor.assigned_standbys()
         my_topics = table.changelog_topic.topics
 
-        for tp in assigned:
-            if tp.topic in my_topics and tp not in standby_tps:
-                for i in range(5):
-                    try:
-                        # side effect: opens db and adds to self._dbs.
-                        self._db_for_partition(tp.partition)
-                    except rocksdb.errors.RocksIOError as exc:
-                        if i == 4 or 'lock' not in repr(exc):
-                            raise
-                        self.log.info(
-                            'DB for partition %r is locked! Retry in 1s...',
-                            tp.partition)
-                        await self.sleep(1.0)
-                    else:
-                        break
+        partitions = {
+            tp.partition for tp in assigned
+            if tp.topic in my_topics and tp not in standby_tps
+        }
+        # All databases are opened concurrently, sharing one
+        # deadline for retrying databases that are still locked.
+        deadline = monotonic() + self.open_retry_budget
+        open_times = await asyncio.gather(*[
+            self._open_db(partition, deadline) for partition in partitions
+        ], loop=self.loop)
+        if open_times:
+            self.app.sensors.on_store_stats(
+                f'rocksdb.{self.table_name}',
+                {f'open_time.{partition}': open_time
+                 for partition, open_time in zip(partitions, open_times)})
+
+    async def _open_db(self, partition: int, deadline: float) -> float:
+        time_start = monotonic()
+        backoff = self.open_retry_backoff
+        while 1:
+            try:
+                # side effect: opens db and adds to self._dbs.
+                await self._db_for_partition_async(partition)
+            except rocksdb.errors.RocksIOError as exc:
+                if 'lock' not in repr(exc) or monotonic() + backoff > deadline:
+                    raise
+                self.log.info(
+                    'DB for partition %r is locked! Retry in %rs...',
+                    partition, backoff)
+                await self.sleep(backoff)
+                backoff = min(backoff * 2, self.open_retry_backoff_max)
+            else:
+                break
+        open_time = monotonic() - time_start
+        self.log.info('Opened DB for partition %r in %.3fs',
+                      partition, open_time)
+        return open_time
 
     def _contains(self, key: bytes) -> bool:
+        get = self.resources.get
         for db in self._dbs_for_key(key):
-            # bloom filter: false positives possible, but not false negatives
-            if db.key_may_exist(key)[0] and db.get(key) is not None:
+            if get(db, key) is not None:
                 return True
         return False
 
+    def _partitions_for_key(self, key: bytes) -> List[int]:
+        # Like _dbs_for_key, but returns the partitions.
+        partition = self._key_index.get(key)
+        if partition is not None and partition in self._dbs:
+            return [partition]
+        return list(self._dbs)
+
     def _dbs_for_key(self, key: bytes) -> Iterable[DB]:
         # Returns cached db if key is in index, otherwise all dbs
         # for linear search.
         try:
             return [self._dbs[self._key_index[key]]]
         except KeyError:
-            return self._dbs.values()
+            return list(self._dbs.values())
 
     def _size(self) -> int:
         return sum(self._size1(db) for db in self._dbs.values())
@@ -303,16 +997,20 @@ class Store(base.SerializedStore):
         it = db.iterkeys()  # noqa: B301
         it.seek_to_first()
         for key in it:
-            if key != self.offset_key:
+            if not self._is_internal_key(key):
                 yield key
 
     def _visible_items(self, db: DB) -> Iterator[Tuple[bytes, bytes]]:
         it = db.iteritems()  # noqa: B301
         it.seek_to_first()
         for key, value in it:
-            if key != self.offset_key:
+            if not self._is_internal_key(key):
                 yield key, value
 
+    def _is_internal_key(self, key: bytes) -> bool:
+        return (key == self.offset_key or key == self.format_key or
+                key.startswith(self.expiry_prefix))
+
     def _visible_values(self, db: DB) -> Iterator[bytes]:
         for _, value in self._visible_items(db):
             yield value
@@ -335,8 +1033,33 @@ class Store(base.SerializedStore):
     def _clear(self) -> None:
         raise NotImplementedError('TODO')  # XXX cannot reset tables
 
+    def _close_db_for_partition(self, partition: int) -> None:
+        db = self._remove_db(partition)
+        if db is not None:
+            self._close_db(db)
+
+    async def _close_db_for_partition_async(self, partition: int) -> None:
+        db = self._remove_db(partition)
+        if db is not None:
+            await self.resources.run('close', partition, self._close_db, db)
+
+    def _remove_db(self, partition: int) -> Optional[DB]:
+        db = self._dbs.pop(partition, None)
+        if db is not None:
+            self.resources.remove_db(db)
+        return db
+
+    def _close_db(self, db: DB) -> None:
+        close = getattr(db, 'close', None)
+        if close is not None:
+            close()
+        # Without a close method the handle and file lock are released
+        # when the DB object is deallocated: we hold the last reference
+        # to it, so this happens as soon as it goes out of scope.
+
     def reset_state(self) -> None:
-        self._dbs.clear()
+        for partition in list(self._dbs):
+            self._close_db_for_partition(partition)
         self._key_index.clear()
         with suppress(FileNotFoundError):
             shutil.rmtree(self.path.absolute())
@@ -1,19 +1,24 @@
 """Streams."""
 import asyncio
+import operator
 import reprlib
 import typing
 import weakref
 from asyncio import CancelledError
+from collections import deque
 from time import monotonic
 from typing import (
     Any,
     AsyncIterable,
     AsyncIterator,
     Callable,
+    Deque,
+    Dict,
     Iterable,
     Iterator,
     List,
     Mapping,
+    MutableMapping,
     MutableSequence,
     NamedTuple,
     Optional,
@@ -44,6 +49,7 @@ from .types.streams import (
     T_co,
     T_contra,
 )
+from .types.tables import CollectionT, WindowWrapperT
 from .types.topics import ChannelT
 from .types.tuples import Message
 
@@ -297,8 +303,8 @@ class Stream(StreamT[T_co], Service):
             if self.current_event is not None:
                 yield self.current_event
 
-    async def take(self, max_: int,
-                   within: Seconds) -> AsyncIterable[Sequence[T_co]]:
+    def take(self, max_: int,
+             within: Seconds) -> AsyncIterable[Sequence[T_co]]:
         """Buffer n values at a time and yield a list of buffered values.
 
         Arguments:
@@ -308,7 +314,13 @@ class Stream(StreamT[T_co], Service):
                 the agent is likely to stall and block buffered events for an
                 unreasonable length of time(!).
         """
-        buffer: List[T_co] = []
+        return self._take(max_, within)
+
+    async def _take(self, max_: int, within: Seconds, *,
+                    with_events: bool = False) -> AsyncIterable[Sequence[Any]]:
+        # with_events buffers (event, value) pairs instead of values,
+        # without changing the values the stream yields.
+        buffer: List[Any] = []
         events: List[EventT] = []
         buffer_add = buffer.append
         event_add = events.append
@@ -331,10 +343,16 @@ class Stream(StreamT[T_co], Service):
                     await buffer_consuming
                 finally:
                     buffer_consuming = None
-            buffer_add(cast(T_co, value))
             event = self.current_event
             if event is not None:
                 event_add(event)
+            if with_events:
+                if event is None:
+                    raise RuntimeError(
+                        'Cannot aggregate stream with non-topic channel')
+                buffer_add((event, value))
+            else:
+                buffer_add(value)
             if buffer_size() >= max_:
                 # signal that the buffer is full and should be emptied.
                 buffer_full.set()
@@ -365,6 +383,100 @@ class Stream(StreamT[T_co], Service):
                     buffer_full.clear()
                     buffer_consumed.set()
 
+    async def aggregate(
+            self, table: CollectionT,
+            combine: Callable[[Any, Any], Any],
+            *,
+            value: Callable[[Any], Any] = None,
+            max_: int = 1000,
+            within: Seconds = 1.0) -> AsyncIterable[Mapping[Any, Any]]:
+        """Aggregate values into table by event key, a batch at a time.
+
+        Values for the same key in a batch (see :meth:`take`) are
+        combined in memory first, so the table is updated, and the
+        changelog written to, once for every key in the batch.
+        Events are acknowledged after the batch is written to the table,
+        and the changelog messages are attached to the last event of the
+        key, so they are published when its offset is committed.
+
+        Arguments:
+            table: Table (not windowed) to aggregate values into,
+                partitioned like the stream, e.g. after :meth:`group_by`.
+            combine: Function combining two values, which must be
+                associative (e.g. :func:`operator.add`, :func:`min`,
+                :func:`max`).  :func:`sum` is the same as
+                :func:`operator.add`.
+            value: Function returning the value to aggregate from
+                the stream value, the default is the stream value.
+            max_: Maximum number of events in a batch.
+            within: Timeout for when we give up waiting for more events,
+                and process the batch we have.
+
+        Yields the new table value of every key updated by a batch.
+
+        Examples:
+            .. sourcecode:: python
+
+                grouped = withdrawals_topic.stream().group_by(
+                    Withdrawal.account_id)
+                async for totals in grouped.aggregate(
+                        account_totals, sum, value=lambda w: w.amount):
+                    ...
+
+            The combine function takes two values, so an average is
+            kept as a ``[sum, count]`` pair (stored as a list,
+            like tuples are in the JSON changelog)::
+
+                def add_pairs(a, b):
+                    return [a[0] + b[0], a[1] + b[1]]
+
+                async for averages in grouped.aggregate(
+                        account_averages, add_pairs,
+                        value=lambda w: [w.amount, 1]):
+                    for account, (total, count) in averages.items():
+                        print(account, total / count)
+        """
+        if isinstance(table, WindowWrapperT):
+            raise NotImplementedError(
+                'Stream.aggregate does not support windowed tables')
+        if combine is sum:
+            combine = operator.add
+
+        async for values in self._take(max_, within, with_events=True):
+            batch = cast(Sequence[Tuple[EventT, Any]], values)
+            if value is not None:
+                batch = [(event, value(v)) for event, v in batch]
+            yield self._aggregate_batch(table, combine, batch)
+
+    def _aggregate_batch(
+            self, table: CollectionT,
+            combine: Callable[[Any, Any], Any],
+            batch: Sequence[Tuple[EventT, Any]]) -> Mapping[Any, Any]:
+        # Combine values by key first (like the combiner of map/reduce),
+        # so every key is read and written once.
+        partials: Dict[Any, Any] = {}
+        last_events: Dict[Any, EventT] = {}
+        for event, value in batch:
+            key = event.key
+            if key in partials:
+                partials[key] = combine(partials[key], value)
+            else:
+                partials[key] = value
+            last_events[key] = event
+        updated: Dict[Any, Any] = {}
+        target = cast(MutableMapping, table)
+        for key, partial in partials.items():
+            # the batch is consumed in the agent task, not in the task
+            # iterating over the stream, so set the current event here.
+            token = _current_event.set(weakref.ref(last_events[key]))
+            try:
+                if key in target:
+                    partial = combine(target[key], partial)
+                target[key] = updated[key] = partial
+            finally:
+                _current_event.reset(token)
+        return updated
+
     def enumerate(self, start: int = 0) -> AsyncIterable[Tuple[int, T_co]]:
         """Enumerate values received on this stream.
 
@@ -631,11 +743,43 @@ class Stream(StreamT[T_co], Service):
     def join(self, *fields: FieldDescriptorT) -> StreamT:
         return self._join(joins.RightJoin(stream=self, fields=fields))
 
-    def left_join(self, *fields: FieldDescriptorT) -> StreamT:
-        return self._join(joins.LeftJoin(stream=self, fields=fields))
+    def left_join(self, *fields: FieldDescriptorT,
+                  table: JoinableT = None) -> StreamT:
+        """Left join, e.g. with table.
 
-    def inner_join(self, *fields: FieldDescriptorT) -> StreamT:
-        return self._join(joins.InnerJoin(stream=self, fields=fields))
+        With a table, the new stream yields ``(value, row)`` tuples,
+        where ``row`` is the value in the table for the event key
+        (or for the field passed, e.g. ``Order.customer_id``), or
+        :const:`None` if the key is not in the table.
+        """
+        return self._join(joins.LeftJoin(
+            stream=table if table is not None else self, fields=fields))
+
+    def inner_join(
+            self, *fields: FieldDescriptorT,
+            table: JoinableT = None,
+            buffer: Union[CollectionT, WindowWrapperT] = None) -> StreamT:
+        """Inner join, e.g. with table.
+
+        Like :meth:`left_join`, but values with no row in the table
+        are skipped.
+
+        With ``buffer``, a table using sliding windows
+        (see :meth:`~faust.Table.sliding`), the values of two models
+        in this stream are joined by the fields passed, one for each
+        model, when their timestamps are in the window.
+        The new stream yields lists of ``(value0, value1)`` tuples
+        for the matches with values seen before.
+        """
+        buffer_table: Optional[CollectionT]
+        if buffer is None or isinstance(buffer, CollectionT):
+            buffer_table = buffer
+        else:
+            buffer_table = buffer.table
+        return self._join(joins.InnerJoin(
+            stream=table if table is not None else self,
+            fields=fields,
+            buffer=buffer_table))
 
     def outer_join(self, *fields: FieldDescriptorT) -> StreamT:
         return self._join(joins.OuterJoin(stream=self, fields=fields))
@@ -664,6 +808,8 @@ class Stream(StreamT[T_co], Service):
     async def on_start(self) -> None:
         if self._on_start:
             await self._on_start()
+        if self.join_strategy is not None:
+            await self.join_strategy.on_stream_start(self)
         if self._passive:
             await self._passive_started.wait()
 
@@ -684,6 +830,14 @@ class Stream(StreamT[T_co], Service):
     def __next__(self) -> Any:
         raise NotImplementedError('Streams are asynchronous: use `async for`')
 
+    async def _take_for_join(self, value: Any, taken: Deque[Any]) -> None:
+        # Takes the events already waiting in the channel, so that the
+        # join strategy can prefetch table rows for all of them at once.
+        queue = cast(ChannelT, self.channel).queue
+        while not (queue._errors or queue.empty()):
+            taken.append(queue.get_nowait())
+        await cast(JoinT, self.join_strategy).prefetch([value, *taken])
+
     async def __aiter__(self) -> AsyncIterator:
         self._finalized = True
         _inherit_context(loop=self.loop)
@@ -708,6 +862,9 @@ class Stream(StreamT[T_co], Service):
             chan_errors = None
             chan_quick_get = None
         chan_slow_get = channel.__anext__
+        # Events taken from the channel for the join, see _take_for_join.
+        join_strategy = self.join_strategy
+        taken: Deque[Any] = deque()
         # Topic description -> processors
         processors = self._processors
         # Sensor: on_stream_event_in
@@ -740,12 +897,19 @@ class Stream(StreamT[T_co], Service):
                     # and prefer the latter if the queue is non-empty.
                     channel_value: Any
                     if chan_is_channel:
-                        if chan_errors:
-                            raise chan_errors.popleft()
-                        if chan_queue_empty():
-                            channel_value = await chan_slow_get()
+                        if taken:
+                            channel_value = taken.popleft()
                         else:
-                            channel_value = chan_quick_get()
+                            if chan_errors:
+                                raise chan_errors.popleft()
+                            if chan_queue_empty():
+                                channel_value = await chan_slow_get()
+                            else:
+                                channel_value = chan_quick_get()
+                            if join_strategy is not None and \
+                                    not chan_queue_empty():
+                                await self._take_for_join(
+                                    channel_value, taken)
                     else:
                         # chan is an AsyncIterable
                         channel_value = await chan_slow_get()
@@ -789,6 +953,11 @@ class Stream(StreamT[T_co], Service):
                     for processor in processors:
                         value = await _maybe_async(processor(value))
                     value = await on_merge(value)
+                    if value is None and do_ack and \
+                            isinstance(channel_value, event_cls):
+                        # skipped (e.g. inner join without match),
+                        # the offset can still be committed.
+                        await self.ack(channel_value)
                 try:
                     yield value
                 except CancelledError:
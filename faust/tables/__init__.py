@@ -1,10 +1,22 @@
 from .base import Collection, CollectionT
+from .globaltable import GlobalTable, GlobalTableT
 from .manager import TableManager, TableManagerT
+from .numeric import NumericTable
+from .objects import CounterTable, DeltaTable, ListTable, SetTable
+from .sketches import SketchTable
 from .table import Table, TableT
 
 __all__ = [
     'Collection',
     'CollectionT',
+    'CounterTable',
+    'DeltaTable',
+    'GlobalTable',
+    'GlobalTableT',
+    'ListTable',
+    'NumericTable',
+    'SetTable',
+    'SketchTable',
     'TableManager',
     'TableManagerT',
     'Table',
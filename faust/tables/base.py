@@ -1,8 +1,10 @@
 """Base class Collection for Table and future data structures."""
 import abc
+import asyncio
+import heapq
 from collections import defaultdict
 from datetime import datetime
-from heapq import heappop, heappush
+from itertools import islice
 from typing import (
     Any,
     Callable,
@@ -14,15 +16,17 @@ from typing import (
     MutableSet,
     Optional,
     Set,
+    Tuple,
     Union,
     cast,
     no_type_check,
 )
 
-from mode import Seconds, Service
+from mode import Seconds, Service, want_seconds
 from yarl import URL
 
 from faust import stores
+from faust.stores.base import SerializedStore
 from faust import joins
 from faust.events import Event
 from faust.streams import current_event
@@ -33,6 +37,7 @@ from faust.types import (
     FieldDescriptorT,
     FutureMessage,
     JoinT,
+    Message,
     RecordMetadata,
     TP,
     TopicT,
@@ -45,8 +50,10 @@ from faust.types.tables import (
     CollectionT,
     RecoverCallback,
     RelativeHandler,
+    WindowCloseCallback,
 )
 from faust.types.windows import WindowRange, WindowT
+from faust.utils import json
 
 __all__ = ['Collection']
 
@@ -58,14 +65,20 @@ class Collection(Service, CollectionT):
 
     _store: Optional[URL]
     _changelog_topic: Optional[TopicT]
-    _partition_timestamp_keys: MutableMapping[tuple, MutableSet]
-    _partition_timestamps: MutableMapping[int, List[float]]
     _partition_latest_timestamp: MutableMapping[int, float]
+    _partition_event_time: MutableMapping[int, float]
+    _pending_windows: MutableMapping[int, MutableMapping[float, Set]]
+    _pending_window_ends: MutableMapping[int, List[float]]
+    _closing_partitions: Set[int]
     _recover_callbacks: MutableSet[RecoverCallback]
     _data: Optional[StoreT] = None
     _changelog_compacting: Optional[bool] = True
     _changelog_deleting: Optional[bool] = None
 
+    #: Max. number of closed windows waiting for :meth:`on_window_close`,
+    #: more windows are closed only when the callbacks catch up.
+    window_close_buffer_size: int = 1000
+
     @abc.abstractmethod
     def _has_key(self, key: Any) -> bool:  # pragma: no cover
         ...
@@ -96,6 +109,8 @@ class Collection(Service, CollectionT):
                  help: str = None,
                  on_recover: RecoverCallback = None,
                  on_changelog_event: ChangelogEventCallback = None,
+                 on_window_close: WindowCloseCallback = None,
+                 allowed_lateness: Seconds = None,
                  recovery_buffer_size: int = 1000,
                  standby_buffer_size: int = None,
                  extra_topic_configs: Mapping[str, Any] = None,
@@ -113,15 +128,25 @@ class Collection(Service, CollectionT):
         self.extra_topic_configs = extra_topic_configs or {}
         self.help = help or ''
         self._on_changelog_event = on_changelog_event
+        self._on_window_close = on_window_close
+        self.allowed_lateness = (
+            want_seconds(allowed_lateness) if allowed_lateness else 0.0)
         self.recovery_buffer_size = recovery_buffer_size
         self.standby_buffer_size = standby_buffer_size or recovery_buffer_size
         assert self.recovery_buffer_size > 0 and self.standby_buffer_size > 0
 
         # Table key expiration
-        self._partition_timestamp_keys = defaultdict(set)
-        self._partition_timestamps = defaultdict(list)
         self._partition_latest_timestamp = defaultdict(int)
 
+        # Windows waiting for the watermark to pass their end,
+        # by partition and window end.
+        self._partition_event_time = defaultdict(float)
+        self._pending_windows = defaultdict(dict)
+        self._pending_window_ends = defaultdict(list)
+        self._closing_partitions = set()
+        self._closed_windows: asyncio.Queue = asyncio.Queue(
+            maxsize=self.window_close_buffer_size)
+
         self._recover_callbacks = set()
         if on_recover:
             self.on_recover(on_recover)
@@ -139,19 +164,33 @@ class Collection(Service, CollectionT):
     def _get_store(self) -> StoreT:
         if self._data is None:
             app = self.app
+            data: StoreT
             if self.StateStore is not None:
-                self._data = self.StateStore(url=None, app=app, loop=self.loop)
+                data = self.StateStore(
+                    url=None,
+                    app=app,
+                    table_name=self.name,
+                    key_type=self.key_type,
+                    value_type=self.value_type,
+                    loop=self.loop)
             else:
                 url = self._store or self.app.conf.store
-                self._data = stores.by_url(url)(
+                data = stores.by_url(url)(
                     url,
                     app,
                     table_name=self.name,
                     key_type=self.key_type,
                     value_type=self.value_type,
                     loop=self.loop)
-            self.add_dependency(self._data)
-        return cast(StoreT, self._data)
+            if self.window is not None:
+                # keys are stored sorted by window, for range queries.
+                data.windowed = True
+            if self._should_expire_keys():
+                # also index keys by expiry when applying the changelog.
+                data.key_expires = self._key_expires
+            self._data = data
+            self.add_dependency(data)
+        return self._data
 
     @property  # type: ignore
     @no_type_check  # XXX https://github.com/python/mypy/issues/4125
@@ -191,14 +230,18 @@ class Collection(Service, CollectionT):
         return await self.data.need_active_standby_for(tp)
 
     def reset_state(self) -> None:
+        self.version += 1
         self.data.reset_state()
 
     def _send_changelog(self,
                         key: Any,
                         value: Any,
                         key_serializer: CodecArg = 'json',
-                        value_serializer: CodecArg = 'json') -> None:
-        event = current_event()
+                        value_serializer: CodecArg = 'json',
+                        *,
+                        event: EventT = None) -> None:
+        if event is None:
+            event = current_event()
         if event is None:
             raise RuntimeError('Cannot modify table outside of agent/stream.')
         cast(Event, event)._attach(
@@ -228,43 +271,117 @@ class Collection(Service, CollectionT):
     async def _clean_data(self) -> None:
         if self._should_expire_keys():
             while not self.should_stop:
-                self._del_old_keys()
+                await self._del_old_keys()
                 await self.sleep(self.app.conf.table_cleanup_interval)
 
-    def _del_old_keys(self) -> None:
+    @Service.task
+    async def _deliver_closed_windows(self) -> None:
+        get = self._closed_windows.get
+        while not self.should_stop:
+            key, window_range, value = await get()
+            self._close_deferred_windows()
+            try:
+                await self.on_window_close(key, window_range, value)
+            except Exception as exc:
+                self.log.exception(
+                    'Window close callback for %r %r raised: %r',
+                    key, window_range, exc)
+
+    def watermark(self, partition: int) -> float:
+        """Return event-time watermark for partition.
+
+        Windows ending at or before the watermark are closed.
+
+        Note:
+            The watermark and the windows waiting to be closed are
+            kept in memory, and are not recovered from the changelog:
+            after a restart or rebalance, a window is only closed if it
+            is updated again.  Rebuilding them from the store is not
+            possible, since the store does not know what windows
+            were already closed (so they would be closed twice).
+        """
+        return self._partition_event_time[partition] - self.allowed_lateness
+
+    def _track_windows(self, key: Any, timestamp: float) -> None:
+        # Called for every windowed update, to remember the windows
+        # updated and close windows when the watermark moves forward.
+        if not self.wants_window_close:
+            return
+        event = current_event()
+        if event is None:
+            return
+        partition = event.message.partition
+        watermark = self.watermark(partition)
+        pending = self._pending_windows[partition]
+        for window_range in self._closing_ranges(timestamp):
+            end = window_range.end
+            if end > watermark:
+                try:
+                    pending[end].add((key, window_range))
+                except KeyError:
+                    pending[end] = {(key, window_range)}
+                    heapq.heappush(self._pending_window_ends[partition], end)
+        if timestamp > self._partition_event_time[partition]:
+            self._partition_event_time[partition] = timestamp
+            self._close_windows(partition)
+
+    def _closing_ranges(self, timestamp: float) -> List[WindowRange]:
+        return self._window_ranges(timestamp)
+
+    def _close_windows(self, partition: int) -> None:
+        watermark = self.watermark(partition)
+        ends = self._pending_window_ends[partition]
+        pending = self._pending_windows[partition]
+        queue = self._closed_windows
+        while ends and ends[0] <= watermark:
+            windows = pending[ends[0]]
+            while windows:
+                if queue.full():
+                    # The callbacks are lagging behind: the windows stay
+                    # pending until there's room in the queue again,
+                    # see _close_deferred_windows.
+                    self._closing_partitions.add(partition)
+                    return
+                key, window_range = windows.pop()
+                try:
+                    value = self._get_window(key, window_range)
+                except KeyError:
+                    continue  # deleted
+                queue.put_nowait((key, window_range, value))
+            del pending[heapq.heappop(ends)]
+
+    def _close_deferred_windows(self) -> None:
+        closing = self._closing_partitions
+        while closing and not self._closed_windows.full():
+            self._close_windows(closing.pop())
+
+    async def _del_old_keys(self) -> None:
         window = cast(WindowT, self.window)
         assert window
-        for partition, timestamps in self._partition_timestamps.items():
-            while timestamps and window.stale(
-                    timestamps[0],
-                    self._partition_latest_timestamp[partition]):
-                timestamp = heappop(timestamps)
-                for key in self._partition_timestamp_keys[(partition,
-                                                           timestamp)]:
-                    del self.data[key]
-                del self._partition_timestamp_keys[(partition, timestamp)]
+        # The store keeps an index of keys by the time they expire,
+        # so this only touches keys that expired.
+        for partition, latest in self._partition_latest_timestamp.items():
+            stale_before = window.stale_before(latest)
+            if stale_before is not None:
+                await self.data.expire_async(partition, stale_before)
+                self.version += 1
 
     def _should_expire_keys(self) -> bool:
         window = self.window
         return not (window is None or window.expires is None)
 
+    def _key_expires(self, key: Any) -> float:
+        # windowed keys are ``(key, (window_start, window_end))``,
+        # the tuples may also be lists when decoded from the changelog.
+        return key[1][1]
+
     def _maybe_set_key_ttl(self, key: Any, partition: int) -> None:
         if not self._should_expire_keys():
             return
-        _, window_range = key
-        heappush(self._partition_timestamps[partition], window_range.end)
+        timestamp = self._key_expires(key)
+        self.data.set_expiry(key, partition, timestamp)
         self._partition_latest_timestamp[partition] = max(
-            self._partition_latest_timestamp[partition], window_range.end)
-        self._partition_timestamp_keys[(partition, window_range.end)].add(key)
-
-    def _maybe_del_key_ttl(self, key: Any, partition: int) -> None:
-        if not self._should_expire_keys():
-            return
-        _, window_range = key
-        ts_keys = self._partition_timestamp_keys.get((partition,
-                                                      window_range.end))
-        if ts_keys is not None:
-            ts_keys.discard(key)
+            self._partition_latest_timestamp[partition], timestamp)
 
     def _changelog_topic_name(self) -> str:
         return f'{self.app.conf.id}-{self.name}-changelog'
@@ -344,19 +461,19 @@ class Collection(Service, CollectionT):
         set_ = self._set_key
         for window_range in self._window_ranges(timestamp):
             set_((key, window_range), op(get_((key, window_range)), value))
+        self._track_windows(key, timestamp)
 
     def _set_windowed(self, key: Any, value: Any, timestamp: float) -> None:
         for window_range in self._window_ranges(timestamp):
             self._set_key((key, window_range), value)
+        self._track_windows(key, timestamp)
 
     def _del_windowed(self, key: Any, timestamp: float) -> None:
         for window_range in self._window_ranges(timestamp):
             self._del_key((key, window_range))
 
-    def _window_ranges(self, timestamp: float) -> Iterator[WindowRange]:
-        window = cast(WindowT, self.window)
-        for window_range in window.ranges(timestamp):
-            yield window_range
+    def _window_ranges(self, timestamp: float) -> List[WindowRange]:
+        return cast(WindowT, self.window).ranges(timestamp)
 
     def _relative_now(self, event: EventT = None) -> float:
         # get current timestampe
@@ -390,30 +507,66 @@ class Collection(Service, CollectionT):
 
     def _windowed_timestamp(self, key: Any, timestamp: float) -> Any:
         window = cast(WindowT, self.window)
-        return self._get_key((key, window.current(timestamp)))
+        return self._get_window(key, window.current(timestamp))
 
     def _windowed_contains(self, key: Any, timestamp: float) -> bool:
         window = cast(WindowT, self.window)
-        return self._has_key((key, window.current(timestamp)))
+        return self._has_window(key, window.current(timestamp))
 
     def _windowed_delta(self, key: Any, d: Seconds,
                         event: EventT = None) -> Any:
         window = cast(WindowT, self.window)
-        return self._get_key(
-            (key,
-             window.delta(self._relative_event(event), d)),
-        )
+        return self._get_window(
+            key, window.delta(self._relative_event(event), d))
+
+    def _get_window(self, key: Any, window_range: WindowRange) -> Any:
+        return self._get_key((key, window_range))
+
+    def _has_window(self, key: Any, window_range: WindowRange) -> bool:
+        return self._has_key((key, window_range))
+
+    def _windowed_range(self, key: Any,
+                        start: float = None,
+                        end: float = None) -> List[Tuple[WindowRange, Any]]:
+        return list(self.data.iterwindows(key, start, end))
+
+    def _windowed_latest(self, key: Any,
+                         n: int = 1) -> List[Tuple[WindowRange, Any]]:
+        return list(islice(self.data.iterwindows(key, reverse=True), n))
 
     async def on_partitions_assigned(self, assigned: Set[TP]) -> None:
         await self.data.on_partitions_assigned(self, assigned)
+        self.version += 1
+        topic = self.changelog_topic.get_topic_name()
+        actives = {tp.partition for tp in self.app.assignor.assigned_actives()
+                   if tp.topic == topic}
+        for partition in set(self._pending_windows) - actives:
+            # windows updated from now on are tracked by the new owner.
+            self._pending_windows.pop(partition, None)
+            self._pending_window_ends.pop(partition, None)
+            self._closing_partitions.discard(partition)
 
     async def on_partitions_revoked(self, revoked: Set[TP]) -> None:
         await self.data.on_partitions_revoked(self, revoked)
+        self.version += 1
+
+    async def on_commit(self, offsets: Mapping[TP, int]) -> None:
+        """Call before committing offsets of source topics.
+
+        Tables sending changes to the changelog later than when they
+        happen must send them here, the offsets are committed after.
+        """
+        ...
 
     async def on_changelog_event(self, event: EventT) -> None:
         if self._on_changelog_event:
             await self._on_changelog_event(event)
 
+    async def on_window_close(self, key: Any, window_range: WindowRange,
+                              value: Any) -> None:
+        if self._on_window_close:
+            await self._on_window_close(key, window_range, value)
+
     @property
     def label(self) -> str:
         return f'{self.shortlabel}@{self._store}'
@@ -433,12 +586,130 @@ class Collection(Service, CollectionT):
         self._changelog_topic = topic
 
     def apply_changelog_batch(self, batch: Iterable[EventT]) -> None:
+        self.version += 1
         self.data.apply_changelog_batch(
-            batch,
+            self._expand_window_events(batch),
             to_key=self._to_key,
             to_value=self._to_value,
         )
 
+    async def apply_changelog_batch_async(
+            self, batch: Iterable[EventT]) -> None:
+        await self.data.apply_changelog_batch_async(
+            self._expand_window_events(batch),
+            to_key=self._to_key,
+            to_value=self._to_value,
+        )
+        # rows looked up before the changes must not be reused.
+        self.version += 1
+
+    def _is_window_update(self, key: Any) -> bool:
+        # Updates of all windows for a step bucket are sent to the
+        # changelog as ``(key, bucket_start)`` with the list of values
+        # for ``window.ranges(bucket_start)``, see Table._apply_window_op.
+        # Normal windowed keys are ``(key, window_range)``.
+        return (self.window is not None and
+                not isinstance(key[1], (list, tuple)))
+
+    def _window_update_items(
+            self, key: Any, values: List[Any]) -> Iterator[Tuple[Any, Any]]:
+        k, bucket_start = key
+        for window_range, value in zip(
+                self._window_ranges(bucket_start), values):
+            yield (k, window_range), value
+
+    def _expand_window_events(
+            self, batch: Iterable[EventT]) -> Iterable[EventT]:
+        if self.window is None:
+            return batch
+        return self._iter_expand_window_events(batch)
+
+    def _iter_expand_window_events(
+            self, batch: Iterable[EventT]) -> Iterator[EventT]:
+        for event in batch:
+            if event.value is not None and self._is_window_update(event.key):
+                for key, value in self._window_update_items(
+                        event.key, cast(List, event.value)):
+                    yield Event(self.app, key, value, event.message)
+            else:
+                yield event
+
+    def _expand_window_messages(
+            self, batch: Iterable[Message]) -> Iterable[Message]:
+        if self.window is None:
+            return batch
+        return self._iter_expand_window_messages(batch)
+
+    def _iter_expand_window_messages(
+            self, batch: Iterable[Message]) -> Iterator[Message]:
+        # Only used with JSON serialized keys and values,
+        # see :attr:`raw_changelog`.
+        # Keys are never decoded: other windowed keys are
+        # ``[key, [start, end]]`` so always end with ``]]``, and
+        # the expanded keys reuse the serialized key of the update.
+        for message in batch:
+            key = message.key
+            if (message.value is None or key is None or
+                    key.endswith(b']]')):
+                yield message
+                continue
+            # window update: ``[key, bucket_start]``.
+            head, _, bucket_start = key[:-1].rpartition(b',')
+            values = json.loads(message.value.decode())
+            for window_range, value in zip(
+                    self._window_ranges(float(bucket_start)), values):
+                yield Message(
+                    message.topic,
+                    message.partition,
+                    message.offset,
+                    message.timestamp,
+                    message.timestamp_type,
+                    b'%s, [%r, %r]]' % (head, *window_range),
+                    json.dumps(value).encode(),
+                    message.checksum,
+                    tp=message.tp,
+                )
+
+    @property
+    def raw_changelog(self) -> bool:
+        # Changelog messages are serialized as JSON, so stores keeping
+        # keys/values in that same form can apply them directly,
+        # no need to decode them.
+        data = self.data
+        return (isinstance(data, SerializedStore) and
+                self._is_json(data.key_type, data.key_serializer) and
+                self._is_json(data.value_type, data.value_serializer))
+
+    @staticmethod
+    def _is_json(typ: Optional[ModelArg], serializer: CodecArg) -> bool:
+        # models can override the serializer, also for the changelog.
+        options = getattr(typ, '_options', None)
+        if options is not None and options.serializer:
+            serializer = options.serializer
+        return serializer == 'json'
+
+    @property
+    def wants_window_close(self) -> bool:
+        return (self._on_window_close is not None or
+                type(self).on_window_close is not Collection.on_window_close)
+
+    @property
+    def wants_changelog_events(self) -> bool:
+        return (self._on_changelog_event is not None or
+                type(self).on_changelog_event is not
+                Collection.on_changelog_event)
+
+    def apply_raw_changelog_batch(self, batch: Iterable[Message]) -> None:
+        self.version += 1
+        cast(SerializedStore, self.data).apply_raw_changelog_batch(
+            self._expand_window_messages(batch))
+
+    async def apply_raw_changelog_batch_async(
+            self, batch: Iterable[Message]) -> None:
+        await cast(SerializedStore, self.data).apply_raw_changelog_batch_async(
+            self._expand_window_messages(batch))
+        self.version += 1
+
     def _to_key(self, k: Any) -> Any:
         if isinstance(k, list):
             # Lists are not hashable, and windowed-keys are json
@@ -1,29 +1,51 @@
 import asyncio
+from time import monotonic
 from typing import (
     Any,
     AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
     Iterable,
     List,
+    Mapping,
     MutableMapping,
+    Optional,
     Set,
     Tuple,
+    cast,
 )
 
 from mode import Service
 from mode.utils.compat import Counter
 from mode.utils.aiter import aenumerate
-from mode.utils.times import Seconds
+from mode.utils.times import Seconds, humanize_seconds
 
-from faust.types import AppT, ChannelT, EventT, TP
+from faust.types import AppT, ChannelT, Message, TP
 from faust.types.tables import ChangelogReaderT, CollectionT
 from faust.utils import terminal
 
-__all__ = ['ChangelogReader', 'StandbyReader', 'local_tps']
+__all__ = ['ChangelogReader', 'StandbyReader', 'decode_raw', 'local_tps']
 
 CHANGELOG_SEEKING = 'SEEKING'
 CHANGELOG_STARTING = 'STARTING'
 CHANGELOG_READING = 'READING'
 
+#: Max size of a batch applied to the table, in bytes (4 MiB).
+RECOVERY_BUFFER_BYTES = 4 * 1024 ** 2
+
+#: Max number of batches waiting to be applied to the table.
+RECOVERY_QUEUE_SIZE = 4
+
+
+async def decode_raw(message: Message, *, propagate: bool = False) -> Any:
+    """Changelog channel decoder used in raw mode.
+
+    Does not deserialize anything, the channel
+    will deliver the :class:`~faust.types.Message` itself.
+    """
+    return message
+
 
 async def local_tps(table: CollectionT, tps: Iterable[TP]) -> Set[TP]:
     # RocksDB: Find partitions that we have database files for,
@@ -37,8 +59,34 @@ class ChangelogReader(Service, ChangelogReaderT):
     wait_for_shutdown = True
     shutdown_timeout = None
 
+    #: Set if the channel delivers raw messages (see :func:`decode_raw`)
+    #: applied to the table without decoding them.
+    raw: bool
+
+    #: Batches are applied when reaching this size in bytes,
+    #: or the table's buffer size in number of records, whichever is first.
+    buffer_bytes: int = RECOVERY_BUFFER_BYTES
+
+    #: Reading from the changelog continues while batches are applied,
+    #: until this many batches are waiting.
+    queue_size: int = RECOVERY_QUEUE_SIZE
+
+    #: Reported to the sensors as recovery of this kind
+    #: (see :meth:`faust.Sensor.on_table_recovery`).
+    kind: str = 'active'
+
+    #: Log progress every stats interval.
+    log_progress: bool = True
+
+    #: Number of records read per second, at last stats interval.
+    records_per_second: float = 0.0
+
     _highwaters: Counter[TP]
     _stop_event: asyncio.Event
+    _records_read: Counter[TP]
+    _bytes_read: Counter[TP]
+    _records_s: Counter[TP]
+    _bytes_s: Counter[TP]
 
     def __init__(self,
                  table: CollectionT,
@@ -55,9 +103,14 @@ class ChangelogReader(Service, ChangelogReaderT):
         self.tps = tps
         self.offsets = Counter() if offsets is None else offsets
         self.stats_interval = stats_interval
+        self.raw = table.raw_changelog
         for tp in self.tps:
             self.offsets.setdefault(tp, -1)
         self._highwaters = Counter()
+        self._records_read = Counter()
+        self._bytes_read = Counter()
+        self._records_s = Counter()
+        self._bytes_s = Counter()
         self._stop_event = asyncio.Event(loop=self.loop)
 
     @property
@@ -127,6 +180,7 @@ class ChangelogReader(Service, ChangelogReaderT):
         self.set_shutdown()
         self._stop_event.set()
         self.log.info('Setting stop event')
+        self._report_stats()
 
     @property
     def _remaining_stats(self) -> MutableMapping[TP, Tuple[int, int, int]]:
@@ -144,12 +198,65 @@ class ChangelogReader(Service, ChangelogReaderT):
                           self._remaining_stats)
         return did_recover
 
+    def eta(self) -> Optional[float]:
+        """Estimated time left until recovered (in seconds)."""
+        if not self.records_per_second:
+            return None
+        return self._remaining_total() / self.records_per_second
+
+    def stats(self) -> Mapping[TP, Mapping[str, Any]]:
+        """Return recovery progress by changelog partition."""
+        offsets = self.offsets
+        records_s = self._records_s
+        stats: Dict[TP, Mapping[str, Any]] = {}
+        for tp, highwater in self._highwaters.items():
+            remaining = max(highwater - offsets[tp], 0)
+            stats[tp] = {
+                'highwater': highwater,
+                'offset': offsets[tp],
+                'remaining': remaining,
+                'records_s': records_s[tp],
+                'bytes_s': self._bytes_s[tp],
+                'eta': (
+                    remaining / records_s[tp] if records_s[tp]
+                    else 0.0 if not remaining else None),
+            }
+        return stats
+
+    def _report_stats(self) -> None:
+        self.app.sensors.on_table_recovery(self.table, self.kind, self.stats())
+
+    def _update_rates(self, interval: float,
+                      last_records: Counter[TP],
+                      last_bytes: Counter[TP]) -> None:
+        self._records_s = Counter({
+            tp: (self._records_read[tp] - last_records[tp]) / interval
+            for tp in self._records_read})
+        self._bytes_s = Counter({
+            tp: (self._bytes_read[tp] - last_bytes[tp]) / interval
+            for tp in self._bytes_read})
+        self.records_per_second = sum(self._records_s.values())
+
     @Service.task
     async def _publish_stats(self) -> None:
+        last_records, last_bytes = Counter(), Counter()
+        last_time = monotonic()
         while not self.should_stop and not self._stop_event.is_set():
-            self.log.info('Still fetching. Remaining: %s',
-                          self._remaining_stats)
+            if self.log_progress:
+                eta = self.eta()
+                self.log.info(
+                    'Still fetching (%d records/s, ETA %s). Remaining: %s',
+                    self.records_per_second,
+                    humanize_seconds(eta) if eta is not None else 'unknown',
+                    self._remaining_stats)
             await self.sleep(self.stats_interval)
+            now = monotonic()
+            if now > last_time:
+                self._update_rates(now - last_time, last_records, last_bytes)
+            last_records = Counter(self._records_read)
+            last_bytes = Counter(self._bytes_read)
+            last_time = now
+            self._report_stats()
 
     async def on_start(self) -> None:
         consumer = self.app.consumer
@@ -205,44 +312,130 @@ class ChangelogReader(Service, ChangelogReaderT):
             await self.channel.throw(StopAsyncIteration())
 
     async def _slurp_stream(self) -> None:
-        buf: List[EventT] = []
+        # Reading from the changelog (and decoding, unless raw) continues
+        # while the applier task writes previous batches to the table.
+        table = self.table
+        # batches are of raw messages or of events.
+        apply: Callable[[Iterable[Any]], None]
+        apply_async: Callable[[Iterable[Any]], Awaitable[None]]
+        if self.raw:
+            apply = table.apply_raw_changelog_batch
+            apply_async = table.apply_raw_changelog_batch_async
+        else:
+            apply = table.apply_changelog_batch
+            apply_async = table.apply_changelog_batch_async
+        on_changelog_event = self._changelog_event_handler()
+        batches: asyncio.Queue = asyncio.Queue(
+            maxsize=self.queue_size, loop=self.loop)
+        applier = asyncio.ensure_future(
+            self._apply_batches(batches, apply_async), loop=self.loop)
+        buffer_size = self._buffer_size
+        buffer_bytes = self.buffer_bytes
+        raw = self.raw
+        records_read = self._records_read
+        bytes_read = self._bytes_read
+        buf: List[Any] = []
+        buf_bytes = 0
         can_log_done = True
         try:
-            async for i, event in aenumerate(self._read_changelog()):
-                buf.append(event)
-                await self.table.on_changelog_event(event)
-                if len(buf) >= self._buffer_size:
-                    self.table.apply_changelog_batch(buf)
-                    buf.clear()
-                if self._should_stop_reading():
-                    break
-                remaining = self._remaining_total()
-                if remaining and not i % 10_000:
-                    can_log_done = True
-                    self.log.info('Waiting for %s records...', remaining)
-                elif not remaining and can_log_done:
-                    can_log_done = False
-                    self.log.info('All up to date')
-        except StopAsyncIteration:
-            self.log.info('Got stop iteration')
-            pass
+            try:
+                async for i, item in aenumerate(self._read_changelog()):
+                    buf.append(item)
+                    message = item if raw else item.message
+                    size = len(message.key or b'') + len(message.value or b'')
+                    buf_bytes += size
+                    records_read[message.tp] += 1
+                    bytes_read[message.tp] += size
+                    if on_changelog_event is not None:
+                        await on_changelog_event(item)
+                    if len(buf) >= buffer_size or buf_bytes >= buffer_bytes:
+                        await self._put_batch(batches, applier, buf)
+                        buf, buf_bytes = [], 0
+                    if self._should_stop_reading():
+                        break
+                    remaining = self._remaining_total()
+                    if remaining and not i % 10_000:
+                        can_log_done = True
+                        self.log.info('Waiting for %s records...', remaining)
+                    elif not remaining and can_log_done:
+                        can_log_done = False
+                        self.log.info('All up to date')
+            except StopAsyncIteration:
+                self.log.info('Got stop iteration')
+            if buf:
+                await self._put_batch(batches, applier, buf)
+                buf = []
+            await self._put_batch(batches, applier, None)
+            await applier
         finally:
             self.log.info('Stopped reading!')
+            if not applier.done():
+                applier.cancel()
+            # Offsets for these events have already been recorded,
+            # so we must apply them even if we're being cancelled:
+            # no await here.
+            while not batches.empty():
+                batch = batches.get_nowait()
+                if batch:
+                    apply(batch)
             if buf:
-                self.table.apply_changelog_batch(buf)
-                buf.clear()
-
-    async def _read_changelog(self) -> AsyncIterable[EventT]:
+                apply(buf)
+
+    async def _put_batch(self,
+                         batches: asyncio.Queue,
+                         applier: asyncio.Future,
+                         batch: Optional[List]) -> None:
+        # Wait for room in the queue, unless the applier crashed.
+        put = asyncio.ensure_future(batches.put(batch), loop=self.loop)
+        await asyncio.wait(
+            [put, applier],
+            return_when=asyncio.FIRST_COMPLETED,
+            loop=self.loop)
+        if not put.done():
+            put.cancel()
+            applier.result()  # raises the exception.
+
+    async def _apply_batches(
+            self,
+            batches: asyncio.Queue,
+            apply_async: Callable[[Iterable[Any]], Awaitable[None]]) -> None:
+        while 1:
+            batch = await batches.get()
+            if batch is None:
+                break
+            await apply_async(batch)
+
+    def _changelog_event_handler(
+            self) -> Optional[Callable[[Any], Awaitable[None]]]:
+        table = self.table
+        if not self.raw:
+            return table.on_changelog_event
+        if not table.wants_changelog_events:
+            return None
+        # Only decode the messages when there's someone to receive them.
+        decode = table.changelog_topic.decode
+
+        async def on_changelog_message(message: Message) -> None:
+            await table.on_changelog_event(await decode(message))
+        return on_changelog_message
+
+    async def _read_changelog(self) -> AsyncIterable[Any]:
         offsets = self.offsets
+        tps = self.tps
+        raw = self.raw
 
-        async for event in self.channel:
-            message = event.message
+        async for item in self.channel:
+            # the channel delivers messages in raw mode (see decode_raw).
+            message = cast(Message, item) if raw else item.message
             tp = message.tp
+            if tp not in tps:
+                # left in the channel by another reader.
+                continue
             offset = message.offset
             seen_offset = offsets.get(tp, -1)
             if offset > seen_offset:
                 offsets[tp] = offset
-                yield event
+                yield item
 
     @property
     def label(self) -> str:
@@ -256,14 +449,92 @@ class ChangelogReader(Service, ChangelogReaderT):
 class StandbyReader(ChangelogReader):
     """Service reading table changelogs to keep an up-to-date backup."""
 
+    kind = 'standby'
+    log_progress = False
+
+    _resumed: asyncio.Event
+    _suspended: asyncio.Event
+
+    def __post_init__(self) -> None:
+        self._resumed = asyncio.Event(loop=self.loop)
+        self._resumed.set()
+        self._suspended = asyncio.Event(loop=self.loop)
+
+    @property
+    def reading(self) -> bool:
+        """Return :const:`True` if the reader can be suspended/resumed."""
+        return not self._stop_event.is_set() and not self.should_stop
+
+    async def suspend(self) -> None:
+        """Stop reading while partitions are rebalanced.
+
+        Everything read is applied to the table before this returns,
+        but the reader keeps running so it can be resumed with
+        the new assignment.
+        """
+        if not self._resumed.is_set() or not self.reading:
+            return
+        self._resumed.clear()
+        # wakes up the reader waiting for the next message.
+        await self.channel.throw(StopAsyncIteration())
+        await self.wait_for_stopped(self._suspended)
+
+    async def resume(self, tps: Set[TP], offsets: Counter[TP]) -> None:
+        """Start reading again, replicating a new set of partitions.
+
+        Offsets for partitions we were already reading are kept,
+        unless ``offsets`` is ahead (e.g. recovered global tables),
+        ``offsets`` is used for partitions new to this reader.
+        """
+        consumer = self.app.consumer
+        removed = self.tps - tps
+        for tp in removed:
+            self.offsets.pop(tp, None)
+            self._highwaters.pop(tp, None)
+        for tp in tps & self.tps:
+            self.offsets[tp] = max(self.offsets[tp], offsets.get(tp, -1))
+        for tp in tps - self.tps:
+            self.offsets[tp] = offsets.get(tp, -1)
+        self.log.info('Resuming standby: +%r -%r',
+                      sorted(tps - self.tps), sorted(removed))
+        self.tps = set(tps)
+        # The consumer forgets the positions when partitions are
+        # reassigned, so seek to where we were.
+        await consumer.pause_partitions(self.tps)
+        await self._seek_tps()
+        await consumer.resume_partitions(self.tps)
+        self._suspended.clear()
+        self._resumed.set()
+
+    async def on_stop(self) -> None:
+        # let a suspended reader exit.
+        self._resumed.set()
+        await super().on_stop()
+
+    async def _slurp_stream(self) -> None:
+        while not self.should_stop:
+            await super()._slurp_stream()
+            if self._resumed.is_set():
+                break
+            self._suspended.set()
+            await self._resumed.wait()
+
+    def _report_stats(self) -> None:
+        # Standbys never finish: use the latest highwater
+        # known by the consumer to show how far behind we are.
+        consumer = self.app.consumer
+        assignment = consumer.assignment()
+        for tp in self.tps & assignment:
+            value = consumer.highwater(tp)
+            if value is not None:
+                # FIXME the -1 here is because of the way we commit offsets
+                self._highwaters[tp] = value - 1
+        super()._report_stats()
+
     @property
     def _buffer_size(self) -> int:
         return self.table.standby_buffer_size
 
-    @Service.task
-    async def _publish_stats(self) -> None:
-        return
-
     def _should_start_reading(self) -> bool:
         return True
 
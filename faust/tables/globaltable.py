@@ -0,0 +1,15 @@
+"""Global table (every worker has all partitions)."""
+from faust.types.tables import GlobalTableT
+
+from .table import Table
+
+__all__ = ['GlobalTable']
+
+
+class GlobalTable(Table, GlobalTableT):
+    """Table replicated to every worker.
+
+    Every worker reads all partitions of the changelog, so the whole
+    table is available locally, which is useful for reference data
+    used to enrich streams that are not partitioned like the table.
+    """
@@ -1,7 +1,16 @@
 """Tables (changelog stream)."""
 import asyncio
 from collections import defaultdict
-from typing import Any, List, MutableMapping, Optional, Set, cast
+from typing import (
+    Any,
+    Iterable,
+    List,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Set,
+    cast,
+)
 
 from mode import Service
 from mode.utils.aiter import aiter
@@ -13,11 +22,12 @@ from faust.types.tables import (
     ChangelogReaderT,
     CollectionT,
     CollectionTps,
+    GlobalTableT,
     TableManagerT,
 )
 from faust.utils import terminal
 
-from .changelogs import ChangelogReader, StandbyReader
+from .changelogs import ChangelogReader, StandbyReader, decode_raw
 from .table import Table
 
 __all__ = [
@@ -38,12 +48,17 @@ class TableManager(Service, TableManagerT, FastUserDict):
     _channels: MutableMapping[CollectionT, ChannelT]
     _changelogs: MutableMapping[str, CollectionT]
     _table_offsets: Counter[TP]
-    _standbys: MutableMapping[CollectionT, ChangelogReaderT]
+    _standbys: MutableMapping[CollectionT, StandbyReader]
     _revivers: Optional[List[ChangelogReaderT]] = None
     _ongoing_recovery: Optional[asyncio.Future] = None
     _recovery_started: asyncio.Event
+    _unrecovered: Set[TP]
+    _warmups_probed: bool = False
     recovery_completed: asyncio.Event
 
+    #: How often to check if warm-up replicas caught up.
+    warmup_check_interval: float = 10.0
+
     def __init__(self, app: AppT, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.app = app
@@ -52,6 +67,7 @@ class TableManager(Service, TableManagerT, FastUserDict):
         self._changelogs = {}
         self._table_offsets = Counter()
         self._standbys = {}
+        self._unrecovered = set()
         self._recovery_started = asyncio.Event(loop=self.loop)
         self.recovery_completed = asyncio.Event(loop=self.loop)
 
@@ -62,6 +78,30 @@ class TableManager(Service, TableManagerT, FastUserDict):
     def changelog_topics(self) -> Set[str]:
         return set(self._changelogs.keys())
 
+    @property
+    def global_changelog_topics(self) -> Set[str]:
+        # Every worker is assigned all partitions of these topics.
+        return {
+            topic for topic, table in self._changelogs.items()
+            if isinstance(table, GlobalTableT)
+        }
+
+    @property
+    def changelog_offsets(self) -> Mapping[TP, int]:
+        # Changelog offsets the local table state is up to date with,
+        # sent to the group leader so that it can place partitions
+        # where recovery is cheapest.
+        return self._table_offsets
+
+    def reset_offsets(self, tps: Iterable[TP]) -> None:
+        """Forget changelog offsets for partitions the store discarded.
+
+        Recovery of these partitions will then start from the
+        beginning of the changelog.
+        """
+        for tp in tps:
+            self._table_offsets.pop(tp, None)
+
     def add(self, table: CollectionT) -> CollectionT:
         if self._recovery_started.is_set():
             raise RuntimeError('Too late to add tables at this point')
@@ -80,6 +120,9 @@ class TableManager(Service, TableManagerT, FastUserDict):
         for table in self.values():
             if table not in self._channels:
                 it = aiter(table.changelog_topic)
+                if table.raw_changelog:
+                    # deliver messages as-is, see ChangelogReader.raw.
+                    it.decode = decode_raw
                 self._channels[table] = cast(ChannelT, it)
         self._changelogs.update({
             table.changelog_topic.get_topic_name(): table
@@ -130,15 +173,27 @@ class TableManager(Service, TableManagerT, FastUserDict):
     @Service.transitions_to(TABLEMAN_STOP_STANDBYS)
     async def _stop_standbys(self) -> None:
         for standby in self._standbys.values():
-            self.log.info('Stopping standby for tps: %s', standby.tps)
-            standby.set_shutdown()
-            try:
-                await standby.stop()
-            except asyncio.CancelledError:
-                pass
-            self._sync_offsets(standby)
+            await self._stop_standby(standby)
         self._standbys = {}
 
+    async def _stop_standby(self, standby: ChangelogReaderT) -> None:
+        self.log.info('Stopping standby for tps: %s', standby.tps)
+        standby.set_shutdown()
+        try:
+            await standby.stop()
+        except asyncio.CancelledError:
+            pass
+        self._sync_offsets(standby)
+
+    async def _suspend_standbys(self) -> None:
+        # Standbys keep running across rebalances, see _start_standbys.
+        for standby in self._standbys.values():
+            self.log.info('Suspending standby for tps: %s', standby.tps)
+            await standby.suspend()
+            # everything read is applied, so promoted partitions
+            # can be recovered from here.
+            self._sync_offsets(standby)
+
     def _sync_offsets(self, reader: ChangelogReaderT) -> None:
         table = terminal.logtable(
             [(k.topic, k.partition, v) for k, v in reader.offsets.items()],
@@ -163,20 +218,62 @@ class TableManager(Service, TableManagerT, FastUserDict):
         on_timeout = self.app._on_revoked_timeout
         on_timeout.info('+TABLES: maybe_abort_ongoing_recovery')
         await self._maybe_abort_ongoing_recovery()
-        on_timeout.info('+TABLES: STOP STANDBYS')
-        await self._stop_standbys()
+        self._unrecovered.difference_update(revoked)
+        on_timeout.info('+TABLES: SUSPEND STANDBYS')
+        await self._suspend_standbys()
         on_timeout.info(
             f'+TABLES: call table.on_..._revoked {len(self.values())}')
         for table in self.values():
+            # remember how far the local state got before the store
+            # closes the partitions (only partitions already open:
+            # opening them here could block, or fail on a lock).
+            self._sync_persisted_offsets(table, {
+                tp for tp in revoked
+                if tp.topic == table.changelog_topic.get_topic_name()
+            }, only_open=True)
             on_timeout.info(f'+TABLE.on_partitions_revoked(): {table!r}')
             await table.on_partitions_revoked(revoked)
         on_timeout.info(
             f'-TABLES: call table.on_..._revoked {len(self.values())}')
 
+    async def on_commit(self, offsets: Mapping[TP, int]) -> None:
+        for table in self.values():
+            await table.on_commit(offsets)
+
     @Service.transitions_to(TABLEMAN_PARTITIONS_ASSIGNED)
     async def on_partitions_assigned(self, assigned: Set[TP]) -> None:
+        self._warmups_probed = False
         await self._start_recovery(assigned)
 
+    @Service.task
+    async def _probe_warmups(self) -> None:
+        # Warm-up replicas are standbys for active partitions the leader
+        # wants to move here (see table_max_warmup_replicas).  Once they
+        # caught up we trigger a rebalance, so the leader can move them.
+        while not self.should_stop:
+            await self.sleep(self.warmup_check_interval)
+            if not self._warmups_probed and self._warmups_caught_up():
+                self.log.info('Warm-up replicas caught up: rebalancing')
+                self._warmups_probed = True
+                self.app.consumer.request_rebalance()
+
+    def _warmups_caught_up(self) -> bool:
+        if self.app.rebalancing:
+            return False
+        warmups = self._group_table_tps(self.app.assignor.assigned_warmups())
+        if not warmups:
+            return False
+        max_lag = self.app.conf.table_acceptable_recovery_lag
+        for table, tps in warmups.items():
+            standby = self._standbys.get(table)
+            if standby is None:
+                return False
+            stats = standby.stats()
+            if any(tp not in stats or stats[tp]['remaining'] > max_lag
+                   for tp in tps):
+                return False
+        return True
+
     async def _start_recovery(self, assigned: Set[TP]) -> None:
         assert self._ongoing_recovery is None
         assert not self._revivers
@@ -184,11 +281,20 @@ class TableManager(Service, TableManagerT, FastUserDict):
         self.log.info('Triggered recovery in background')
 
     async def _recover(self, assigned: Set[TP]) -> None:
+        # With cooperative rebalancing only the newly assigned partitions
+        # are passed in, and we also pick up partitions where recovery
+        # was interrupted by the rebalance.
+        assigned = self._unrecovered = assigned | self._unrecovered
         standby_tps = self.app.assignor.assigned_standbys()
         # for table in self.values():
         #     standby_tps = await local_tps(table, standby_tps)
-        assigned_tps = self.app.assignor.assigned_actives()
-        assert set(assigned_tps).issubset(assigned)
+        assigned_tps = self.app.assignor.assigned_actives() & assigned
+        # Global tables are standbys everywhere, but are recovered
+        # like actives so they are complete before processing starts.
+        global_topics = self.global_changelog_topics
+        assigned_tps |= {
+            tp for tp in standby_tps & assigned if tp.topic in global_topics
+        }
         self.log.info('New assignments found')
         # This needs to happen in background and be aborted midway
         await self._on_recovery_started()
@@ -204,7 +310,7 @@ class TableManager(Service, TableManagerT, FastUserDict):
             ]
             if callback_coros:
                 await asyncio.wait(callback_coros)
-            await self.app.consumer.perform_seek()
+            await self.app.consumer.perform_seek(assigned)
             await self._start_standbys(standby_tps)
             self.log.info('New assignments handled')
             await self._on_recovery_completed()
@@ -215,6 +321,7 @@ class TableManager(Service, TableManagerT, FastUserDict):
             # finally start the fetcher
             await self.app._fetcher.start()
             self.app.rebalancing = False
+            self._unrecovered = set()
             self.log.info('Worker ready')
         else:
             self.log.info('Recovery interrupted')
@@ -280,26 +387,42 @@ class TableManager(Service, TableManagerT, FastUserDict):
         )
 
     def _sync_persisted_offsets(self, table: CollectionT,
-                                tps: Set[TP]) -> None:
+                                tps: Set[TP],
+                                *,
+                                only_open: bool = False) -> None:
         for tp in tps:
-            persisted_offset = table.persisted_offset(tp)
+            if only_open:
+                persisted_offset = table.data.persisted_offset_if_open(tp)
+            else:
+                persisted_offset = table.persisted_offset(tp)
             if persisted_offset is not None:
                 curr_offset = self._table_offsets.get(tp, -1)
                 self._table_offsets[tp] = max(curr_offset, persisted_offset)
 
     @Service.transitions_to(TABLEMAN_START_STANDBYS)
     async def _start_standbys(self, tps: Set[TP]) -> None:
+        # Standbys still running from before the rebalance are resumed
+        # with the new set of partitions, keeping their position for
+        # partitions that stay standbys on this node.
         self.log.info('Attempting to start standbys')
-        assert not self._standbys
         table_standby_tps = self._group_table_tps(tps)
         offsets = self._table_offsets
+        for table in list(self._standbys):
+            # stopped, or no standby partitions for the table anymore.
+            if (not self._standbys[table].reading or
+                    table not in table_standby_tps):
+                await self._stop_standby(self._standbys.pop(table))
         for table, table_tps in table_standby_tps.items():
-            self.log.info('Starting standbys for tps: %s', tps)
             self._sync_persisted_offsets(table, table_tps)
             tp_offsets: Counter[TP] = Counter({
                 tp: offsets[tp]
                 for tp in table_tps if tp in offsets
             })
+            existing = self._standbys.get(table)
+            if existing is not None:
+                await existing.resume(table_tps, tp_offsets)
+                continue
+            self.log.info('Starting standbys for tps: %s', table_tps)
             channel = self._channels[table]
             standby = StandbyReader(
                 table,
@@ -0,0 +1,110 @@
+"""Table of numbers, kept in typed arrays."""
+from itertools import repeat
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Type, Union
+
+from faust.stores import arrays
+from faust.streams import current_event
+from faust.types import AppT, EventT
+from faust.types.tables import WindowWrapperT
+from faust.types.windows import WindowT
+
+from .table import Table
+
+__all__ = ['NumericTable']
+
+Number = Union[int, float]
+
+
+class NumericTable(Table):
+    """Table of numbers (e.g. counts), stored in typed arrays.
+
+    Values are stored as 64-bit integers, or doubles if ``value_type``
+    is :class:`float`, using :mod:`numpy` if installed.
+    Missing keys have the value zero.
+
+    Many keys can be changed at once using :meth:`increment_many`,
+    e.g. for every batch of events from :meth:`faust.Stream.take`,
+    which sends the new value of every key changed to the changelog
+    once, instead of once for every increment.
+    """
+
+    StateStore = arrays.Store
+
+    def __init__(self, app: AppT, *,
+                 value_type: Type = int,
+                 **kwargs: Any) -> None:
+        if value_type not in arrays.TYPECODES:
+            raise TypeError(
+                f'NumericTable value_type must be int or float, '
+                f'not {value_type!r}')
+        kwargs.setdefault('default', value_type)
+        super().__init__(app, value_type=value_type, **kwargs)
+
+    def using_window(self, window: WindowT) -> WindowWrapperT:
+        raise NotImplementedError(
+            f'{type(self).__name__} cannot be windowed')
+
+    def increment(self, key: Any, delta: Number = 1) -> None:
+        """Add delta to the value of key."""
+        self.increment_many([key], delta)
+
+    def increment_many(self, keys: Iterable[Any],
+                       deltas: Union[Number, Sequence[Number]] = 1,
+                       *,
+                       events: Sequence[EventT] = None) -> Dict:
+        """Add deltas to the values of keys, in one operation.
+
+        Keys may repeat, and ``deltas`` is either one delta for every
+        key, or the same delta for all keys.
+
+        Keys are stored in the partition of the current event,
+        or if ``events`` is given (one event for every key),
+        in the partition of the event of the key, and its changelog
+        message is attached to that event.
+
+        Examples:
+            >>> async for orders in stream.take(1000, within=1.0):
+            ...     table.increment_many([o.country for o in orders])
+
+        Returns:
+            Dict: the new value of every key changed.
+        """
+        keys = list(keys)
+        key_events: Iterable[EventT]
+        if events is None:
+            event = current_event()
+            if event is None:
+                raise TypeError(
+                    'Setting table key from outside of stream iteration')
+            key_events = repeat(event)
+        elif len(events) != len(keys):
+            raise ValueError('increment_many needs one event for every key')
+        else:
+            key_events = events
+        key_deltas: Iterable[Number]
+        if isinstance(deltas, Sequence):
+            key_deltas = deltas
+        else:
+            key_deltas = repeat(deltas)
+        # one increment for every partition written to.
+        batches: Dict[int, Tuple[List[Any], List[Number]]] = {}
+        last_events: Dict[Any, EventT] = {}
+        for key, delta, event in zip(keys, key_deltas, key_events):
+            partition = event.message.partition
+            if partition not in batches:
+                batches[partition] = ([], [])
+            batch_keys, batch_deltas = batches[partition]
+            batch_keys.append(key)
+            batch_deltas.append(delta)
+            last_events[key] = event
+        values: Dict = {}
+        for partition, (batch_keys, batch_deltas) in batches.items():
+            values.update(self.data.increment_many(
+                batch_keys, batch_deltas, partition))
+        self.version += 1
+        for key, value in values.items():
+            event = last_events[key]
+            self._send_changelog(key, value, event=event)
+            self._maybe_set_key_ttl(key, event.message.partition)
+            self._sensor_on_set(self, key, value)
+        return values
@@ -0,0 +1,415 @@
+"""Tables of collections, with operations written to the changelog.
+
+Changing the value of a normal table sends the whole value to the
+changelog.  Sets, lists and counters growing over time would then send
+an ever larger value for every change, so these tables send the
+operation instead (e.g. ``add`` with the members added).
+
+Changelog keys are ``[key]`` for full values and ``[key, slot]``
+for operations.  Every :attr:`DeltaTable.snapshot_interval` operations
+the full value is sent again, and the following operations reuse the
+slots, so a compacted changelog keeps the latest full value and the
+operations done after it.
+"""
+from collections import Counter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    MutableSet,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+    cast,
+    overload,
+)
+
+from faust.events import Event
+from faust.stores.base import SerializedStore
+from faust.types import EventT, TP
+from faust.types.tables import WindowWrapperT
+from faust.types.windows import WindowT
+
+from .table import Table
+
+__all__ = [
+    'DeltaTable',
+    'SetTable',
+    'ListTable',
+    'CounterTable',
+    'ChangeloggedSet',
+    'ChangeloggedList',
+    'ChangeloggedCounter',
+]
+
+#: Operation replacing the value, sent for full values.
+OP_SET = 'set'
+
+#: Marks keys missing from the store.
+_MISSING = object()
+
+
+class DeltaTable(Table):
+    """Base class for tables of collections.
+
+    ``table[key]`` returns the collection for key (empty if missing),
+    wrapped in an object sending changes to the changelog
+    (see :attr:`Proxy`).  ``table[key] = value`` replaces the value,
+    and sends the full value.
+    """
+
+    #: Type of values, e.g. :class:`set`.
+    factory: Type = cast(Type, None)
+
+    #: Type wrapping values returned by ``table[key]``.
+    Proxy: Type = cast(Type, None)
+
+    #: Full value is sent to the changelog after this many
+    #: operations for a key, and the key is deleted by sending
+    #: a tombstone for the full value and for every slot used.
+    snapshot_interval: int = 100
+
+    #: Number of operations sent since the last full value, by key.
+    #: Keys not here send the full value first, as we do not know
+    #: which operations in the changelog are after the last full value.
+    _deltas: Dict[Any, int]
+
+    #: Number of slots used by operations of the key so far, by key.
+    #: Keys not here may have operations in any slot of the changelog.
+    _slots: Dict[Any, int]
+
+    def __init__(self, *args: Any,
+                 snapshot_interval: int = None,
+                 **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if self.value_type is not None:
+            raise TypeError(
+                f'{type(self).__name__} does not support value_type')
+        if snapshot_interval is not None:
+            self.snapshot_interval = snapshot_interval
+        assert self.snapshot_interval > 0
+        self._deltas = {}
+        self._slots = {}
+
+    def using_window(self, window: WindowT) -> WindowWrapperT:
+        raise NotImplementedError(
+            f'{type(self).__name__} cannot be windowed')
+
+    def apply_operation(self, value: Any, op: str, args: Any) -> None:
+        """Apply operation received from the changelog to value."""
+        raise NotImplementedError()
+
+    def to_snapshot(self, value: Any) -> Any:
+        """Return JSON serializable form of value."""
+        return list(value)
+
+    def from_snapshot(self, snapshot: Any) -> Any:
+        """Return value from JSON serializable form (see to_snapshot)."""
+        return self.factory(snapshot)
+
+    def __getitem__(self, key: Any) -> Any:
+        self.on_key_get(key)
+        return self.Proxy(self, key, self._get_value(key))
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        value = self.factory(value)
+        self.on_key_set(key, value)
+        self.data[key] = self._to_stored(value)
+
+    def on_key_set(self, key: Any, value: Any) -> None:
+        self.version += 1
+        self._track_new_key(key)
+        self._send_snapshot(key, value)
+        self._sensor_on_set(self, key, value)
+
+    def on_key_del(self, key: Any) -> None:
+        self.version += 1
+        # operations sent before are removed by compaction too.
+        slots = self._slots.pop(key, self.snapshot_interval)
+        for changelog_key in [[key]] + [
+                [key, slot] for slot in range(slots)]:
+            self._send_changelog(
+                changelog_key, value=None, value_serializer='raw')
+        self._deltas.pop(key, None)
+        self._sensor_on_del(self, key)
+
+    def on_operation(self, key: Any, value: Any, op: str, args: Any) -> None:
+        """Store value changed by operation, and send to changelog.
+
+        Called by :attr:`Proxy` after changing the value.
+        """
+        self.version += 1
+        self._track_new_key(key)
+        self.data[key] = self._to_stored(value)
+        slot = self._deltas.get(key)
+        if slot is None or slot >= self.snapshot_interval:
+            self._send_snapshot(key, value)
+        else:
+            self._send_changelog([key, slot], {'op': op, 'args': args})
+            self._deltas[key] = slot + 1
+            slots = self._slots.get(key)
+            if slots is not None and slot >= slots:
+                self._slots[key] = slot + 1
+        self._sensor_on_set(self, key, value)
+
+    def _track_new_key(self, key: Any) -> None:
+        # Deleting a key removes all its operations, so a key
+        # missing from the table has none in the changelog.
+        if key not in self._slots and key not in self.data:
+            self._slots[key] = 0
+
+    def _send_snapshot(self, key: Any, value: Any) -> None:
+        self._send_changelog(
+            [key], {'op': OP_SET, 'args': self.to_snapshot(value)})
+        self._deltas[key] = 0
+
+    def _get_value(self, key: Any) -> Any:
+        stored = self.data.get(key, _MISSING)
+        if stored is _MISSING:
+            return self.factory()
+        return self._from_stored(stored)
+
+    def _to_stored(self, value: Any) -> Any:
+        # Stores serializing values get the JSON serializable form,
+        # the in-memory store keeps the object.
+        if isinstance(self.data, SerializedStore):
+            return self.to_snapshot(value)
+        return value
+
+    def _from_stored(self, stored: Any) -> Any:
+        if isinstance(stored, self.factory):
+            return stored
+        return self.from_snapshot(stored)
+
+    @property
+    def raw_changelog(self) -> bool:
+        # Operations are applied to the current value, so messages
+        # must be decoded even for stores keeping serialized values.
+        return False
+
+    def apply_changelog_batch(self, batch: Iterable[EventT]) -> None:
+        super().apply_changelog_batch(self._replay(batch))
+
+    async def apply_changelog_batch_async(
+            self, batch: Iterable[EventT]) -> None:
+        await super().apply_changelog_batch_async(self._replay(batch))
+
+    def _replay(self, batch: Iterable[EventT]) -> List[EventT]:
+        # Returns events setting the full value of keys changed by
+        # operations, to be applied by the store.
+        values: Dict[Any, Any] = {}
+        events: List[EventT] = []
+        for event in batch:
+            changelog_key = cast(List, event.key)
+            key, *slot = changelog_key
+            key = self._to_key(key)
+            # Another worker wrote to the key: the next change
+            # made here must send the full value.
+            self._deltas.pop(key, None)
+            self._slots.pop(key, None)
+            if event.message.value is None:
+                if not slot:
+                    values[key] = None
+                    events.append(Event(self.app, key, None, event.message))
+                continue
+            operation = cast(Mapping[str, Any], event.value)
+            op, args = operation['op'], operation['args']
+            if op == OP_SET:
+                value = self.from_snapshot(args)
+            else:
+                value = values.get(key, _MISSING)
+                if value is _MISSING:
+                    value = self._get_value(key)
+                elif value is None:  # deleted earlier in this batch
+                    value = self.factory()
+                self.apply_operation(value, op, args)
+            values[key] = value
+            events.append(Event(
+                self.app, key, self._to_stored(value), event.message))
+        return events
+
+    async def on_partitions_revoked(self, revoked: Set[TP]) -> None:
+        # the partitions may be written to by another worker now.
+        self._deltas.clear()
+        self._slots.clear()
+        await super().on_partitions_revoked(revoked)
+
+
+class ChangeloggedSet(MutableSet):
+    """Set in :class:`SetTable`, sending changes to the changelog."""
+
+    def __init__(self, table: DeltaTable, key: Any, data: Set) -> None:
+        self.table = table
+        self.key = key
+        self.data = data
+
+    def add(self, member: Any) -> None:
+        self.update([member])
+
+    def discard(self, member: Any) -> None:
+        self.difference_update([member])
+
+    def update(self, *iterables: Iterable[Any]) -> None:
+        members = [
+            member for iterable in iterables for member in iterable
+            if member not in self.data
+        ]
+        if members:
+            self.data.update(members)
+            self.table.on_operation(self.key, self.data, 'add', members)
+
+    def difference_update(self, *iterables: Iterable[Any]) -> None:
+        members = [
+            member for iterable in iterables for member in iterable
+            if member in self.data
+        ]
+        if members:
+            self.data.difference_update(members)
+            self.table.on_operation(self.key, self.data, 'discard', members)
+
+    def __contains__(self, member: Any) -> bool:
+        return member in self.data
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__}: {self.data!r}>'
+
+
+class ChangeloggedList(Sequence):
+    """List in :class:`ListTable`, sending appends to the changelog."""
+
+    def __init__(self, table: DeltaTable, key: Any, data: List) -> None:
+        self.table = table
+        self.key = key
+        self.data = data
+
+    def append(self, item: Any) -> None:
+        self.extend([item])
+
+    def extend(self, items: Iterable[Any]) -> None:
+        items = list(items)
+        if items:
+            self.data.extend(items)
+            self.table.on_operation(self.key, self.data, 'append', items)
+
+    @overload
+    def __getitem__(self, index: int) -> Any:
+        ...
+
+    @overload  # noqa: F811
+    def __getitem__(self, index: slice) -> Sequence[Any]:
+        ...
+
+    def __getitem__(  # noqa: F811
+            self, index: Union[int, slice]) -> Any:
+        return self.data[index]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__}: {self.data!r}>'
+
+
+class ChangeloggedCounter(Mapping):
+    """Counter in :class:`CounterTable`, sending changes to the changelog."""
+
+    def __init__(self, table: DeltaTable, key: Any, data: Counter) -> None:
+        self.table = table
+        self.key = key
+        self.data = data
+
+    def incr(self, element: Any, n: int = 1) -> None:
+        """Increment count of element by n."""
+        self.update({element: n})
+
+    def update(self, counts: Union[Iterable[Any], Mapping[Any, int]]) -> None:
+        """Add counts, like :meth:`collections.Counter.update`."""
+        if not isinstance(counts, Mapping):
+            counts = Counter(counts)
+        items = [[element, n] for element, n in counts.items() if n]
+        if items:
+            self.data.update(dict(counts))
+            self.table.on_operation(self.key, self.data, 'incr', items)
+
+    def most_common(self, n: int = None) -> List[Tuple[Any, int]]:
+        return self.data.most_common(n)
+
+    def __getitem__(self, element: Any) -> int:
+        return self.data[element]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return f'<{type(self).__name__}: {self.data!r}>'
+
+
+class SetTable(DeltaTable):
+    """Table of sets, sending members added/discarded to the changelog.
+
+    Members must be JSON serializable and hashable after
+    deserialization (e.g. :class:`str`, :class:`int`).
+    """
+
+    factory = set
+    Proxy = ChangeloggedSet
+
+    def apply_operation(self, value: Any, op: str, args: Any) -> None:
+        if op == 'add':
+            value.update(args)
+        elif op == 'discard':
+            value.difference_update(args)
+        else:
+            raise ValueError(f'Unknown operation for set: {op!r}')
+
+
+class ListTable(DeltaTable):
+    """Table of lists, sending items appended to the changelog."""
+
+    factory = list
+    Proxy = ChangeloggedList
+
+    def apply_operation(self, value: Any, op: str, args: Any) -> None:
+        if op == 'append':
+            value.extend(args)
+        else:
+            raise ValueError(f'Unknown operation for list: {op!r}')
+
+
+class CounterTable(DeltaTable):
+    """Table of counters, sending increments to the changelog.
+
+    Elements must be JSON serializable and hashable after
+    deserialization (e.g. :class:`str`, :class:`int`).
+    """
+
+    factory = Counter
+    Proxy = ChangeloggedCounter
+
+    def apply_operation(self, value: Any, op: str, args: Any) -> None:
+        if op == 'incr':
+            for element, n in args:
+                value[element] += n
+        else:
+            raise ValueError(f'Unknown operation for counter: {op!r}')
+
+    def to_snapshot(self, value: Any) -> Any:
+        # list of pairs, as JSON object keys can only be strings.
+        return [[element, n] for element, n in value.items()]
+
+    def from_snapshot(self, snapshot: Any) -> Any:
+        return Counter({element: n for element, n in snapshot})
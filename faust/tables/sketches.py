@@ -0,0 +1,129 @@
+"""Table of sketches (see :mod:`faust.sketches`)."""
+import operator
+from collections import defaultdict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    MutableMapping,
+    Set,
+    Type,
+    Union,
+    cast,
+)
+
+from mode import Seconds
+
+from faust.sketches import Sketch
+from faust.streams import current_event
+from faust.types import AppT, CodecArg, EventT, TP
+from faust.types.models import ModelArg
+from faust.types.tables import WindowWrapperT
+
+from .table import Table
+
+__all__ = ['SketchTable']
+
+
+class SketchTable(Table):
+    """Table of sketches, e.g. to count distinct items for every key.
+
+    ``sketch`` is the sketch for missing keys (copied), or a sketch type
+    to create with its default parameters.  The values of the table
+    are then sketches of this type, and add items using ``+=``:
+
+    .. sourcecode:: python
+
+        visitors = app.SketchTable('visitors', sketch=HyperLogLog)
+
+        @app.agent(views_topic)
+        async def count_visitors(views):
+            async for view in views:
+                visitors[view.page] += view.user_id
+
+    The changelog has the binary form of the sketch, so its size
+    does not depend on the number of items added.  Sketches are still
+    large (kilobytes), so the changelog is not written for every item
+    added: the latest sketch of every key changed is sent when the
+    offsets of the stream are committed (see :meth:`on_commit`).
+    After a crash, items of events processed after the last commit may
+    then be added twice, as with at-least-once processing in general.
+    """
+
+    #: Sketch copied for missing keys.
+    sketch: Sketch
+
+    #: Latest value of the keys changed since the last commit,
+    #: by topic partition of the events changing them.
+    _changed: MutableMapping[TP, Dict[Any, Any]]
+
+    def __init__(self, app: AppT, *,
+                 sketch: Union[Sketch, Type[Sketch]],
+                 **kwargs: Any) -> None:
+        instance = sketch() if isinstance(sketch, type) else sketch
+        self.sketch = instance
+        kwargs.setdefault('default', instance.copy)
+        # the sketch type decodes values, as models do.
+        sketch_type = cast(ModelArg, type(instance))
+        super().__init__(app, value_type=sketch_type, **kwargs)
+        self._changed = defaultdict(dict)
+
+    def _send_changelog(self,
+                        key: Any,
+                        value: Any,
+                        key_serializer: CodecArg = 'json',
+                        value_serializer: CodecArg = 'json',
+                        *,
+                        event: EventT = None) -> None:
+        if event is None:
+            event = current_event()
+        if event is None:
+            raise RuntimeError('Cannot modify table outside of agent/stream.')
+        changed = self._changed[event.message.tp]
+        # keys are sent in the order of their last change.
+        changed.pop(key, None)
+        if value is None:
+            # deleted keys are sent right away, before later changes.
+            super()._send_changelog(
+                key, value, key_serializer, value_serializer, event=event)
+        else:
+            changed[key] = value
+
+    async def on_commit(self, offsets: Mapping[TP, int]) -> None:
+        """Send the latest sketch of keys changed to the changelog."""
+        topic = self.changelog_topic
+        pending: List[Awaitable] = []
+        for tp in offsets:
+            changed = self._changed.pop(tp, None)
+            if changed:
+                for key, value in changed.items():
+                    fut = topic.as_future_message(
+                        key, value,
+                        partition=tp.partition,
+                        key_serializer='json',
+                        value_serializer='json',
+                        callback=self._on_changelog_sent,
+                    )
+                    pending.append(
+                        await topic.publish_message(fut, wait=False))
+        if pending:
+            await self.app.producer.wait_many(pending)
+
+    async def on_partitions_revoked(self, revoked: Set[TP]) -> None:
+        # the events not committed are processed again by the new owner.
+        for tp in revoked:
+            self._changed.pop(tp, None)
+        await super().on_partitions_revoked(revoked)
+
+    def paned(self, size: Seconds, step: Seconds,
+              combine: Callable[[Any, Any], Any] = operator.or_,
+              expires: Seconds = None) -> WindowWrapperT:
+        """Hopping windows, storing one sketch per ``step`` sized pane.
+
+        The sketches of the panes are merged to get the sketch of
+        a window, so every event only updates one sketch.
+        """
+        return super().paned(size, step, combine, expires)
@@ -1,7 +1,8 @@
 """Table (key/value changelog stream)."""
 import sys
+from functools import reduce
 from operator import itemgetter
-from typing import Any, Callable, IO, Iterable, List, cast
+from typing import Any, Callable, IO, Iterable, List, Optional, cast
 
 from mode import Seconds
 from mode.utils import text
@@ -10,7 +11,7 @@ from mode.utils.collections import ManagedUserDict
 from faust import windows
 from faust.streams import current_event
 from faust.types.tables import TableT, WindowWrapperT
-from faust.types.windows import WindowT
+from faust.types.windows import WindowRange, WindowT
 from faust.utils import terminal
 
 from .base import Collection
@@ -18,10 +19,16 @@ from .wrappers import WindowWrapper
 
 __all__ = ['Table']
 
+#: Marks keys missing from the store in :meth:`Table.get_async`.
+_MISSING = object()
+
 
 class Table(TableT, Collection, ManagedUserDict):
     """Table (non-windowed)."""
 
+    #: Function combining pane values, set by :meth:`paned`.
+    pane_combiner: Optional[Callable[[Any, Any], Any]] = None
+
     def using_window(self, window: WindowT) -> WindowWrapperT:
         self.window = window
         self._changelog_compacting = True
@@ -37,11 +44,123 @@ class Table(TableT, Collection, ManagedUserDict):
                  expires: Seconds = None) -> WindowWrapperT:
         return self.using_window(windows.TumblingWindow(size, expires))
 
+    def sliding(self, before: Seconds, after: Seconds,
+                expires: Seconds) -> WindowWrapperT:
+        return self.using_window(
+            windows.SlidingWindow(before, after, expires))
+
+    def paned(self, size: Seconds, step: Seconds,
+              combine: Callable[[Any, Any], Any],
+              expires: Seconds = None) -> WindowWrapperT:
+        """Hopping windows, storing one value per ``step`` sized pane.
+
+        The value of a window is the values of its panes reduced
+        using ``combine``, which must be associative
+        (e.g. :func:`operator.add`, :func:`max`).
+        """
+        self.pane_combiner = combine
+        return self.using_window(windows.PanedWindow(size, step, expires))
+
     def __missing__(self, key: Any) -> Any:
         if self.default is not None:
             return self.default()
         raise KeyError(key)
 
+    async def get_async(self, key: Any) -> Any:
+        """Get value for key, without blocking the event loop.
+
+        Like ``table[key]``, but stores doing blocking I/O (RocksDB)
+        will read from disk in a thread pool.
+        """
+        self.on_key_get(key)
+        value = await self.data.get_async(key, _MISSING)
+        if value is _MISSING:
+            return self.__missing__(key)
+        return value
+
+    async def set_async(self, key: Any, value: Any) -> None:
+        """Set value for key, without blocking the event loop."""
+        self.on_key_set(key, value)
+        await self.data.set_async(key, value)
+
+    async def del_async(self, key: Any) -> None:
+        """Delete key, without blocking the event loop."""
+        self.on_key_del(key)
+        await self.data.del_async(key)
+
+    def _apply_window_op(self, op: Callable[[Any, Any], Any], key: Any,
+                         value: Any, timestamp: float) -> None:
+        ranges = self._window_ranges(timestamp)
+        if len(ranges) < 2 or not self._can_batch_window_updates():
+            return super()._apply_window_op(op, key, value, timestamp)
+        event = current_event()
+        if event is None:
+            raise TypeError(
+                'Setting table key from outside of stream iteration')
+        partition = event.message.partition
+        data = self.data
+        keys = [(key, window_range) for window_range in ranges]
+        values = []
+        for window_key in keys:
+            self._sensor_on_get(self, window_key)
+            current = data.get(window_key, _MISSING)
+            if current is _MISSING:
+                current = self.__missing__(window_key)
+            values.append(op(current, value))
+        # the store also indexes the keys by expiry time.
+        data.set_many(zip(keys, values), partition)
+        self.version += 1
+        # One changelog message for all windows, the windows are
+        # found again from the step bucket when recovering.
+        bucket = cast(WindowT, self.window).current(timestamp).start
+        self._send_changelog((key, bucket), values)
+        if self._should_expire_keys():
+            self._partition_latest_timestamp[partition] = max(
+                self._partition_latest_timestamp[partition],
+                self._key_expires(keys[-1]))
+        self._sensor_on_set(self, keys[-1], values[-1])
+        self._track_windows(key, timestamp)
+
+    def _get_window(self, key: Any, window_range: WindowRange) -> Any:
+        if self.pane_combiner is None:
+            return super()._get_window(key, window_range)
+        values = self._pane_values(key, window_range)
+        if not values:
+            return self.__missing__((key, window_range))
+        self._sensor_on_get(self, (key, window_range))
+        return reduce(self.pane_combiner, values)
+
+    def _has_window(self, key: Any, window_range: WindowRange) -> bool:
+        if self.pane_combiner is None:
+            return super()._has_window(key, window_range)
+        return bool(self._pane_values(key, window_range))
+
+    def _closing_ranges(self, timestamp: float) -> List[WindowRange]:
+        if self.pane_combiner is None:
+            return super()._closing_ranges(timestamp)
+        # the windows close, not the panes.
+        return cast(windows.PanedWindow, self.window).windows(timestamp)
+
+    def _key_expires(self, key: Any) -> float:
+        if self.pane_combiner is None:
+            return super()._key_expires(key)
+        # a pane is needed until the last window containing it ends.
+        window = cast(windows.PanedWindow, self.window)
+        return super()._key_expires(key) + window.size - window.step
+
+    def _pane_values(self, key: Any, window_range: WindowRange) -> List[Any]:
+        get = self.data.get
+        window = cast(windows.PanedWindow, self.window)
+        values = (get((key, pane), _MISSING)
+                  for pane in window.panes(window_range))
+        return [value for value in values if value is not _MISSING]
+
+    def _can_batch_window_updates(self) -> bool:
+        # the list of values cannot be decoded by a typed changelog topic,
+        # and changelog event callbacks expect one event per window.
+        return ((self.value_type is None or self.raw_changelog) and
+                not self.wants_changelog_events)
+
     def _has_key(self, key: Any) -> bool:
         return key in self
 
@@ -58,6 +177,7 @@ class Table(TableT, Collection, ManagedUserDict):
         self._sensor_on_get(self, key)
 
     def on_key_set(self, key: Any, value: Any) -> None:
+        self.version += 1
         self._send_changelog(key, value)
         event = current_event()
         if event is not None:
@@ -69,11 +189,10 @@ class Table(TableT, Collection, ManagedUserDict):
                 'Setting table key from outside of stream iteration')
 
     def on_key_del(self, key: Any) -> None:
+        self.version += 1
         self._send_changelog(key, value=None, value_serializer='raw')
         event = current_event()
         if event is not None:
-            partition = event.message.partition
-            self._maybe_del_key_ttl(key, partition)
             self._sensor_on_del(self, key)
         else:
             raise TypeError(
@@ -2,14 +2,14 @@
 import operator
 import typing
 from datetime import datetime
-from typing import Any, Callable, Iterator, Optional, cast
+from typing import Any, Callable, Iterator, List, Optional, Tuple, cast
 
 from mode import Seconds
 from mode.utils.collections import FastUserDict
 
 from faust.exceptions import ImproperlyConfigured
 from faust.streams import current_event
-from faust.types import EventT, FieldDescriptorT
+from faust.types import EventT, FieldDescriptorT, WindowRange
 from faust.types.tables import (
     RecoverCallback,
     RelativeArg,
@@ -50,6 +50,15 @@ class WindowSet(WindowSetT, FastUserDict):
 
         Table[k].delta(timedelta(hours=3), other_event)
 
+    All windows starting in a time range, as a list of
+    ``(window_range, value)`` tuples, are returned by ``.range()``::
+
+        Table[k].range(start_timestamp, end_timestamp)
+
+    and the most recent windows, newest first, by ``.latest()``::
+
+        Table[k].latest(10)
+
     """
 
     def __init__(self,
@@ -88,6 +97,13 @@ class WindowSet(WindowSetT, FastUserDict):
         table = cast(Table, self.table)
         return table._windowed_delta(self.key, d, event or self.event)
 
+    def range(self, start: float = None,
+              end: float = None) -> List[Tuple[WindowRange, Any]]:
+        return cast(Table, self.table)._windowed_range(self.key, start, end)
+
+    def latest(self, n: int = 1) -> List[Tuple[WindowRange, Any]]:
+        return cast(Table, self.table)._windowed_latest(self.key, n)
+
     def __getitem__(self, w: Any) -> Any:
         # wrapper[key][event] returns WindowSet with event already set.
         if isinstance(w, EventT):
@@ -384,6 +384,8 @@ class Consumer(Service, ConsumerT):
             try:
                 # send all messages attached to the new offset
                 await self._handle_attached(commit_offsets)
+                # and changes tables send when committing.
+                await self.app.tables.on_commit(commit_offsets)
             except ProducerSendError as exc:
                 await self.crash(exc)
             else:
@@ -526,6 +528,9 @@ class Consumer(Service, ConsumerT):
     def close(self) -> None:
         ...
 
+    def request_rebalance(self) -> None:
+        ...
+
     @property
     def unacked(self) -> Set[Message]:
         return cast(Set[Message], self._unacked_messages)
@@ -478,13 +478,23 @@ class Consumer(base.Consumer):
         transport = cast(Transport, self.transport)
         transport._topic_waiters.clear()
 
-    async def perform_seek(self) -> None:
-        await self.transition_with(CONSUMER_SEEKING, self._perform_seek())
+    async def perform_seek(self, tps: Iterable[TP] = None) -> None:
+        await self.transition_with(CONSUMER_SEEKING, self._perform_seek(tps))
 
-    async def _perform_seek(self) -> None:
+    async def _perform_seek(self, partitions: Iterable[TP] = None) -> None:
         read_offset = self._read_offset
-        self._consumer.seek_to_committed()
-        tps = self._consumer.assignment()
+        if partitions is None:
+            self._consumer.seek_to_committed()
+            tps = self._consumer.assignment()
+        else:
+            # only some partitions (cooperative rebalance), the
+            # position of the others must be left alone.
+            tps = {
+                _TopicPartition(tp.topic, tp.partition) for tp in partitions
+            } & self._consumer.assignment()
+            if not tps:
+                return
+            self._consumer.seek_to_committed(*tps)
         wait_res = await self.wait(
             asyncio.gather(*[self._consumer.committed(tp) for tp in tps]))
         offsets = zip(tps, wait_res.result)
@@ -587,6 +597,9 @@ class Consumer(base.Consumer):
         self._consumer.set_close()
         self._consumer._coordinator.set_close()
 
+    def request_rebalance(self) -> None:
+        self._consumer._coordinator.request_rejoin()
+
 
 class Producer(base.Producer):
     """Kafka producer using :pypi:`aiokafka`."""
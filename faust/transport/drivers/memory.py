@@ -88,7 +88,7 @@ class Consumer(base.Consumer):
     def _new_topicpartition(self, topic: str, partition: int) -> TP:
         return TP(topic, partition)
 
-    async def perform_seek(self) -> None:
+    async def perform_seek(self, tps: Iterable[TP] = None) -> None:
         ...
 
     async def _commit(self, offsets: Mapping[TP, Tuple[int, str]]) -> bool:
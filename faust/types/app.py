@@ -204,6 +204,54 @@ class AppT(ServiceT):
               **kwargs: Any) -> TableT:
         ...
 
+    @abc.abstractmethod
+    def GlobalTable(self,
+                    name: str,
+                    *,
+                    default: Callable[[], Any] = None,
+                    window: WindowT = None,
+                    partitions: int = None,
+                    help: str = None,
+                    **kwargs: Any) -> TableT:
+        ...
+
+    @abc.abstractmethod
+    def SetTable(self, name: str, *,
+                 partitions: int = None,
+                 help: str = None,
+                 **kwargs: Any) -> TableT:
+        ...
+
+    @abc.abstractmethod
+    def ListTable(self, name: str, *,
+                  partitions: int = None,
+                  help: str = None,
+                  **kwargs: Any) -> TableT:
+        ...
+
+    @abc.abstractmethod
+    def CounterTable(self, name: str, *,
+                     partitions: int = None,
+                     help: str = None,
+                     **kwargs: Any) -> TableT:
+        ...
+
+    @abc.abstractmethod
+    def NumericTable(self, name: str, *,
+                     value_type: Type = int,
+                     partitions: int = None,
+                     help: str = None,
+                     **kwargs: Any) -> TableT:
+        ...
+
+    @abc.abstractmethod
+    def SketchTable(self, name: str, *,
+                    sketch: Any,
+                    partitions: int = None,
+                    help: str = None,
+                    **kwargs: Any) -> TableT:
+        ...
+
     @abc.abstractmethod
     def page(self, path: str, *,
              base: Type[View] = View) -> Callable[[PageArg], Type[Site]]:
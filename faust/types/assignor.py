@@ -1,6 +1,6 @@
 import abc
 import typing
-from typing import List, MutableMapping, Set
+from typing import List, MutableMapping, Optional, Set
 
 from mode import ServiceT
 from yarl import URL
@@ -15,21 +15,36 @@ else:
 __all__ = [
     'TopicToPartitionMap',
     'HostToPartitionMap',
+    'TopicToOffsetMap',
     'PartitionAssignorT',
     'LeaderAssignorT',
 ]
 
 TopicToPartitionMap = MutableMapping[str, List[int]]
 HostToPartitionMap = MutableMapping[str, TopicToPartitionMap]
+# Topic -> Partition -> Offset (partition as str, for JSON serialization)
+TopicToOffsetMap = MutableMapping[str, MutableMapping[str, int]]
 
 
 class PartitionAssignorT(abc.ABC):
 
     replicas: int
+    max_migrations: Optional[int]
+    max_warmups: int
+    acceptable_recovery_lag: int
+    cooperative: bool
     app: AppT
 
     @abc.abstractmethod
-    def __init__(self, app: AppT, replicas: int = 0) -> None:
+    def __init__(self, app: AppT, replicas: int = 0,
+                 max_migrations: int = None,
+                 max_warmups: int = 0,
+                 acceptable_recovery_lag: int = 0,
+                 cooperative: bool = False) -> None:
+        ...
+
+    @abc.abstractmethod
+    def assigned_warmups(self) -> Set[TP]:
         ...
 
     @abc.abstractmethod
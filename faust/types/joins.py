@@ -1,9 +1,15 @@
 import abc
-from typing import MutableMapping, Optional, Tuple, Type
+import typing
+from typing import Any, MutableMapping, Optional, Sequence, Tuple, Type
 
 from .events import EventT
 from .models import FieldDescriptorT, ModelT
-from .streams import JoinableT
+from .streams import JoinableT, StreamT
+
+if typing.TYPE_CHECKING:
+    from .tables import CollectionT
+else:
+    class CollectionT: ...  # noqa
 
 __all__ = ['JoinT']
 
@@ -11,12 +17,22 @@ __all__ = ['JoinT']
 class JoinT(abc.ABC):
     fields: MutableMapping[Type[ModelT], FieldDescriptorT]
     stream: JoinableT
+    buffer: Optional['CollectionT'] = None
 
     @abc.abstractmethod
     def __init__(self, *, stream: JoinableT,
-                 fields: Tuple[FieldDescriptorT, ...]) -> None:
+                 fields: Tuple[FieldDescriptorT, ...],
+                 buffer: 'CollectionT' = None) -> None:
         ...
 
     @abc.abstractmethod
     async def process(self, event: EventT) -> Optional[EventT]:
         ...
+
+    @abc.abstractmethod
+    async def on_stream_start(self, stream: StreamT) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def prefetch(self, events: Sequence[Any]) -> None:
+        ...
@@ -1,6 +1,6 @@
 import abc
 import typing
-from typing import Any, Iterable
+from typing import Any, Iterable, Mapping
 
 from mode import ServiceT
 
@@ -75,6 +75,15 @@ class SensorInterfaceT(abc.ABC):
     def on_send_completed(self, producer: ProducerT, state: Any) -> None:
         ...
 
+    @abc.abstractmethod
+    def on_store_stats(self, name: str, stats: Mapping[str, float]) -> None:
+        ...
+
+    @abc.abstractmethod
+    def on_table_recovery(self, table: CollectionT, kind: str,
+                          stats: Mapping[TP, Mapping[str, Any]]) -> None:
+        ...
+
 
 class SensorT(SensorInterfaceT, ServiceT):
     ...
@@ -22,7 +22,7 @@ from .router import RouterT
 from .sensors import SensorT
 from .serializers import RegistryT
 from .streams import StreamT
-from .tables import TableManagerT, TableT
+from .tables import GlobalTableT, TableManagerT, TableT
 from .topics import TopicT
 from .web import HttpClientT
 
@@ -64,8 +64,23 @@ TABLE_MANAGER_TYPE = 'faust.tables.TableManager'
 #: Path to table class, used as default for :setting:`Table`.
 TABLE_TYPE = 'faust.Table'
 
-#: Path to set class, used as default for :setting:`Set`.
-SET_TYPE = 'faust.Set'
+#: Path to global table class, used as default for :setting:`GlobalTable`.
+GLOBAL_TABLE_TYPE = 'faust.GlobalTable'
+
+#: Path to set table class, used as default for :setting:`SetTable`.
+SET_TABLE_TYPE = 'faust.SetTable'
+
+#: Path to list table class, used as default for :setting:`ListTable`.
+LIST_TABLE_TYPE = 'faust.ListTable'
+
+#: Path to counter table class, used as default for :setting:`CounterTable`.
+COUNTER_TABLE_TYPE = 'faust.CounterTable'
+
+#: Path to numeric table class, used as default for :setting:`NumericTable`.
+NUMERIC_TABLE_TYPE = 'faust.NumericTable'
+
+#: Path to sketch table class, used as default for :setting:`SketchTable`.
+SKETCH_TABLE_TYPE = 'faust.SketchTable'
 
 #: Path to serializer registry class, used as the default for
 #: :setting:`Serializers`.
@@ -194,6 +209,7 @@ class Settings(abc.ABC):
     broker_client_id: str = BROKER_CLIENT_ID
     broker_commit_every: int = BROKER_COMMIT_EVERY
     broker_check_crcs: bool = True
+    broker_cooperative_rebalance: bool = False
     id_format: str = '{id}-v{self.version}'
     origin: Optional[str] = None
     key_serializer: CodecArg = 'json'
@@ -207,6 +223,10 @@ class Settings(abc.ABC):
     stream_ack_exceptions: bool = True
     stream_publish_on_commit: bool = STREAM_PUBLISH_ON_COMMIT
     table_standby_replicas: int = 1
+    table_memory_budget: Optional[int] = None
+    table_max_migrations: Optional[int] = None
+    table_max_warmup_replicas: int = 2
+    table_acceptable_recovery_lag: int = 10_000
     topic_replication_factor: int = 1
     topic_partitions: int = 8  # noqa: E704
     loghandlers: List[logging.StreamHandler]
@@ -232,10 +252,18 @@ class Settings(abc.ABC):
     _broker_commit_interval: float = BROKER_COMMIT_INTERVAL
     _broker_commit_livelock_soft_timeout: float = BROKER_LIVELOCK_SOFT
     _table_cleanup_interval: float = TABLE_CLEANUP_INTERVAL
+    _table_checkpoint_interval: Optional[float] = None
+    _table_checkpoint_url: Optional[URL] = None
     _reply_expires: float = REPLY_EXPIRES
     _Agent: Type[AgentT]
     _Stream: Type[StreamT]
     _Table: Type[TableT]
+    _GlobalTable: Type[GlobalTableT]
+    _SetTable: Type[TableT]
+    _ListTable: Type[TableT]
+    _CounterTable: Type[TableT]
+    _NumericTable: Type[TableT]
+    _SketchTable: Type[TableT]
     _TableManager: Type[TableManagerT]
     _Serializers: Type[RegistryT]
     _Worker: Type[WorkerT]
@@ -266,6 +294,7 @@ class Settings(abc.ABC):
             broker_session_timeout: Seconds = None,
             broker_heartbeat_interval: Seconds = None,
             broker_check_crcs: bool = None,
+            broker_cooperative_rebalance: bool = None,
             agent_supervisor: SymbolArg[Type[SupervisorStrategyT]] = None,
             store: Union[str, URL] = None,
             autodiscover: AutodiscoverArg = None,
@@ -278,6 +307,12 @@ class Settings(abc.ABC):
             loghandlers: List[logging.StreamHandler] = None,
             table_cleanup_interval: Seconds = None,
             table_standby_replicas: int = None,
+            table_memory_budget: int = None,
+            table_max_migrations: int = None,
+            table_max_warmup_replicas: int = None,
+            table_acceptable_recovery_lag: int = None,
+            table_checkpoint_interval: Seconds = None,
+            table_checkpoint_url: Union[str, URL] = None,
             topic_replication_factor: int = None,
             topic_partitions: int = None,
             id_format: str = None,
@@ -300,6 +335,12 @@ class Settings(abc.ABC):
             Agent: SymbolArg[Type[AgentT]] = None,
             Stream: SymbolArg[Type[StreamT]] = None,
             Table: SymbolArg[Type[TableT]] = None,
+            GlobalTable: SymbolArg[Type[GlobalTableT]] = None,
+            SetTable: SymbolArg[Type[TableT]] = None,
+            ListTable: SymbolArg[Type[TableT]] = None,
+            CounterTable: SymbolArg[Type[TableT]] = None,
+            NumericTable: SymbolArg[Type[TableT]] = None,
+            SketchTable: SymbolArg[Type[TableT]] = None,
             TableManager: SymbolArg[Type[TableManagerT]] = None,
             Serializers: SymbolArg[Type[RegistryT]] = None,
             Worker: SymbolArg[Type[WorkerT]] = None,
@@ -343,12 +384,26 @@ class Settings(abc.ABC):
             self.broker_commit_every = broker_commit_every
         if broker_check_crcs is not None:
             self.broker_check_crcs = broker_check_crcs
+        if broker_cooperative_rebalance is not None:
+            self.broker_cooperative_rebalance = broker_cooperative_rebalance
         if key_serializer is not None:
             self.key_serializer = key_serializer
         if value_serializer is not None:
             self.value_serializer = value_serializer
         if table_standby_replicas is not None:
             self.table_standby_replicas = table_standby_replicas
+        if table_memory_budget is not None:
+            self.table_memory_budget = table_memory_budget
+        if table_max_migrations is not None:
+            self.table_max_migrations = table_max_migrations
+        if table_max_warmup_replicas is not None:
+            self.table_max_warmup_replicas = table_max_warmup_replicas
+        if table_acceptable_recovery_lag is not None:
+            self.table_acceptable_recovery_lag = table_acceptable_recovery_lag
+        if table_checkpoint_interval is not None:
+            self.table_checkpoint_interval = table_checkpoint_interval
+        if table_checkpoint_url is not None:
+            self.table_checkpoint_url = table_checkpoint_url
         if topic_replication_factor is not None:
             self.topic_replication_factor = topic_replication_factor
         if topic_partitions is not None:
@@ -395,7 +450,12 @@ class Settings(abc.ABC):
         self.Agent = Agent or AGENT_TYPE
         self.Stream = Stream or STREAM_TYPE
         self.Table = Table or TABLE_TYPE
-        self.Set = Set or SET_TYPE
+        self.GlobalTable = GlobalTable or GLOBAL_TABLE_TYPE
+        self.SetTable = SetTable or SET_TABLE_TYPE
+        self.ListTable = ListTable or LIST_TABLE_TYPE
+        self.CounterTable = CounterTable or COUNTER_TABLE_TYPE
+        self.NumericTable = NumericTable or NUMERIC_TABLE_TYPE
+        self.SketchTable = SketchTable or SKETCH_TABLE_TYPE
         self.TableManager = TableManager or TABLE_MANAGER_TYPE
         self.Serializers = Serializers or REGISTRY_TYPE
         self.Worker = Worker or WORKER_TYPE
@@ -533,6 +593,23 @@ class Settings(abc.ABC):
     def table_cleanup_interval(self, value: Seconds) -> None:
         self._table_cleanup_interval = want_seconds(value)
 
+    @property
+    def table_checkpoint_interval(self) -> Optional[float]:
+        return self._table_checkpoint_interval
+
+    @table_checkpoint_interval.setter
+    def table_checkpoint_interval(self, value: Optional[Seconds]) -> None:
+        self._table_checkpoint_interval = (
+            want_seconds(value) if value is not None else None)
+
+    @property
+    def table_checkpoint_url(self) -> Optional[URL]:
+        return self._table_checkpoint_url
+
+    @table_checkpoint_url.setter
+    def table_checkpoint_url(self, value: Union[str, URL, None]) -> None:
+        self._table_checkpoint_url = URL(value) if value else None
+
     @property
     def reply_expires(self) -> float:
         return self._reply_expires
@@ -574,6 +651,54 @@ class Settings(abc.ABC):
     def Table(self, Table: SymbolArg[Type[TableT]]) -> None:
         self._Table = symbol_by_name(Table)
 
+    @property
+    def GlobalTable(self) -> Type[GlobalTableT]:
+        return self._GlobalTable
+
+    @GlobalTable.setter
+    def GlobalTable(self, GlobalTable: SymbolArg[Type[GlobalTableT]]) -> None:
+        self._GlobalTable = symbol_by_name(GlobalTable)
+
+    @property
+    def SetTable(self) -> Type[TableT]:
+        return self._SetTable
+
+    @SetTable.setter
+    def SetTable(self, SetTable: SymbolArg[Type[TableT]]) -> None:
+        self._SetTable = symbol_by_name(SetTable)
+
+    @property
+    def ListTable(self) -> Type[TableT]:
+        return self._ListTable
+
+    @ListTable.setter
+    def ListTable(self, ListTable: SymbolArg[Type[TableT]]) -> None:
+        self._ListTable = symbol_by_name(ListTable)
+
+    @property
+    def CounterTable(self) -> Type[TableT]:
+        return self._CounterTable
+
+    @CounterTable.setter
+    def CounterTable(self, CounterTable: SymbolArg[Type[TableT]]) -> None:
+        self._CounterTable = symbol_by_name(CounterTable)
+
+    @property
+    def NumericTable(self) -> Type[TableT]:
+        return self._NumericTable
+
+    @NumericTable.setter
+    def NumericTable(self, NumericTable: SymbolArg[Type[TableT]]) -> None:
+        self._NumericTable = symbol_by_name(NumericTable)
+
+    @property
+    def SketchTable(self) -> Type[TableT]:
+        return self._SketchTable
+
+    @SketchTable.setter
+    def SketchTable(self, SketchTable: SymbolArg[Type[TableT]]) -> None:
+        self._SketchTable = symbol_by_name(SketchTable)
+
     @property
     def TableManager(self) -> Type[TableManagerT]:
         return self._TableManager
@@ -4,9 +4,12 @@ from typing import (
     Any,
     Callable,
     Iterable,
+    Iterator,
+    Mapping,
     MutableMapping,
     Optional,
     Set,
+    Tuple,
     Union,
 )
 
@@ -39,6 +42,10 @@ class StoreT(ServiceT, MutableMapping):
     key_serializer: CodecArg
     value_serializer: CodecArg
 
+    #: Function returning the time a key expires at,
+    #: set by windowed tables with an expiry.
+    key_expires: Optional[Callable[[Any], float]] = None
+
     @abc.abstractmethod
     def __init__(self,
                  url: Union[str, URL],
@@ -52,10 +59,26 @@ class StoreT(ServiceT, MutableMapping):
                  **kwargs: Any) -> None:
         ...
 
+    # Set for windowed tables, where keys are ``(key, window_range)``.
+    @property
+    @abc.abstractmethod
+    def windowed(self) -> bool:
+        ...
+
+    @windowed.setter
+    def windowed(self, windowed: bool) -> None:
+        ...
+
     @abc.abstractmethod
     def persisted_offset(self, tp: TP) -> Optional[int]:
         ...
 
+    # Like persisted_offset, but returns None for partitions the store
+    # would have to open (e.g. read from disk) first.
+    @abc.abstractmethod
+    def persisted_offset_if_open(self, tp: TP) -> Optional[int]:
+        ...
+
     @abc.abstractmethod
     def set_persisted_offset(self, tp: TP, offset: int) -> None:
         ...
@@ -70,10 +93,58 @@ class StoreT(ServiceT, MutableMapping):
                               to_value: Callable[[Any], Any]) -> None:
         ...
 
+    @abc.abstractmethod
+    async def apply_changelog_batch_async(
+            self, batch: Iterable[EventT],
+            to_key: Callable[[Any], Any],
+            to_value: Callable[[Any], Any]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def get_async(self, key: Any, default: Any = None) -> Any:
+        ...
+
+    @abc.abstractmethod
+    async def get_many_async(self, keys: Iterable[Any]) -> Mapping[Any, Any]:
+        ...
+
+    @abc.abstractmethod
+    async def set_async(self, key: Any, value: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def del_async(self, key: Any) -> None:
+        ...
+
     @abc.abstractmethod
     def reset_state(self) -> None:
         ...
 
+    @abc.abstractmethod
+    def set_many(self, items: Iterable[Tuple[Any, Any]],
+                 partition: int) -> None:
+        ...
+
+    @abc.abstractmethod
+    def iterwindows(self, key: Any,
+                    start: float = None,
+                    end: float = None,
+                    *,
+                    reverse: bool = False) -> Iterator[Tuple[Any, Any]]:
+        ...
+
+    @abc.abstractmethod
+    def set_expiry(self, key: Any, partition: int, timestamp: float) -> None:
+        ...
+
+    @abc.abstractmethod
+    def expire(self, partition: int, before: float) -> int:
+        ...
+
+    @abc.abstractmethod
+    async def expire_async(self, partition: int, before: float) -> int:
+        ...
+
     @abc.abstractmethod
     async def on_partitions_assigned(self, table: CollectionT,
                                      assigned: Set[TP]) -> None:
@@ -32,9 +32,11 @@ from .tuples import TP
 if typing.TYPE_CHECKING:
     from .app import AppT
     from .join import JoinT
+    from .tables import CollectionT
 else:
     class AppT: ...    # noqa
     class JoinT: ...   # noqa
+    class CollectionT: ...  # noqa
 
 __all__ = [
     'Processor',
@@ -170,6 +172,17 @@ class StreamT(AsyncIterable[T_co], JoinableT, ServiceT):
                    within: Seconds) -> AsyncIterable[Sequence[T_co]]:
         ...
 
+    @abc.abstractmethod
+    @no_type_check
+    async def aggregate(
+            self, table: CollectionT,
+            combine: Callable[[Any, Any], Any],
+            *,
+            value: Callable[[Any], Any] = None,
+            max_: int = 1000,
+            within: Seconds = 1.0) -> AsyncIterable[Mapping[Any, Any]]:
+        ...
+
     @abc.abstractmethod
     def enumerate(self, start: int = 0) -> AsyncIterable[Tuple[int, T_co]]:
         ...
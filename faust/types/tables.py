@@ -8,10 +8,12 @@ from typing import (
     Callable,
     ClassVar,
     Iterable,
+    List,
     Mapping,
     MutableMapping,
     Optional,
     Set,
+    Tuple,
     Type,
     Union,
 )
@@ -24,8 +26,8 @@ from .events import EventT
 from .stores import StoreT
 from .streams import JoinableT
 from .topics import TopicT
-from .tuples import TP
-from .windows import WindowT
+from .tuples import Message, TP
+from .windows import WindowRange, WindowT
 
 
 if typing.TYPE_CHECKING:
@@ -41,17 +43,20 @@ __all__ = [
     'RelativeArg',
     'CollectionT',
     'TableT',
+    'GlobalTableT',
     'TableManagerT',
     'WindowSetT',
     'WindowWrapperT',
     'ChangelogReaderT',
     'ChangelogEventCallback',
+    'WindowCloseCallback',
     'CollectionTps',
 ]
 
 RelativeHandler = Callable[[Optional[EventT]], Union[float, datetime]]
 RecoverCallback = Callable[[], Awaitable[None]]
 ChangelogEventCallback = Callable[[EventT], Awaitable[None]]
+WindowCloseCallback = Callable[[Any, WindowRange, Any], Awaitable[None]]
 RelativeArg = Optional[Union[
     FieldDescriptorT,
     RelativeHandler,
@@ -74,6 +79,15 @@ class CollectionT(ServiceT, JoinableT):
     recovery_buffer_size: int
     standby_buffer_size: int
 
+    #: Incremented every time the table is changed, by a stream
+    #: or when applying the changelog.
+    version: int = 0
+
+    @property
+    @abc.abstractmethod
+    def data(self) -> StoreT:
+        ...
+
     @abc.abstractmethod
     def __init__(self,
                  app: AppT,
@@ -89,6 +103,8 @@ class CollectionT(ServiceT, JoinableT):
                  help: str = None,
                  on_recover: RecoverCallback = None,
                  on_changelog_event: ChangelogEventCallback = None,
+                 on_window_close: WindowCloseCallback = None,
+                 allowed_lateness: Seconds = None,
                  recovery_buffer_size: int = 1000,
                  standby_buffer_size: int = None,
                  extra_topic_configs: Mapping[str, Any] = None,
@@ -108,6 +124,30 @@ class CollectionT(ServiceT, JoinableT):
     def apply_changelog_batch(self, batch: Iterable[EventT]) -> None:
         ...
 
+    @abc.abstractmethod
+    async def apply_changelog_batch_async(
+            self, batch: Iterable[EventT]) -> None:
+        ...
+
+    @property
+    @abc.abstractmethod
+    def raw_changelog(self) -> bool:
+        ...
+
+    @property
+    @abc.abstractmethod
+    def wants_changelog_events(self) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def apply_raw_changelog_batch(self, batch: Iterable[Message]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def apply_raw_changelog_batch_async(
+            self, batch: Iterable[Message]) -> None:
+        ...
+
     @abc.abstractmethod
     def persisted_offset(self, tp: TP) -> Optional[int]:
         ...
@@ -132,6 +172,19 @@ class CollectionT(ServiceT, JoinableT):
     async def on_changelog_event(self, event: EventT) -> None:
         ...
 
+    @abc.abstractmethod
+    async def on_commit(self, offsets: Mapping[TP, int]) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def on_window_close(self, key: Any, window_range: WindowRange,
+                              value: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    def watermark(self, partition: int) -> float:
+        ...
+
     @abc.abstractmethod
     def on_recover(self, fun: RecoverCallback) -> RecoverCallback:
         ...
@@ -160,6 +213,29 @@ class TableT(CollectionT, MutableMapping):
                  expires: Seconds = None) -> 'WindowWrapperT':
         ...
 
+    @abc.abstractmethod
+    def sliding(self, before: Seconds, after: Seconds,
+                expires: Seconds) -> 'WindowWrapperT':
+        ...
+
+    @abc.abstractmethod
+    def paned(self, size: Seconds, step: Seconds,
+              combine: Callable[[Any, Any], Any],
+              expires: Seconds = None) -> 'WindowWrapperT':
+        ...
+
+    @abc.abstractmethod
+    async def get_async(self, key: Any) -> Any:
+        ...
+
+    @abc.abstractmethod
+    async def set_async(self, key: Any, value: Any) -> None:
+        ...
+
+    @abc.abstractmethod
+    async def del_async(self, key: Any) -> None:
+        ...
+
     @abc.abstractmethod
     def as_ansitable(self,
                      *,
@@ -171,6 +247,10 @@ class TableT(CollectionT, MutableMapping):
         ...
 
 
+class GlobalTableT(TableT):
+    ...
+
+
 class TableManagerT(ServiceT, MutableMapping[str, CollectionT]):
     app: AppT
     recovery_completed: asyncio.Event
@@ -191,11 +271,29 @@ class TableManagerT(ServiceT, MutableMapping[str, CollectionT]):
     async def on_partitions_revoked(self, revoked: Set[TP]) -> None:
         ...
 
+    @abc.abstractmethod
+    async def on_commit(self, offsets: Mapping[TP, int]) -> None:
+        ...
+
     @property
     @abc.abstractmethod
     def changelog_topics(self) -> Set[str]:
         ...
 
+    @property
+    @abc.abstractmethod
+    def global_changelog_topics(self) -> Set[str]:
+        ...
+
+    @property
+    @abc.abstractmethod
+    def changelog_offsets(self) -> Mapping[TP, int]:
+        ...
+
+    @abc.abstractmethod
+    def reset_offsets(self, tps: Iterable[TP]) -> None:
+        ...
+
 
 class ChangelogReaderT(ServiceT):
     table: CollectionT
@@ -241,6 +339,15 @@ class WindowSetT(MutableMapping):
     def delta(self, d: Seconds, event: EventT = None) -> Any:
         ...
 
+    @abc.abstractmethod
+    def range(self, start: float = None,
+              end: float = None) -> List[Tuple[WindowRange, Any]]:
+        ...
+
+    @abc.abstractmethod
+    def latest(self, n: int = 1) -> List[Tuple[WindowRange, Any]]:
+        ...
+
     @abc.abstractmethod
     def __iadd__(self, other: Any) -> Any:
         ...
@@ -115,7 +115,7 @@ class ConsumerT(ServiceT):
         ...
 
     @abc.abstractmethod
-    async def perform_seek(self) -> None:
+    async def perform_seek(self, tps: Iterable[TP] = None) -> None:
         ...
 
     @abc.abstractmethod
@@ -171,6 +171,10 @@ class ConsumerT(ServiceT):
     def close(self) -> None:
         ...
 
+    @abc.abstractmethod
+    def request_rebalance(self) -> None:
+        ...
+
     @property
     @abc.abstractmethod
     def unacked(self) -> Set[Message]:
@@ -28,6 +28,10 @@ class WindowT(abc.ABC):
     def stale(self, timestamp: float, latest_timestamp: float) -> bool:
         ...
 
+    @abc.abstractmethod
+    def stale_before(self, latest_timestamp: float) -> Optional[float]:
+        ...
+
     @abc.abstractmethod
     def current(self, timestamp: float) -> WindowRange:
         ...
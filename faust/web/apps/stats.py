@@ -4,7 +4,7 @@ from typing import List, MutableMapping, Set
 from faust import web
 from faust.types.tuples import TP
 
-__all__ = ['Assignment', 'Stats', 'Site']
+__all__ = ['Assignment', 'Stats', 'TableRecovery', 'Site']
 
 TPMap = MutableMapping[str, List[int]]
 
@@ -36,10 +36,18 @@ class Assignment(web.View):
         })
 
 
+class TableRecovery(web.View):
+    """Table recovery and standby replication progress."""
+
+    async def get(self, request: web.Request) -> web.Response:
+        return self.json(self.app.monitor.recovery)
+
+
 class Site(web.Site):
     """Statistics views."""
 
     views = {
         '/': Stats,
         '/assignment/': Assignment,
+        '/tables/recovery/': TableRecovery,
     }
@@ -1,11 +1,13 @@
 """Window Types."""
-from typing import List
+from typing import List, Optional
 from mode import Seconds, want_seconds
+from mode.utils.collections import LRUCache
 from .types import WindowRange, WindowT
 
 __all__ = [
     'Window',
     'HoppingWindow',
+    'PanedWindow',
     'TumblingWindow',
     'SlidingWindow',
 ]
@@ -24,24 +26,39 @@ class HoppingWindow(Window):
     size: float
     step: float
 
+    #: Number of step buckets to keep window ranges cached for.
+    ranges_cache_size: int = 128
+
     def __init__(self, size: Seconds, step: Seconds,
                  expires: Seconds = None) -> None:
         self.size = want_seconds(size)
         self.step = want_seconds(step)
         self.expires = want_seconds(expires) if expires else None
+        self._ranges_cache = LRUCache(limit=self.ranges_cache_size)
 
     def ranges(self, timestamp: float) -> List[WindowRange]:
         curr = self._timestamp_window(timestamp)
-        earliest = curr.start - self.size + self.step
-        return [
-            WindowRange.from_start(float(start), self.size)
-            for start in range(int(earliest), int(curr.end), int(self.step))
-        ]
+        # Every timestamp in the same step is in the same windows,
+        # and events mostly arrive for the latest few steps.
+        try:
+            ranges = self._ranges_cache[curr.start]
+        except KeyError:
+            earliest = curr.start - self.size + self.step
+            ranges = self._ranges_cache[curr.start] = [
+                WindowRange.from_start(float(start), self.size)
+                for start in range(
+                    int(earliest), int(curr.end), int(self.step))
+            ]
+        return list(ranges)
 
     def stale(self, timestamp: float, latest_timestamp: float) -> bool:
         return (timestamp <= self._stale_before(latest_timestamp, self.expires)
                 if self.expires else False)
 
+    def stale_before(self, latest_timestamp: float) -> Optional[float]:
+        return (self._stale_before(latest_timestamp, self.expires)
+                if self.expires else None)
+
     def current(self, timestamp: float) -> WindowRange:
         return self._timestamp_window(timestamp)
 
@@ -56,6 +73,37 @@ class HoppingWindow(Window):
         return self._timestamp_window(latest_timestamp - expires).start
 
 
+class PanedWindow(HoppingWindow):
+    """Hopping window stored as panes.
+
+    Fixed-size, overlapping windows, but every event is only stored
+    in the non-overlapping pane of width ``step`` it falls into.
+    The value of a window is found by combining the values of
+    the panes in that window.
+    """
+
+    def ranges(self, timestamp: float) -> List[WindowRange]:
+        return [self.pane(timestamp)]
+
+    def windows(self, timestamp: float) -> List[WindowRange]:
+        """Return list of (hopping) windows from timestamp."""
+        return super().ranges(timestamp)
+
+    def pane(self, timestamp: float) -> WindowRange:
+        start = (timestamp // self.step) * self.step
+        return WindowRange.from_start(start, self.step)
+
+    def panes(self, window_range: WindowRange) -> List[WindowRange]:
+        """Return list of panes in window, ordered by time."""
+        start, end = window_range
+        panes = []
+        pane = self.pane(start)
+        while pane.start < end:
+            panes.append(pane)
+            pane = WindowRange.from_start(pane.end, self.step)
+        return panes
+
+
 class TumblingWindow(HoppingWindow):
     """Tumbling window type.
 
@@ -99,9 +147,19 @@ class SlidingWindow(Window):
                 start=timestamp - self.before, end=timestamp + self.after),
         ]
 
+    def current(self, timestamp: float) -> WindowRange:
+        return self.ranges(timestamp)[0]
+
+    def delta(self, timestamp: float, d: Seconds) -> WindowRange:
+        return self.current(timestamp - want_seconds(d))
+
     def stale(self, timestamp: float, latest_timestamp: float) -> bool:
         return (timestamp <= self._stale_before(self.expires, latest_timestamp)
                 if self.expires else False)
 
+    def stale_before(self, latest_timestamp: float) -> Optional[float]:
+        return (self._stale_before(self.expires, latest_timestamp)
+                if self.expires else None)
+
     def _stale_before(self, expires: float, latest_timestamp: float) -> float:
         return latest_timestamp - expires
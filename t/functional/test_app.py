@@ -38,6 +38,7 @@ class test_settings:
         assert (conf.broker_commit_livelock_soft_timeout ==
                 settings.BROKER_LIVELOCK_SOFT)
         assert conf.broker_check_crcs
+        assert not conf.broker_cooperative_rebalance
         assert conf.table_cleanup_interval == settings.TABLE_CLEANUP_INTERVAL
         assert conf.reply_to_prefix == settings.REPLY_TO_PREFIX
         assert conf.reply_expires == settings.REPLY_EXPIRES
@@ -55,6 +56,11 @@ class test_settings:
         assert conf.reply_to is not None
         assert not conf.reply_create_topic
         assert conf.table_standby_replicas == 1
+        assert conf.table_max_migrations is None
+        assert conf.table_max_warmup_replicas == 2
+        assert conf.table_acceptable_recovery_lag == 10_000
+        assert conf.table_checkpoint_interval is None
+        assert conf.table_checkpoint_url is None
         assert conf.topic_replication_factor == 1
         assert conf.topic_partitions == 8
         assert conf.loghandlers == []
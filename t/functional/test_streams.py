@@ -357,6 +357,43 @@ async def test_noack(app):
     event.ack.assert_not_called()
 
 
+@pytest.mark.asyncio
+async def test_ack__skipped_by_join(app):
+    s = new_stream(app)
+    s.on_merge = AsyncMock(name='on_merge', side_effect=[None, 2])
+    s.ack = AsyncMock(name='ack')
+    await s.channel.send(value=1)
+    await s.channel.send(value=2)
+    async for value in s:
+        assert value == 2
+        break
+    s.ack.assert_called_once()
+    assert s.ack.call_args[0][0].value == 1
+
+
+@pytest.mark.asyncio
+async def test_join__prefetch(app):
+    s = new_stream(app)
+    s.join_strategy = Mock(
+        name='join_strategy',
+        on_stream_start=AsyncMock(),
+        prefetch=AsyncMock(),
+        process=AsyncMock(side_effect=lambda value: value),
+    )
+    for i in range(3):
+        await s.channel.send(value=i)
+    values = []
+    async for value in s:
+        values.append(value)
+        if len(values) == 3:
+            break
+    # values are still processed in order.
+    assert values == [0, 1, 2]
+    s.join_strategy.prefetch.assert_called_once()
+    events = s.join_strategy.prefetch.call_args[0][0]
+    assert [event.value for event in events] == [0, 1, 2]
+
+
 @pytest.mark.asyncio
 async def test_acked_when_raising(app):
     s = new_stream(app)
@@ -468,3 +505,64 @@ async def test_stop_stops_related_streams(app):
     assert s1.should_stop
     assert s2.should_stop
     assert s3.should_stop
+
+
+@pytest.mark.asyncio
+async def test_aggregate(app):
+    s = new_stream(app)
+    table = app.Table('totals', default=int)
+    table._send_changelog = Mock(name='_send_changelog')
+    table.data['b'] = 10
+    for key, value in [('a', 1), ('b', 2), ('a', 3)]:
+        await s.channel.send(key=key, value=value)
+    processors = list(s._processors)
+    async for totals in s.aggregate(table, sum, max_=3, within=1.0):
+        assert totals == {'a': 4, 'b': 12}
+        break
+    # the stream still yields values, not (event, value) pairs.
+    assert len(s._processors) == len(processors) + 1
+    assert await s._processors[-1](5) == 5
+    assert dict(table) == {'a': 4, 'b': 12}
+    # once for every key, attached to the last event of the key.
+    table._send_changelog.assert_any_call('a', 4)
+    table._send_changelog.assert_any_call('b', 12)
+    assert table._send_changelog.call_count == 2
+    await s.stop()
+
+
+@pytest.mark.asyncio
+async def test_aggregate__average(app):
+    s = new_stream(app)
+    table = app.Table('averages')
+    table._send_changelog = Mock(name='_send_changelog')
+
+    def add_pairs(a, b):
+        return [a[0] + b[0], a[1] + b[1]]
+
+    for value in [2, 4, 9]:
+        await s.channel.send(key='a', value=value)
+    async for averages in s.aggregate(
+            table, add_pairs, value=lambda v: [v, 1], max_=3, within=1.0):
+        assert averages == {'a': [15, 3]}
+        break
+    await s.stop()
+
+
+def test_aggregate__combine(app):
+    s = new_stream(app)
+    table = app.Table('highest')
+    table._send_changelog = Mock(name='_send_changelog')
+    events = [Mock(name=f'event{i}', key=key)
+              for i, key in enumerate('aba')]
+    batch = list(zip(events, [5, 7, 1]))
+    assert s._aggregate_batch(table, max, batch) == {'a': 5, 'b': 7}
+    assert s._aggregate_batch(table, max, [(events[0], 6)]) == {'a': 6}
+
+
+@pytest.mark.asyncio
+async def test_aggregate__windowed(app):
+    s = new_stream(app)
+    table = app.Table('windowed', default=int).tumbling(10)
+    with pytest.raises(NotImplementedError):
+        async for _ in s.aggregate(table, sum):  # noqa: F841
+            ...
@@ -14,6 +14,7 @@ from faust.tables.manager import TableManager
 from faust.transport.base import Transport
 from faust.transport.conductor import Conductor
 from faust.transport.consumer import Consumer, Fetcher
+from faust.types import TP
 from faust.types.models import ModelT
 from faust.types.settings import Settings
 from mode import Service
@@ -211,6 +212,107 @@ async def test_on_partitions_assigned(assigned, *, app):
     await app._on_partitions_assigned(assigned)
 
 
+@pytest.fixture
+def cooperative_app(app):
+    app.conf.broker_cooperative_rebalance = True
+    app.consumer = Mock(
+        name='app.consumer',
+        autospec=Consumer,
+        commit=AsyncMock(),
+        pause_partitions=AsyncMock(),
+        wait_empty=AsyncMock(),
+    )
+    app.agents = Mock(
+        name='app.agents',
+        autospec=AgentManager,
+        on_partitions_assigned=AsyncMock(),
+        on_partitions_revoked=AsyncMock(),
+    )
+    app.topics = MagicMock(
+        name='app.topics',
+        autospec=Conductor,
+        on_partitions_assigned=AsyncMock(),
+        on_partitions_revoked=AsyncMock(),
+        wait_for_subscriptions=AsyncMock(),
+    )
+    app.tables = Mock(
+        name='app.tables',
+        autospec=TableManager,
+        changelog_topics={'changelog'},
+        on_partitions_assigned=AsyncMock(),
+        on_partitions_revoked=AsyncMock(),
+    )
+    app._fetcher = Mock(
+        name='app._fetcher',
+        autospec=Fetcher,
+        stop=AsyncMock(),
+    )
+    app.flow_control = Mock(
+        name='app.flow_control',
+        autospec=FlowControlEvent,
+    )
+    return app
+
+
+@pytest.mark.asyncio
+async def test_on_partitions_revoked__cooperative(*, cooperative_app):
+    app = cooperative_app
+    revoked = {TP('foo', 0), TP('foo', 1)}
+    await app._on_partitions_revoked(revoked)
+
+    app._fetcher.stop.assert_called_once_with()
+    app.consumer.commit.assert_called_once_with()
+    app.flow_control.suspend.assert_not_called()
+    app.flow_control.clear.assert_not_called()
+    app.agents.on_partitions_revoked.assert_not_called()
+    app.tables.on_partitions_revoked.assert_not_called()
+    assert app._rebalance_revoked == revoked
+
+
+@pytest.mark.asyncio
+async def test_on_partitions_assigned__cooperative(*, cooperative_app):
+    app = cooperative_app
+    app._rebalance_revoked = {
+        TP('foo', 0), TP('foo', 1), TP('changelog', 1)}
+    assigned = {TP('foo', 1), TP('foo', 2), TP('changelog', 1)}
+    revoked_signal = app.on_partitions_revoked.connect(AsyncMock())
+    assigned_signal = app.on_partitions_assigned.connect(AsyncMock())
+
+    await app._on_partitions_assigned(assigned)
+
+    app.consumer.wait_empty.assert_called_once_with()
+    app.agents.on_partitions_revoked.assert_called_once_with({TP('foo', 0)})
+    app.topics.on_partitions_revoked.assert_called_once_with({TP('foo', 0)})
+    app.tables.on_partitions_revoked.assert_called_once_with({TP('foo', 0)})
+    revoked_signal.assert_called_once_with(
+        app, {TP('foo', 0)}, signal=app.on_partitions_revoked)
+    app.agents.on_partitions_assigned.assert_called_once_with({TP('foo', 2)})
+    app.consumer.pause_partitions.assert_called_once_with({TP('foo', 2)})
+    app.topics.on_partitions_assigned.assert_called_once_with(assigned)
+    app.tables.on_partitions_assigned.assert_called_once_with(
+        {TP('foo', 2)})
+    assigned_signal.assert_called_once_with(
+        app, {TP('foo', 2)}, signal=app.on_partitions_assigned)
+    app.flow_control.resume.assert_not_called()
+    app.consumer.request_rebalance.assert_called_once_with()
+    assert not app._rebalance_revoked
+
+
+@pytest.mark.asyncio
+async def test_on_partitions_assigned__cooperative_unchanged(
+        *, cooperative_app):
+    app = cooperative_app
+    assigned = app._rebalance_revoked = {TP('foo', 0), TP('changelog', 1)}
+
+    await app._on_partitions_assigned(set(assigned))
+
+    app.consumer.wait_empty.assert_not_called()
+    app.agents.on_partitions_revoked.assert_not_called()
+    app.tables.on_partitions_revoked.assert_called_once_with(set())
+    app.tables.on_partitions_assigned.assert_called_once_with(set())
+    app.consumer.request_rebalance.assert_not_called()
+
+
 class test_App:
 
     def test_stream(self, *, app):
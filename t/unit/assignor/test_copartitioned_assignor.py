@@ -0,0 +1,115 @@
+from faust.assignor.client_assignment import CopartitionedAssignment
+from faust.assignor.copartitioned_assignor import CopartitionedAssignor
+
+TOPICS = {'foo', 'foo-table-changelog'}
+
+
+def assignment(actives=(), standbys=()):
+    return CopartitionedAssignment(
+        actives=set(actives), standbys=set(standbys), topics=TOPICS)
+
+
+class test_CopartitionedAssignor:
+
+    def test_promotes_most_caught_up_standby(self):
+        # the active for partition 0 left the group.
+        assignments = {
+            'A': assignment(actives=[1], standbys=[0]),
+            'B': assignment(actives=[2], standbys=[0]),
+        }
+        offsets = {'A': {0: 10}, 'B': {0: 100}}
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=3, replicas=0,
+            capacity=2, offsets=offsets,
+        ).get_assignment()
+        assert new['B'].actives == {0, 2}
+        assert new['A'].actives == {1}
+
+    def test_prefers_client_with_local_state(self):
+        assignments = {
+            'A': assignment(),
+            'B': assignment(),
+        }
+        offsets = {'B': {0: 3}}
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=1, replicas=0,
+            offsets=offsets,
+        ).get_assignment()
+        assert new['B'].actives == {0}
+        assert not new['A'].actives
+
+    def test_max_migrations(self):
+        assignments = {
+            'A': assignment(actives=[0, 1, 2, 3]),
+            'B': assignment(),
+        }
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=4, replicas=0,
+            max_migrations=1,
+        ).get_assignment()
+        assert len(new['A'].actives) == 3
+        assert len(new['B'].actives) == 1
+
+    def test_max_migrations__moves_cheapest(self):
+        assignments = {
+            'A': assignment(actives=[0, 1, 2, 3]),
+            'B': assignment(standbys=[2]),
+        }
+        offsets = {'A': {0: 10, 1: 10, 2: 10, 3: 10}, 'B': {2: 10}}
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=4, replicas=0,
+            offsets=offsets, max_migrations=1,
+        ).get_assignment()
+        assert new['B'].actives == {2}
+
+    def test_max_migrations__not_for_removed_clients(self):
+        assignments = {
+            'A': assignment(actives=[0, 1]),
+        }
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=4, replicas=0,
+            max_migrations=0,
+        ).get_assignment()
+        assert new['A'].actives == {0, 1, 2, 3}
+
+    def test_warmup__target_not_caught_up(self):
+        assignments = {
+            'A': assignment(actives=[0, 1]),
+            'B': assignment(),
+        }
+        offsets = {'A': {0: 50_000, 1: 50_000}}
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=2, replicas=0,
+            offsets=offsets, max_warmups=2, acceptable_recovery_lag=100,
+        ).get_assignment()
+        assert new['A'].actives == {0, 1}
+        assert not new['B'].actives
+        assert len(new['B'].warmups) == 1
+        assert new['B'].warmups <= new['B'].standbys
+
+    def test_warmup__target_caught_up(self):
+        assignments = {
+            'A': assignment(actives=[0, 1]),
+            'B': assignment(standbys=[1]),
+        }
+        offsets = {'A': {0: 50_000, 1: 50_000}, 'B': {1: 49_950}}
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=2, replicas=0,
+            offsets=offsets, max_warmups=2, acceptable_recovery_lag=100,
+        ).get_assignment()
+        assert new['A'].actives == {0}
+        assert new['B'].actives == {1}
+        assert not new['B'].warmups
+
+    def test_warmup__disabled(self):
+        assignments = {
+            'A': assignment(actives=[0, 1]),
+            'B': assignment(),
+        }
+        offsets = {'A': {0: 50_000, 1: 50_000}}
+        new = CopartitionedAssignor(
+            TOPICS, assignments, num_partitions=2, replicas=0,
+            offsets=offsets, max_warmups=0,
+        ).get_assignment()
+        assert len(new['B'].actives) == 1
+        assert not new['B'].warmups
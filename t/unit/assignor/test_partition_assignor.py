@@ -0,0 +1,118 @@
+from faust.assignor.client_assignment import ClientAssignment, ClientMetadata
+from faust.assignor.partition_assignor import PartitionAssignor
+from faust.types import TP
+from mode.utils.mocks import Mock
+
+
+def metadata(changelog_offsets):
+    return ClientMetadata(
+        assignment=ClientAssignment(actives={}, standbys={}),
+        url='http://localhost:6066',
+        changelog_distribution={},
+        changelog_offsets=changelog_offsets,
+    )
+
+
+class test_PartitionAssignor:
+
+    def test_metadata__changelog_offsets(self, *, app):
+        app.tables._table_offsets.update({
+            TP('foo-changelog', 0): 30,
+            TP('foo-changelog', 1): -1,
+            TP('bar-changelog', 3): 0,
+        })
+        assignor = PartitionAssignor(app)
+        sent = ClientMetadata.loads(assignor._metadata.dumps())
+        assert sent.changelog_offsets == {
+            'foo-changelog': {'0': 30},
+            'bar-changelog': {'3': 0},
+        }
+        assert sent.changelog_offset('foo-changelog', 0) == 30
+        assert sent.changelog_offset('foo-changelog', 1) == -1
+
+    def test_copartitioned_offsets(self):
+        offsets = PartitionAssignor._copartitioned_offsets(
+            {'foo', 'foo-changelog', 'bar-changelog'}, 2, {
+                'A': metadata({
+                    'foo-changelog': {'0': 10, '1': 20},
+                    'bar-changelog': {'0': 5},
+                    'other-changelog': {'0': 1000},
+                }),
+                'B': metadata({}),
+            })
+        assert offsets['A'] == {0: 11, 1: 21}
+        assert not offsets['B']
+
+    def test_copartitioned_offsets__lag_by_topic(self):
+        # offsets of different changelog topics are not comparable:
+        # B is behind by at most 300 messages, A by 500.
+        offsets = PartitionAssignor._copartitioned_offsets(
+            {'big-changelog', 'small-changelog'}, 1, {
+                'A': metadata({
+                    'big-changelog': {'0': 1_000_000},
+                    'small-changelog': {'0': 0},
+                }),
+                'B': metadata({
+                    'big-changelog': {'0': 999_700},
+                    'small-changelog': {'0': 200},
+                }),
+                'C': metadata({'small-changelog': {'0': 500}}),
+            })
+        assert offsets['B'][0] - offsets['A'][0] == 200
+        assert offsets['A'][0] == 1_000_001 - 500
+        # no state for the big topic.
+        assert offsets['C'][0] == 0
+
+    def test_max_migrations(self, *, app):
+        app.conf.table_max_migrations = 3
+        assert app.assignor.max_migrations == 3
+
+    def test_assigned_warmups(self, *, app):
+        assignor = PartitionAssignor(app)
+        assignor._assignment = ClientAssignment.loads(ClientAssignment(
+            actives={},
+            standbys={'foo-changelog': [1, 2]},
+            warmups={'foo-changelog': [2]},
+        ).dumps())
+        assert assignor.assigned_standbys() == {
+            TP('foo-changelog', 1), TP('foo-changelog', 2)}
+        assert assignor.assigned_warmups() == {TP('foo-changelog', 2)}
+
+    def test_withhold_moved_actives(self):
+        clients_metadata = {
+            'A': ClientMetadata(
+                assignment=ClientAssignment(
+                    actives={'foo': [0, 1]}, standbys={}),
+                url='http://a', changelog_distribution={}),
+            'B': ClientMetadata(
+                assignment=ClientAssignment(actives={}, standbys={}),
+                url='http://b', changelog_distribution={}),
+        }
+        assignments = {
+            'A': ClientAssignment(actives={'foo': [0]}, standbys={}),
+            'B': ClientAssignment(actives={'foo': [1, 2]}, standbys={}),
+        }
+        PartitionAssignor._withhold_moved_actives(
+            assignments, clients_metadata)
+        assert assignments['A'].actives == {'foo': [0]}
+        # partition 1 moves from A, partition 2 had no live owner.
+        assert assignments['B'].actives == {'foo': [2]}
+        assert assignments['B'].standbys == {'foo': [1]}
+
+    def test_global_table_standbys(self):
+        cluster = Mock(name='cluster')
+        cluster.partitions_for_topic.return_value = {0, 1, 2}
+        assignments = {
+            'A': ClientAssignment(
+                actives={'foo': [0], 'g-changelog': [0, 2]},
+                standbys={}),
+            'B': ClientAssignment(
+                actives={'foo': [1], 'g-changelog': [1]},
+                standbys={'g-changelog': [0]}),
+        }
+        PartitionAssignor._global_table_standbys(
+            assignments, {'g-changelog'}, cluster)
+        cluster.partitions_for_topic.assert_called_with('g-changelog')
+        assert assignments['A'].standbys == {'g-changelog': [1]}
+        assert assignments['B'].standbys == {'g-changelog': [0, 2]}
+        assert assignments['A'].actives['g-changelog'] == [0, 2]
@@ -86,6 +86,12 @@ class test_Sensor:
     def test_on_send_completed(self, *, sensor, producer):
         sensor.on_send_completed(producer, Mock(name='state'))
 
+    def test_on_store_stats(self, *, sensor):
+        sensor.on_store_stats('rocksdb', {'cache_hits': 1})
+
+    def test_on_table_recovery(self, *, sensor):
+        sensor.on_table_recovery(Mock(name='table'), 'active', {})
+
 
 class test_SensorDelegate:
 
@@ -155,5 +161,16 @@ class test_SensorDelegate:
         sensor.on_send_completed.assert_called_once_with(
             producer, state[sensor])
 
+    def test_on_store_stats(self, *, sensors, sensor):
+        sensors.on_store_stats('rocksdb', {'cache_hits': 1})
+        sensor.on_store_stats.assert_called_once_with(
+            'rocksdb', {'cache_hits': 1})
+
+    def test_on_table_recovery(self, *, sensors, sensor):
+        table = Mock(name='table')
+        sensors.on_table_recovery(table, 'active', {})
+        sensor.on_table_recovery.assert_called_once_with(
+            table, 'active', {})
+
     def test_repr(self, *, sensors):
         assert repr(sensors)
@@ -106,6 +106,8 @@ class test_Monitor:
             'tables': {
                 name: table.asdict() for name, table in mon.tables.items()
             },
+            'stores': mon.stores,
+            'recovery': mon.recovery,
         }
 
     def test_cleanup(self, *, mon):
@@ -252,6 +254,20 @@ class test_Monitor:
             Mock(name='producer', autospec=Producer), other_time)
         assert mon.send_latency[-1] == time() - other_time
 
+    def test_on_store_stats(self, *, mon):
+        mon.on_store_stats('rocksdb', {'cache_hits': 3})
+        assert mon.stores == {'rocksdb': {'cache_hits': 3}}
+        assert mon.asdict()['stores'] == mon.stores
+
+    def test_on_table_recovery(self, *, mon, table):
+        stats = {TP1: {'highwater': 10, 'offset': 3}}
+        mon.on_table_recovery(table, 'standby', stats)
+        assert mon.recovery == {
+            'active': {},
+            'standby': {table.name: {TP1.partition: stats[TP1]}},
+        }
+        assert mon.asdict()['recovery'] == mon.recovery
+
     def test_TableState_asdict(self, *, mon, table):
         state = mon._table_or_create(table)
         assert isinstance(state, TableState)
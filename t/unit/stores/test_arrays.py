@@ -0,0 +1,105 @@
+import pytest
+from faust import Event
+from faust.exceptions import ImproperlyConfigured
+from faust.stores.arrays import ArrayData, Store
+from mode.utils.mocks import Mock
+
+
+class test_ArrayData:
+
+    @pytest.fixture(params=[False, True], ids=['array', 'numpy'])
+    def data(self, request):
+        if request.param:
+            pytest.importorskip('numpy')
+        return ArrayData('q', use_numpy=request.param)
+
+    def test_set_get_del(self, *, data):
+        data.set_for_partition(0, 'a', 1)
+        data.set_for_partition(1, 'b', 2)
+        assert data['a'] == 1
+        assert type(data['a']) is int
+        assert dict(data) == {'a': 1, 'b': 2}
+        assert data.sizes() == {0: 1, 1: 1}
+        del data['a']
+        assert 'a' not in data
+        assert len(data) == 1
+        assert data.partitions == {1}
+        # slot is reused, starting from zero.
+        assert data.increment_many(0, ['c'], 1) == {'c': 1}
+        assert data.slots['c'] == 0
+
+    def test_increment_many(self, *, data):
+        data.set_for_partition(0, 'a', 10)
+        assert data.increment_many(0, ['a', 'b', 'a'], 1) == {'a': 12, 'b': 1}
+        assert data.increment_many(0, ['a', 'b'], [3, -1]) == {
+            'a': 15, 'b': 0}
+
+    def test_grow(self, *, data):
+        keys = list(range(100))
+        data.increment_many(3, keys, keys)
+        assert len(data._values) >= 100
+        assert data[99] == 99
+        assert data.sizes() == {3: 100}
+
+    def test_move_key(self, *, data):
+        data.set_for_partition(0, 'a', 1)
+        data.increment_many(1, ['a'], 1)
+        assert data.sizes() == {1: 1}
+        assert data.drop_partition(0) == 0
+        assert data.drop_partition(1) == 1
+        assert not data
+
+    def test_apply_batch(self, *, data):
+        data.set_for_partition(0, 'x', 1)
+        data.apply_batch(0, ({'a': 1, 'b': 2}, {'x', 'y'}))
+        assert dict(data) == {'a': 1, 'b': 2}
+
+    def test_setitem__partition_of_event(self, *, data, patching):
+        current_event = patching('faust.stores.arrays.current_event')
+        current_event.return_value.message.partition = 3
+        data['a'] = 1
+        assert data.sizes() == {3: 1}
+        current_event.return_value = None
+        data['a'] = 2
+        data['b'] = 2
+        assert data.sizes() == {3: 1, 0: 1}
+
+    def test_clear(self, *, data):
+        data.set_for_partition(0, 'a', 1)
+        data.clear()
+        assert not data
+        assert not data.sizes()
+
+
+class test_Store:
+
+    @pytest.fixture
+    def store(self, *, app):
+        return Store(url=None, app=app, value_type=float)
+
+    def test_value_type(self, *, app, store):
+        assert store.data.typecode == 'd'
+        with pytest.raises(ImproperlyConfigured):
+            Store(url=None, app=app, value_type=str)
+
+    def test_windowed(self, *, store):
+        assert not store.windowed
+        store.windowed = False
+        with pytest.raises(NotImplementedError):
+            store.windowed = True
+
+    def test_apply_changelog_batch(self, *, app, store):
+        message = Mock(name='message', partition=2)
+        deleted = Mock(name='deleted', partition=2, value=None)
+        store.set_many([('b', 1.0)], partition=2)
+        store.apply_changelog_batch([
+            Event(app, 'a', 1.5, message),
+            Event(app, 'b', None, deleted),
+        ], to_key=lambda k: k, to_value=lambda v: v)
+        assert dict(store) == {'a': 1.5}
+        assert store.partition_sizes() == {2: 1}
+
+    def test_increment_many(self, *, store):
+        assert store.increment_many(['a', 'a'], 0.5, partition=1) == {
+            'a': 1.0}
+        assert store.partition_sizes() == {1: 1}
@@ -1,7 +1,12 @@
 import pytest
 from faust import Event, Table
-from faust.stores.base import SerializedStore, Store
-from faust.types import TP
+from faust.stores.base import (
+    SerializedStore,
+    Store,
+    decode_timestamp,
+    encode_timestamp,
+)
+from faust.types import TP, WindowRange
 from mode import label
 from mode.utils.mocks import Mock
 
@@ -84,6 +89,14 @@ class test_Store:
         assert label(store)
 
 
+def test_encode_timestamp():
+    timestamps = [-1e10, -30.5, -0.001, 0.0, 0.001, 1, 30.5, 1.5e9, 1e12]
+    encoded = [encode_timestamp(ts) for ts in timestamps]
+    assert all(len(data) == 8 for data in encoded)
+    assert sorted(encoded) == encoded
+    assert [decode_timestamp(data) for data in encoded] == timestamps
+
+
 class MySerializedStore(SerializedStore):
 
     def __init__(self, *args, **kwargs):
@@ -129,20 +142,54 @@ class test_SerializedStore:
 
     def test_apply_changelog_batch(self, *, store):
         event = Mock(name='event', autospec=Event)
-        event.message.key = b'foo'
-        event.message.value = b'bar'
-        store.apply_changelog_batch([event], to_key=Mock(), to_value=Mock())
+        event.key, event.value = 'foo', 'bar'
+        event.message.key = b'"foo"'
+        event.message.value = b'"bar"'
+        store.apply_changelog_batch(
+            [event], to_key=lambda k: k, to_value=lambda v: v)
+        assert store.keep[b'"foo"'] == b'"bar"'
+
+    def test_apply_changelog_batch__event_differs(self, *, store):
+        # events made by the table (e.g. operations replayed into values)
+        # are stored with their key and value, not their message.
+        event = Mock(name='event', autospec=Event)
+        event.key, event.value = ['foo'], ['a', 'b']
+        event.message.key = b'["foo", 0]'
+        event.message.value = b'{"op": "add", "args": ["b"]}'
+        store.apply_changelog_batch(
+            [event], to_key=tuple, to_value=lambda v: v)
+        assert store.keep == {b'["foo"]': b'["a", "b"]'}
+
+    @pytest.mark.asyncio
+    async def test_apply_raw_changelog_batch_async(self, *, store):
+        message = Mock(name='message', key=b'foo', value=b'bar')
+        await store.apply_raw_changelog_batch_async([message])
         assert store.keep[b'foo'] == b'bar'
 
+    def test_apply_raw_changelog_batch__missing_key(self, *, store):
+        with pytest.raises(TypeError):
+            store.apply_raw_changelog_batch([Mock(name='m', key=None)])
+
     def test_apply_changelog_batch__delete_None_value(self, *, store):
         self.test_apply_changelog_batch(store=store)
-        assert store.keep[b'foo'] == b'bar'
+        assert store.keep[b'"foo"'] == b'"bar"'
         event = Mock(name='event', autospec=Event)
-        event.message.key = b'foo'
+        event.key, event.value = 'foo', None
+        event.message.key = b'"foo"'
         event.message.value = None
-        store.apply_changelog_batch([event], to_key=Mock(), to_value=Mock())
+        store.apply_changelog_batch(
+            [event], to_key=lambda k: k, to_value=lambda v: v)
         with pytest.raises(KeyError):
-            store.keep[b'foo']
+            store.keep[b'"foo"']
+
+    @pytest.mark.asyncio
+    async def test_get_async__set_async__del_async(self, *, store):
+        assert await store.get_async('foo', 'default') == 'default'
+        await store.set_async('foo', '303')
+        assert store['foo'] == '303'
+        assert await store.get_async('foo') == '303'
+        await store.del_async('foo')
+        assert 'foo' not in store
 
     def test_setitem__getitem__delitem(self, *, store):
         store['foo'] = '303'
@@ -163,3 +210,42 @@ class test_SerializedStore:
         store['foo'] = '303'
         store.clear()
         assert not len(store)
+
+    @pytest.mark.asyncio
+    async def test_get_many_async(self, *, store):
+        store['foo'] = 'FOO'
+        store['bar'] = 'BAR'
+        assert await store.get_many_async(['foo', 'missing', 'bar']) == {
+            'foo': 'FOO', 'bar': 'BAR'}
+
+    def test_windowed_key(self, *, store):
+        store.windowed = True
+        key = ('k', WindowRange(10.0, 20.5))
+        encoded = store._encode_key(key)
+        assert encoded == (
+            b'\x00\x00\x00\x03"k"' +
+            encode_timestamp(10.0) + encode_timestamp(20.5))
+        assert store._decode_key(encoded) == key
+        store[key] = 'value'
+        assert list(store) == [key]
+
+    def test_apply_raw_changelog_batch__windowed(self, *, store):
+        store.windowed = True
+        message = Mock(name='message', key=b'["k", [10, 20]]', value=b'"v"')
+        store.apply_raw_changelog_batch([message])
+        assert store['k', (10, 20)] == 'v'
+
+    def test_iterwindows(self, *, store):
+        store.windowed = True
+        for start in (30.0, 10.0, 20.0):
+            store['k', (start, start + 10.0)] = start
+        store['other', (10.0, 20.0)] = 0
+        assert list(store.iterwindows('k')) == [
+            (WindowRange(10.0, 20.0), 10.0),
+            (WindowRange(20.0, 30.0), 20.0),
+            (WindowRange(30.0, 40.0), 30.0),
+        ]
+        assert list(store.iterwindows('k', 15.0, 30.0, reverse=True)) == [
+            (WindowRange(30.0, 40.0), 30.0),
+            (WindowRange(20.0, 30.0), 20.0),
+        ]
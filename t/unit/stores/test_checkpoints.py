@@ -0,0 +1,33 @@
+from pathlib import Path
+from faust.stores import checkpoints
+from faust.stores.checkpoints import FileCheckpointStore
+
+
+def test_by_url():
+    assert checkpoints.by_url('file:///foo') is FileCheckpointStore
+
+
+class test_FileCheckpointStore:
+
+    def test_upload_download(self, *, tmpdir):
+        root = Path(str(tmpdir))
+        store = FileCheckpointStore(f'file://{root / "remote"}')
+        assert store.root == root / 'remote'
+        local = root / 'local'
+        local.mkdir()
+        (local / 'OFFSET').write_bytes(b'1')
+        (root / 'remote').mkdir()
+        store.upload('foo', local)
+        (local / 'OFFSET').write_bytes(b'2')
+        store.upload('foo', local)
+        assert (root / 'remote' / 'foo' / 'OFFSET').read_bytes() == b'2'
+        assert not (root / 'remote' / 'foo.old').exists()
+        assert not (root / 'remote' / 'foo.tmp').exists()
+
+        restored = root / 'restored'
+        assert store.download('foo', restored)
+        assert (restored / 'OFFSET').read_bytes() == b'2'
+
+    def test_download__missing(self, *, tmpdir):
+        store = FileCheckpointStore(f'file://{tmpdir}')
+        assert not store.download('foo', Path(str(tmpdir)) / 'bar')
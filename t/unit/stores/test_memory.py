@@ -38,12 +38,13 @@ class test_Store:
         to_key, to_value = self.mock_to_key_value(event)
         return event, to_key, to_value
 
-    def mock_event(self, key=b'key', value=b'value'):
+    def mock_event(self, key=b'key', value=b'value', partition=0):
         event = Mock(name='event', autospec=Event)
         event.key = key
         event.value = value
         event.message.key = key
         event.message.value = value
+        event.message.partition = partition
         return event
 
     def mock_to_key_value(self, event):
@@ -58,3 +59,108 @@ class test_Store:
 
     def test_reset_state(self, *, store):
         store.reset_state()
+
+    def test_apply_changelog_batch__per_partition(self, *, store):
+        events = [
+            self.mock_event(key='k1', value='v1', partition=0),
+            self.mock_event(key='k2', value='v2', partition=1),
+            self.mock_event(key='k3', value='v3', partition=1),
+            self.mock_event(key='k3', value=None, partition=1),
+        ]
+        store.apply_changelog_batch(
+            events, to_key=lambda k: k, to_value=lambda v: v)
+        assert store.data.partitions == {0: {'k1': 'v1'}, 1: {'k2': 'v2'}}
+        assert store.partition_sizes() == {0: 1, 1: 1}
+        assert store['k2'] == 'v2'
+        assert 'k3' not in store
+
+    def test_set__current_event_partition(self, *, store, patching):
+        current_event = patching('faust.stores.memory.current_event')
+        current_event.return_value.message.partition = 3
+        store['k'] = 'v'
+        assert store.data.partitions == {3: {'k': 'v'}}
+        current_event.return_value.message.partition = 4
+        store['k'] = 'v2'
+        assert store.data.partitions == {3: {}, 4: {'k': 'v2'}}
+        del store['k']
+        assert not store
+        assert not store.data.key_index
+
+    def test_drop_partition(self, *, store):
+        store.data.set_for_partition(0, 'k1', 'v1')
+        store.data.set_for_partition(1, 'k2', 'v2')
+        assert store.data.drop_partition(0) == 1
+        assert store.data.drop_partition(0) == 0
+        assert list(store.items()) == [('k2', 'v2')]
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_assigned(self, *, app, store):
+        table = app.Table('table1')
+        topic = table.changelog_topic.get_topic_name()
+        store.table_name = 'table1'
+        app.assignor._assignment.actives.update({topic: [0]})
+        app.assignor._assignment.standbys.update({topic: [1]})
+        app.tables._table_offsets.update({
+            TP(topic, 0): 10, TP(topic, 1): 11, TP(topic, 2): 12})
+        for partition in (0, 1, 2):
+            store.data.set_for_partition(partition, partition, 'value')
+        app.sensors.on_store_stats = Mock(name='on_store_stats')
+        await store.on_partitions_assigned(table, {TP(topic, 0)})
+        assert set(store) == {0, 1}
+        assert app.tables.changelog_offsets == {
+            TP(topic, 0): 10, TP(topic, 1): 11}
+        app.sensors.on_store_stats.assert_called_once_with(
+            'memory.table1', {'size.0': 1, 'size.1': 1})
+
+    def test_expire(self, *, store):
+        store.data.set_for_partition(0, 'k1', 'v1')
+        store.data.set_for_partition(0, 'k2', 'v2')
+        store.data.set_for_partition(1, 'k3', 'v3')
+        store.set_expiry('k1', 0, 10.0)
+        store.set_expiry('k2', 0, 20.0)
+        store.set_expiry('k3', 1, 10.0)
+        store.set_expiry('gone', 0, 10.0)
+        assert store.expire(0, 10.0) == 2
+        assert set(store) == {'k2', 'k3'}
+        assert store.expire(0, 10.0) == 0
+        assert store.expire(2, 10.0) == 0
+
+    def test_apply_changelog_batch__key_expires(self, *, store):
+        store.key_expires = lambda key: key[1][1]
+        events = [self.mock_event(key=('k', (0, 10)), value='v', partition=1)]
+        store.apply_changelog_batch(
+            events, to_key=lambda k: k, to_value=lambda v: v)
+        assert store.expire(1, 10.0) == 1
+        assert not store
+
+    def test_set_many(self, *, store):
+        store.key_expires = lambda key: key[1][1]
+        store.set_many([(('k', (0, 10)), 1), (('k', (5, 15)), 2)], 1)
+        assert store.data.partitions == {
+            1: {('k', (0, 10)): 1, ('k', (5, 15)): 2}}
+        assert store.expire(1, 10.0) == 1
+        assert list(store) == [('k', (5, 15))]
+
+    @pytest.mark.asyncio
+    async def test_get_many_async(self, *, store):
+        store.data.set_for_partition(0, 'k1', 'v1')
+        store.data.set_for_partition(1, 'k2', 'v2')
+        assert await store.get_many_async(['k1', 'k2', 'k3']) == {
+            'k1': 'v1', 'k2': 'v2'}
+
+    def test_iterwindows(self, *, store):
+        store.data.set_for_partition(0, ('k', (0, 10)), 1)
+        store.windowed = True
+        assert store.windowed
+        store.data.set_for_partition(0, ('k', (10, 20)), 2)
+        store.data.set_for_partition(1, ('k', (5, 15)), 3)
+        store.set_many([(('k', (20, 30)), 4), (('j', (0, 10)), 5)], 0)
+        assert list(store.iterwindows('k', 5, 19)) == [
+            ((5, 15), 3), ((10, 20), 2)]
+        assert list(store.iterwindows('k', reverse=True))[0] == ((20, 30), 4)
+        del store[('k', (0, 10))]
+        store.data.drop_partition(1)
+        assert list(store.iterwindows('k')) == [((10, 20), 2), ((20, 30), 4)]
+        store.data.drop_partition(0)
+        assert list(store.iterwindows('k')) == []
+        assert store.data.windows == {}
@@ -0,0 +1,586 @@
+import asyncio
+import shutil
+import threading
+import pytest
+from faust.stores import rocksdb as rdb
+from faust.stores.checkpoints import FileCheckpointStore
+from faust.stores.rocksdb import (
+    CHECKPOINT_OFFSET_FILE,
+    MIN_WRITE_BUFFER_SIZE,
+    RocksDBOptions,
+    RocksDBResources,
+    Store,
+)
+from faust.types import TP, WindowRange
+from mode.utils.mocks import AsyncMock, Mock
+
+TP1 = TP('foo', 0)
+TP2 = TP('foo', 1)
+
+
+class FakeIterator:
+    # Sorted items iterator, like rocksdb.BaseIterator.
+
+    def __init__(self, items, reverse=False):
+        self.items = sorted(items)
+        self.reverse = reverse
+        self.pos = len(self.items) - 1 if reverse else 0
+
+    def __reversed__(self):
+        return type(self)(self.items, reverse=not self.reverse)
+
+    def seek(self, key):
+        self.pos = sum(1 for k, _ in self.items if k < key)
+
+    def seek_to_first(self):
+        self.pos = 0
+
+    def seek_for_prev(self, key):
+        self.pos = sum(1 for k, _ in self.items if k <= key) - 1
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not 0 <= self.pos < len(self.items):
+            raise StopIteration()
+        item = self.items[self.pos]
+        self.pos += -1 if self.reverse else 1
+        return item
+
+
+@pytest.fixture
+def rocks(*, patching):
+    return patching('faust.stores.rocksdb.rocksdb')
+
+
+class test_RocksDBResources:
+
+    @pytest.fixture
+    def resources(self, *, app, rocks):
+        return RocksDBResources(app, memory_budget=1000 * 1024 ** 2)
+
+    def test_for_app(self, *, app, rocks):
+        resources = RocksDBResources.for_app(app)
+        assert RocksDBResources.for_app(app) is resources
+
+    def test_budget(self, *, resources, rocks):
+        assert resources.write_buffer_budget == 250 * 1024 ** 2
+        cache_total = (resources.block_cache_size +
+                       resources.block_cache_compressed_size)
+        assert cache_total == 750 * 1024 ** 2
+        rocks.LRUCache.assert_any_call(resources.block_cache_size)
+        rocks.LRUCache.assert_any_call(
+            resources.block_cache_compressed_size)
+
+    def test_no_budget(self, *, app, rocks):
+        options = RocksDBOptions(block_cache_size=303)
+        resources = RocksDBResources(app, options=options)
+        assert resources.memory_budget is None
+        assert resources.block_cache_size == 303
+        assert resources.write_buffer_size_for(options) == (
+            options.write_buffer_size)
+
+    def test_write_buffer_size_for(self, *, app, resources):
+        app.tables._changelogs['foo'] = Mock(name='table')
+        app.assignor._assignment.actives.update({'foo': [0, 1]})
+        app.assignor._assignment.standbys.update({'foo': [2, 3], 'bar': [0]})
+        options = RocksDBOptions(write_buffer_size=1024 ** 3)
+        assert resources.write_buffer_size_for(options) == (
+            resources.write_buffer_budget // (
+                options.max_write_buffer_number * 4))
+
+    def test_write_buffer_size_for__minimum(self, *, resources):
+        resources.write_buffer_budget = 10
+        assert resources.write_buffer_size_for(RocksDBOptions()) == (
+            MIN_WRITE_BUFFER_SIZE)
+
+    def test_get__hit(self, *, resources):
+        db = Mock(name='db')
+        db.key_may_exist.return_value = (True, b'value')
+        assert resources.get(db, b'key') == b'value'
+        db.get.assert_not_called()
+        assert resources.cache_hits == 1
+
+    def test_get__miss(self, *, resources):
+        db = Mock(name='db')
+        db.key_may_exist.return_value = (True, None)
+        db.get.return_value = b'value'
+        assert resources.get(db, b'key') == b'value'
+        db.get.assert_called_once_with(b'key')
+        assert resources.cache_misses == 1
+
+    def test_get__not_found(self, *, resources):
+        db = Mock(name='db')
+        db.key_may_exist.return_value = (False, None)
+        assert resources.get(db, b'key') is None
+        db.get.assert_not_called()
+
+    def test_stats(self, *, resources):
+        db1, db2 = Mock(name='db1'), Mock(name='db2')
+        db1.get_property.return_value = b'100'
+        db2.get_property.return_value = b'200'
+        resources.add_db(db1)
+        resources.add_db(db2)
+        resources.cache_hits, resources.cache_misses = 3, 1
+        stats = resources.stats()
+        assert stats['open_dbs'] == 2
+        assert stats['block_cache_usage'] == 200
+        assert stats['memtable_usage'] == 300
+        assert stats['cache_hit_rate'] == 0.75
+        resources.remove_db(db1)
+        resources.remove_db(db2)
+        assert resources.stats()['block_cache_usage'] == 0
+        assert resources.stats()['memtable_usage'] == 0
+
+
+class test_Store:
+
+    @pytest.fixture
+    def store(self, *, app, rocks, event_loop):
+        store = Store('rocksdb://', app, table_name='table1')
+        store.resources.loop = event_loop
+        return store
+
+    def test_requires_rocksdb(self, *, app, patching):
+        patching('faust.stores.rocksdb.rocksdb', None)
+        with pytest.raises(rdb.ImproperlyConfigured):
+            Store('rocksdb://', app, table_name='table1')
+
+    def test_shares_resources(self, *, app, store):
+        other = Store('rocksdb://', app, table_name='table2')
+        assert other.resources is store.resources
+
+    def test_open_for_partition(self, *, store, rocks):
+        db = store._db_for_partition(1)
+        assert db is rocks.DB.return_value
+        assert db in store.resources._dbs
+        options = rocks.BlockBasedTableFactory.call_args[1]
+        assert options['block_cache'] is store.resources.block_cache
+
+    def test_persisted_offset_if_open(self, *, store, rocks):
+        assert store.persisted_offset_if_open(TP1) is None
+        rocks.DB.assert_not_called()
+        db = store._dbs[TP1.partition] = Mock(name='db')
+        db.get.return_value = b'303'
+        assert store.persisted_offset_if_open(TP1) == 303
+        assert store.persisted_offset(TP1) == 303
+
+    def test_open_for_partition__format(self, *, store, rocks):
+        db = rocks.DB.return_value
+        db.get.return_value = None
+        db.iterkeys.return_value = FakeIterator([])
+        assert store._open_for_partition(1) is db
+        db.put.assert_called_once_with(
+            store.format_key, str(rdb.FORMAT_VERSION).encode())
+
+    def test_open_for_partition__current_format(self, *, store, rocks):
+        db = rocks.DB.return_value
+        db.get.return_value = str(rdb.FORMAT_VERSION).encode()
+        assert store._open_for_partition(1) is db
+        db.put.assert_not_called()
+
+    def test_open_for_partition__newer_format(self, *, store, rocks):
+        db = rocks.DB.return_value
+        db.get.return_value = str(rdb.FORMAT_VERSION + 1).encode()
+        with pytest.raises(rdb.ImproperlyConfigured):
+            store._open_for_partition(1)
+        db.close.assert_called_once_with()
+
+    def test_open_for_partition__old_windowed(self, *, store, rocks,
+                                              patching):
+        rmtree = patching('shutil.rmtree')
+        store.windowed = True
+        old_db, new_db = Mock(name='old_db'), Mock(name='new_db')
+        old_db.get.return_value = None
+        old_db.iterkeys.return_value = FakeIterator([
+            (b'["k", [0, 10]]', None)])
+        rocks.DB.side_effect = [old_db, new_db]
+        assert store._open_for_partition(1) is new_db
+        old_db.close.assert_called_once_with()
+        rmtree.assert_called_once_with(store.partition_path(1))
+        new_db.put.assert_called_once_with(
+            store.format_key, str(rdb.FORMAT_VERSION).encode())
+
+    def test_open_for_partition__old_not_windowed(self, *, store, rocks):
+        # keys of tables that are not windowed did not change.
+        db = rocks.DB.return_value
+        db.get.return_value = None
+        db.iterkeys.return_value = FakeIterator([(b'"k"', None)])
+        assert store._open_for_partition(1) is db
+        db.put.assert_called_once_with(
+            store.format_key, str(rdb.FORMAT_VERSION).encode())
+
+    def test_get(self, *, store):
+        db = store._dbs[0] = Mock(name='db')
+        db.key_may_exist.return_value = (True, b'value')
+        assert store._get(b'key') == b'value'
+        assert store._key_index[b'key'] == 0
+        assert store._contains(b'key')
+
+    def test_get__missing(self, *, store):
+        db = store._dbs[0] = Mock(name='db')
+        db.key_may_exist.return_value = (False, None)
+        assert store._get(b'key') is None
+        assert not store._contains(b'key')
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_revoked(self, *, app, store):
+        table = app.Table('table1')
+        db = store._db_for_partition(TP1.partition)
+        await store.on_partitions_revoked(
+            table, {TP(table.changelog_topic.get_topic_name(), 0)})
+        assert not store._dbs
+        assert db not in store.resources._dbs
+        db.close.assert_called_once_with()
+
+    def test_close_db__no_close_method(self, *, store):
+        db = store._dbs[0] = Mock(name='db', spec=['get', 'put'])
+        store.resources.add_db(db)
+        store._close_db_for_partition(0)
+        assert not store._dbs
+        assert db not in store.resources._dbs
+
+    def test_reset_state(self, *, store, patching):
+        rmtree = patching('shutil.rmtree')
+        db = store._db_for_partition(0)
+        store.reset_state()
+        db.close.assert_called_once_with()
+        assert not store._dbs
+        rmtree.assert_called_once_with(store.path.absolute())
+
+    @pytest.mark.asyncio
+    async def test_get_async(self, *, store):
+        db = store._dbs[0] = Mock(name='db')
+        db.key_may_exist.return_value = (True, b'value')
+        assert await store._get_async(b'key') == b'value'
+        assert 'get_latency' in store.resources.stats()
+
+    @pytest.mark.asyncio
+    async def test_set_async(self, *, store, patching):
+        event = patching('faust.stores.rocksdb.current_event').return_value
+        event.message.partition = 1
+        db = store._dbs[1] = Mock(name='db')
+        await store._set_async(b'key', b'value')
+        db.put.assert_called_once_with(b'key', b'value')
+        assert store._key_index[b'key'] == 1
+
+    def test_set__in_executor(self, *, store, patching):
+        event = patching('faust.stores.rocksdb.current_event').return_value
+        event.message.partition = 1
+        db = store._dbs[1] = Mock(name='db')
+        threads = []
+        db.put.side_effect = lambda *args: threads.append(
+            threading.current_thread())
+        store._set(b'key', b'value')
+        db.put.assert_called_once_with(b'key', b'value')
+        assert threads[0].name.startswith('rocksdb-io-')
+        assert store._key_index[b'key'] == 1
+
+    def test_del(self, *, store):
+        db1 = store._dbs[0] = Mock(name='db1')
+        db2 = store._dbs[1] = Mock(name='db2')
+        store._del(b'key')
+        db1.delete.assert_called_once_with(b'key')
+        db2.delete.assert_called_once_with(b'key')
+        store._key_index[b'key'] = 1
+        store._del(b'key')
+        assert db1.delete.call_count == 1
+        assert db2.delete.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_del_async(self, *, store):
+        db1 = store._dbs[0] = Mock(name='db1')
+        db2 = store._dbs[1] = Mock(name='db2')
+        await store._del_async(b'key')
+        db1.delete.assert_called_once_with(b'key')
+        db2.delete.assert_called_once_with(b'key')
+
+    def test_changelog_batches(self, *, store, rocks):
+        messages = [
+            Mock(name='message1',
+                 tp=TP1, partition=0, offset=3, key=b'k1', value=b'v1'),
+            Mock(name='message2',
+                 tp=TP1, partition=0, offset=4, key=b'k2', value=None),
+        ]
+        batches = dict(store._changelog_batches(
+            store._message_entries(messages)))
+        batch = batches[0]
+        batch.put.assert_any_call(b'k1', b'v1')
+        batch.delete.assert_called_once_with(b'k2')
+        batch.put.assert_any_call(store.offset_key, b'4')
+
+    def test_changelog_batches__no_key(self, *, store, rocks):
+        messages = [Mock(name='message', tp=TP1, partition=0, offset=3,
+                         key=None, value=b'v1')]
+        batch = dict(store._changelog_batches(
+            store._message_entries(messages)))[0]
+        batch.put.assert_called_once_with(store.offset_key, b'3')
+        batch.delete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_apply_changelog_batch_async(self, *, store, rocks):
+        db = store._dbs[0] = Mock(name='db')
+        events = [Mock(name='event', key='k1', value='v1', message=Mock(
+            tp=TP1, partition=0, offset=3, key=b'"k1"', value=b'"v1"'))]
+        await store.apply_changelog_batch_async(
+            events, to_key=lambda k: k, to_value=lambda v: v)
+        db.write.assert_called_once_with(rocks.WriteBatch())
+
+    def test_apply_changelog_batch(self, *, store, rocks):
+        db = store._dbs[0] = Mock(name='db')
+        # the event key and value are stored, not the message.
+        events = [Mock(name='event', key='k1', value=['a'], message=Mock(
+            tp=TP1, partition=0, offset=3, key=b'["k1", 0]', value=b'op'))]
+        store.apply_changelog_batch(
+            events, to_key=lambda k: k, to_value=lambda v: v)
+        rocks.WriteBatch().put.assert_any_call(b'"k1"', b'["a"]')
+        db.write.assert_called_once_with(rocks.WriteBatch())
+
+    def test_changelog_batches__key_expires(self, *, store, rocks):
+        store.key_expires = lambda key: key[1][1]
+        messages = [Mock(name='message1', tp=TP1, partition=0, offset=3,
+                         key=b'["k", [0, 10.5]]', value=b'v1')]
+        batch = dict(store._changelog_batches(
+            store._message_entries(messages)))[0]
+        batch.put.assert_any_call(
+            store.expiry_prefix + (10500).to_bytes(8, 'big') +
+            b'["k", [0, 10.5]]', b'')
+
+    def test_set_expiry(self, *, store):
+        db = store._dbs[1] = Mock(name='db')
+        store.set_expiry(['k', [0, 10]], 1, 10.0)
+        db.put.assert_called_once_with(
+            store.expiry_prefix + (10000).to_bytes(8, 'big') +
+            b'["k", [0, 10]]', b'')
+
+    def test_expire(self, *, store, rocks):
+        index = [
+            store._expiry_key(b'k1', 5.0),
+            store._expiry_key(b'k2', 10.0),
+            store._expiry_key(b'k3', 10.001),
+            store.offset_key,
+        ]
+        db = store._dbs[0] = Mock(name='db')
+        it = db.iterkeys.return_value
+        it.__iter__ = Mock(return_value=iter(sorted(index)))
+        batch = rocks.WriteBatch.return_value
+        assert store.expire(0, 10.0) == 2
+        it.seek.assert_called_once_with(store.expiry_prefix)
+        batch.delete.assert_any_call(b'k1')
+        batch.delete.assert_any_call(b'k2')
+        batch.delete.assert_any_call(index[1])
+        assert batch.delete.call_count == 4
+        db.write.assert_called_once_with(batch)
+        assert store.expire(1, 10.0) == 0
+
+    @pytest.mark.asyncio
+    async def test_expire_async(self, *, store):
+        db = store._dbs[0] = Mock(name='db')
+        store._expire_db = Mock(name='_expire_db', return_value=3)
+        store.resources.run = AsyncMock(
+            name='run', side_effect=lambda op, partition, fun, *args: fun(
+                *args))
+        assert await store.expire_async(0, 10.0) == 3
+        store.resources.run.assert_called_once_with(
+            'expire', 0, store._expire_db, db, 10.0)
+        store._expire_db.assert_called_once_with(db, 10.0)
+        assert await store.expire_async(1, 10.0) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_many_async(self, *, store):
+        store._get = Mock(name='_get', side_effect=[b'"v1"', None])
+        store.resources.run = AsyncMock(
+            name='run', side_effect=lambda op, partition, fun, *args: fun(
+                *args))
+        assert await store.get_many_async(['k1', 'k2']) == {'k1': 'v1'}
+        assert store.resources.run.call_count == 1
+        assert await store._get_many_async([]) == []
+
+    def test_set_many(self, *, store, rocks):
+        store.key_expires = lambda key: key[1][1]
+        db = store._dbs[1] = Mock(name='db')
+        batch = rocks.WriteBatch.return_value
+        store.set_many([(['k', [0, 10]], 1), (['k', [5, 15]], 2)], 1)
+        batch.put.assert_any_call(b'["k", [0, 10]]', b'1')
+        batch.put.assert_any_call(
+            store._expiry_key(b'["k", [5, 15]]', 15), b'')
+        assert batch.put.call_count == 4
+        db.write.assert_called_once_with(batch)
+        assert store._key_index[b'["k", [5, 15]]'] == 1
+
+    def test_visible_keys__skips_index(self, *, store):
+        db = Mock(name='db')
+        it = db.iterkeys.return_value
+        it.__iter__ = Mock(return_value=iter([
+            b'k1', store.offset_key, store._expiry_key(b'k1', 1.0)]))
+        assert list(store._visible_keys(db)) == [b'k1']
+
+    def test_iterwindows(self, *, store):
+        store.windowed = True
+        items = [
+            (store._encode_key(('k', WindowRange(start, start + 10.0))),
+             str(start).encode())
+            for start in (-10.0, 0.0, 10.0, 20.0)
+        ]
+        items.append((store._encode_key(('k2', WindowRange(0.0, 10.0))),
+                      b'0'))
+        items.append((store.offset_key, b'303'))
+        store._dbs[0] = Mock(name='db1')
+        store._dbs[0].iteritems.return_value = FakeIterator(items[:2])
+        store._dbs[1] = Mock(name='db2')
+        store._dbs[1].iteritems.return_value = FakeIterator(items[2:])
+        assert [w.start for w, _ in store.iterwindows('k')] == [
+            -10.0, 0.0, 10.0, 20.0]
+        for db in store._dbs.values():
+            db.iteritems.return_value = FakeIterator(
+                db.iteritems.return_value.items)
+        assert list(store.iterwindows('k', 0.0, 10.0, reverse=True)) == [
+            (WindowRange(10.0, 20.0), 10.0),
+            (WindowRange(0.0, 10.0), 0.0),
+        ]
+
+    def test_iterwindows__range(self, *, store):
+        store.windowed = True
+        db = store._dbs[0] = Mock(name='db')
+        db.iteritems.return_value = FakeIterator([
+            (store._encode_key(('k', WindowRange(start, start + 10.0))),
+             b'1')
+            for start in (0.0, 10.0, 20.0)
+        ])
+        assert [w.start for w, _ in store.iterwindows('k', 5.0, 10.0)] == [
+            10.0]
+
+    def test_changelog_batches__windowed(self, *, store, rocks):
+        store.windowed = True
+        messages = [Mock(name='message1', tp=TP1, partition=0, offset=3,
+                         key=b'["k", [0, 10]]', value=b'v1')]
+        batch = dict(store._changelog_batches(
+            store._message_entries(messages)))[0]
+        batch.put.assert_any_call(
+            store._encode_key(('k', WindowRange(0, 10))), b'v1')
+
+    def test_executor_for(self, *, app, rocks):
+        resources = RocksDBResources(app, io_threads=2)
+        assert resources.executor_for(0) is resources.executor_for(2)
+        assert resources.executor_for(0) is not resources.executor_for(1)
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_assigned(self, *, app, store):
+        table = app.Table('table1')
+        app.sensors.on_store_stats = Mock(name='on_store_stats')
+        topic = table.changelog_topic.get_topic_name()
+        await store.on_partitions_assigned(
+            table, {TP(topic, 0), TP(topic, 1), TP('other', 2)})
+        assert set(store._dbs) == {0, 1}
+        name, stats = app.sensors.on_store_stats.call_args[0]
+        assert name == 'rocksdb.table1'
+        assert set(stats) == {'open_time.0', 'open_time.1'}
+
+    @pytest.mark.asyncio
+    async def test_open_db__locked(self, *, store, rocks):
+        rocks.errors.RocksIOError = KeyError
+        store.open_retry_backoff = 0.01
+        errors = [KeyError('lock')]
+
+        async def db_for_partition_async(partition):
+            if errors:
+                raise errors.pop()
+        store._db_for_partition_async = Mock(
+            name='_db_for_partition_async',
+            side_effect=db_for_partition_async)
+        assert await store._open_db(0, rdb.monotonic() + 10.0) >= 0.01
+        assert store._db_for_partition_async.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_open_db__locked_deadline(self, *, store, rocks):
+        rocks.errors.RocksIOError = KeyError
+        store._db_for_partition_async = AsyncMock(
+            name='_db_for_partition_async')
+        store._db_for_partition_async.side_effect = KeyError('lock')
+        with pytest.raises(KeyError):
+            await store._open_db(0, rdb.monotonic())
+        store._db_for_partition_async.assert_called_once_with(0)
+
+    @pytest.mark.asyncio
+    async def test_db_for_partition__while_opening(self, *, store):
+        # a sync access while the I/O thread is opening the database
+        # fails instead of blocking, or opening the database twice.
+        opened = threading.Event()
+        db = Mock(name='db')
+
+        def open_for_partition(partition):
+            opened.wait()
+            return db
+        store._open_for_partition = Mock(side_effect=open_for_partition)
+        opening = store.loop.create_task(store._db_for_partition_async(0))
+        await asyncio.sleep(0)
+        assert 0 in store._opening
+        with pytest.raises(RuntimeError):
+            store._db_for_partition(0)
+        opened.set()
+        assert await opening is db
+        assert store._db_for_partition(0) is db
+        store._open_for_partition.assert_called_once_with(0)
+        assert store._dbs == {0: db}
+        assert not store._opening
+        assert db in store.resources._dbs
+
+    @pytest.mark.asyncio
+    async def test_start_stop_resources(self, *, app, store):
+        assert store.resources in app.tables._children
+        executor = store.resources.executor_for(0)
+        await store.on_start()
+        assert store.resources._started.is_set()
+        await store.resources.stop()
+        assert not store.resources._executors
+        assert executor._shutdown
+
+
+class test_Store_checkpoints:
+
+    @pytest.fixture
+    def store(self, *, app, rocks, tmpdir):
+        app.conf.tabledir = str(tmpdir / 'tables')
+        app.conf.table_checkpoint_url = f'file://{tmpdir / "remote"}'
+        (tmpdir / 'remote').mkdir()
+        return Store('rocksdb://', app, table_name='table1')
+
+    def test_checkpoint_store(self, *, store):
+        assert isinstance(store.checkpoint_store, FileCheckpointStore)
+
+    def test_checkpoint(self, *, store, rocks):
+        db = store._dbs[1] = Mock(name='db')
+        db.get.return_value = b'303'
+        engine = rocks.BackupEngine.return_value
+        engine.create_backup.side_effect = (
+            lambda *args, **kwargs: store.checkpoint_path(1).mkdir(
+                parents=True))
+        store.checkpoint(1)
+        engine.create_backup.assert_called_once_with(
+            db, flush_before_backup=True)
+        engine.purge_old_backups.assert_called_once_with(1)
+        remote = store.checkpoint_store.root / store.checkpoint_name(1)
+        assert (remote / CHECKPOINT_OFFSET_FILE).read_bytes() == b'303'
+
+        # new node without local data restores from the checkpoint
+        shutil.rmtree(str(store.checkpoint_path(1)))
+        store._dbs.clear()
+        assert store._restore_checkpoint(1) == 303
+        path = str(store.partition_path(1))
+        engine.restore_latest_backup.assert_called_once_with(path, path)
+
+    def test_checkpoint__no_offset(self, *, store, rocks):
+        db = store._dbs[1] = Mock(name='db')
+        db.get.return_value = None
+        store.checkpoint(1)
+        rocks.BackupEngine.assert_not_called()
+
+    def test_open_for_partition__restores(self, *, store):
+        store._restore_checkpoint = Mock(name='_restore_checkpoint')
+        store._open_for_partition(2)
+        store._restore_checkpoint.assert_called_once_with(2)
+
+    def test_restore_checkpoint__missing(self, *, store, rocks):
+        assert store._restore_checkpoint(1) is None
+        rocks.BackupEngine.assert_not_called()
@@ -5,10 +5,11 @@ from copy import copy
 import pytest
 from faust import joins
 from faust import Event, Record, Stream, Topic
-from faust.stores.base import Store
+from faust.stores.base import SerializedStore, Store
 from faust.tables.base import Collection
-from faust.types import TP
-from faust.windows import Window
+from faust.types import Message, TP
+from faust.types.windows import WindowRange
+from faust.windows import HoppingWindow, Window
 from mode import label, shortlabel
 from mode.utils.mocks import AsyncMock, Mock, patch
 
@@ -20,6 +21,10 @@ class User(Record):
     name: str
 
 
+class PickledUser(Record, serializer='pickle'):
+    id: str
+
+
 class MyTable(Collection):
 
     def __init__(self, *args, **kwargs):
@@ -39,6 +44,14 @@ class MyTable(Collection):
         self.datas.pop(key, None)
 
 
+def serialized_store(key_type=None, value_type=None,
+                     key_serializer='json', value_serializer='json'):
+    return Mock(name='store', spec=SerializedStore,
+                key_type=key_type, value_type=value_type,
+                key_serializer=key_serializer,
+                value_serializer=value_serializer)
+
+
 class test_Collection:
 
     @pytest.fixture
@@ -61,7 +74,12 @@ class test_Collection:
         table._data = None
         ret = table._get_store()
         table.StateStore.assert_called_once_with(
-            url=None, app=table.app, loop=table.loop,
+            url=None,
+            app=table.app,
+            table_name=table.name,
+            key_type=table.key_type,
+            value_type=table.value_type,
+            loop=table.loop,
         )
         assert ret is table.StateStore()
 
@@ -119,6 +137,21 @@ class test_Collection:
                 callback=table._on_changelog_sent,
             )
 
+    def test_send_changelog__event(self, *, table):
+        event = Mock(name='event')
+        with patch('faust.tables.base.current_event') as current_event:
+            table._send_changelog('k', 'v', event=event)
+            current_event.assert_not_called()
+        event._attach.assert_called_once_with(
+            table.changelog_topic,
+            'k',
+            'v',
+            partition=event.message.partition,
+            key_serializer='json',
+            value_serializer='json',
+            callback=table._on_changelog_sent,
+        )
+
     def test_send_changelog__no_current_event(self, *, table):
         with patch('faust.tables.base.current_event') as current_event:
             current_event.return_value = None
@@ -140,7 +173,7 @@ class test_Collection:
         await table._clean_data(table)
 
         table._should_expire_keys.return_value = True
-        table._del_old_keys = Mock(name='_del_old_keys')
+        table._del_old_keys = AsyncMock(name='_del_old_keys')
 
         def on_sleep(secs):
             table._stopped.set()
@@ -159,6 +192,48 @@ class test_Collection:
         table.window.expires = 3600
         assert table._should_expire_keys()
 
+    def test_maybe_set_key_ttl(self, *, table):
+        table.window = HoppingWindow(10, 5, expires=20)
+        table._data = Mock(name='data')
+        table._maybe_set_key_ttl(('k', WindowRange(10, 20)), 1)
+        table._data.set_expiry.assert_called_once_with(
+            ('k', WindowRange(10, 20)), 1, 20)
+        assert table._partition_latest_timestamp[1] == 20
+
+    def test_maybe_set_key_ttl__no_expires(self, *, table):
+        table._data = Mock(name='data')
+        table._maybe_set_key_ttl(('k', WindowRange(10, 20)), 1)
+        table._data.set_expiry.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_del_old_keys(self, *, table):
+        table.window = HoppingWindow(10, 5, expires=20)
+        table._data = Mock(name='data')
+        table._data.expire_async = AsyncMock(name='expire_async')
+        table._partition_latest_timestamp.update({0: 100, 1: 52})
+        await table._del_old_keys()
+        table._data.expire_async.assert_any_call(0, 80)
+        table._data.expire_async.assert_any_call(1, 30)
+
+    def test_get_store__key_expires(self, *, app):
+        table = MyTable(app, name='name',
+                        window=HoppingWindow(10, 5, expires=20))
+        assert table.data.key_expires(['k', [10, 20]]) == 20
+
+    def test_windowed_range__latest(self, *, app):
+        table = MyTable(app, name='name', window=HoppingWindow(10, 5))
+        assert table.data.windowed
+        for start in (0.0, 5.0, 10.0):
+            table.data['k', WindowRange(start, start + 10)] = start
+        assert table._windowed_range('k', 5.0) == [
+            (WindowRange(5.0, 15.0), 5.0),
+            (WindowRange(10.0, 20.0), 10.0),
+        ]
+        assert table._windowed_latest('k', 2) == [
+            (WindowRange(10.0, 20.0), 10.0),
+            (WindowRange(5.0, 15.0), 5.0),
+        ]
+
     def test_join(self, *, table):
         table._join = Mock(name='join')
         ret = table.join(User.id, User.name)
@@ -352,6 +427,81 @@ class test_Collection:
             to_value=table._to_value,
         )
 
+    @pytest.mark.asyncio
+    async def test_apply_changelog__bumps_version(self, *, table):
+        table._data = Mock(name='data', autospec=SerializedStore)
+        table._data.apply_changelog_batch_async = AsyncMock()
+        table._data.apply_raw_changelog_batch_async = AsyncMock()
+        version = table.version
+        table.apply_changelog_batch([])
+        await table.apply_changelog_batch_async([])
+        table.apply_raw_changelog_batch([])
+        await table.apply_raw_changelog_batch_async([])
+        table.reset_state()
+        assert table.version == version + 5
+
+    def test_raw_changelog(self, *, table):
+        assert not table.raw_changelog
+        table._data = serialized_store()
+        assert table.raw_changelog
+
+    @pytest.mark.parametrize('key_serializer,value_serializer', [
+        ('raw', 'json'),
+        ('json', 'pickle'),
+    ])
+    def test_raw_changelog__not_json(self, key_serializer, value_serializer,
+                                     *, table):
+        table._data = serialized_store(
+            key_serializer=key_serializer,
+            value_serializer=value_serializer)
+        assert not table.raw_changelog
+
+    def test_raw_changelog__model_serializer(self, *, table):
+        table._data = serialized_store(value_type=PickledUser)
+        assert not table.raw_changelog
+        table._data = serialized_store(value_type=User)
+        assert table.raw_changelog
+
+    def test_expand_window_messages(self, *, table):
+        table.window = HoppingWindow(10, 5)
+        update = Message('topic', 1, 3, 300.0, 0,
+                         b'["k", 10.0]', b'[4, 1, 1]', 0, tp=TP1)
+        other = Message('topic', 1, 4, 300.0, 0,
+                        b'["k", [0.0, 10.0]]', b'2', 0, tp=TP1)
+        deleted = Message('topic', 1, 5, 300.0, 0,
+                          b'["k", [5.0, 15.0]]', None, 0, tp=TP1)
+        messages = list(table._expand_window_messages(
+            [update, other, deleted]))
+        assert [(m.key, m.value, m.offset) for m in messages] == [
+            (b'["k", [5.0, 15.0]]', b'4', 3),
+            (b'["k", [10.0, 20.0]]', b'1', 3),
+            (b'["k", [15.0, 25.0]]', b'1', 3),
+            (b'["k", [0.0, 10.0]]', b'2', 4),
+            (b'["k", [5.0, 15.0]]', None, 5),
+        ]
+
+    def test_expand_window_messages__model_key(self, *, table):
+        table.window = HoppingWindow(10, 5)
+        key = table.app.serializers.dumps_key(
+            None, [User('1', 2), 10.0], serializer='json')
+        update = Message('topic', 1, 3, 300.0, 0,
+                         key, b'[{"x": 1}, 2]', 0, tp=TP1)
+        messages = list(table._expand_window_messages([update]))
+        assert len(messages) == 2
+        for message, (window_range, value) in zip(messages, [
+                (WindowRange(5.0, 15.0), {'x': 1}),
+                (WindowRange(10.0, 20.0), 2)]):
+            user, window = table.app.serializers.loads_key(
+                None, message.key, serializer='json')
+            assert User.from_data(user) == User('1', 2)
+            assert tuple(window) == window_range
+            assert table.app.serializers.loads_value(
+                None, message.value, serializer='json') == value
+
+    def test_expand_window_messages__not_windowed(self, *, table):
+        batch = [Mock(name='message')]
+        assert table._expand_window_messages(batch) is batch
+
     def test_to_key(self, *, table):
         assert table._to_key([1, 2, 3]) == (1, 2, 3)
         assert table._to_key(1) == 1
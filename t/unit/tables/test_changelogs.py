@@ -1,9 +1,12 @@
+import asyncio
 import pytest
 from faust.channels import Channel
 from faust.tables.changelogs import ChangelogReader, StandbyReader, local_tps
 from faust.transport.consumer import Consumer
 from faust.types import TP
 from mode import label
+from mode.utils.aiter import aiter
+from mode.utils.compat import Counter
 from mode.utils.mocks import AsyncMock, Mock
 
 TP1 = TP('foo', 0)
@@ -38,14 +41,14 @@ class test_ChangelogReader:
     Reader = ChangelogReader
 
     @pytest.fixture
-    def reader(self, *, app, channel, table):
-        return self.Reader(table, channel, app, TPS)
+    def reader(self, *, app, channel, table, event_loop):
+        return self.Reader(table, channel, app, set(TPS), loop=event_loop)
 
     def test_constructor(self, *, app, channel, table, reader):
         assert reader.table is table
         assert reader.channel is channel
         assert reader.app is app
-        assert reader.tps is TPS
+        assert reader.tps == TPS
 
     def test_buffer_size(self, *, table, reader):
         assert reader._buffer_size == table.recovery_buffer_size
@@ -170,11 +173,113 @@ class test_ChangelogReader:
         def on_sleep(secs):
             reader._stopped.set()
         reader.sleep = AsyncMock(name='sleep', side_effect=on_sleep)
+        reader._report_stats = Mock(name='_report_stats')
         await reader._publish_stats(reader)
+        reader._report_stats.assert_called_once_with()
 
     def test_label(self, *, reader):
         assert label(reader)
 
+    def test_raw(self, *, reader, table):
+        assert not table.raw_changelog
+        assert not reader.raw
+
+    @pytest.mark.asyncio
+    async def test_slurp_stream__raw(self, *, reader, table, event_loop):
+        messages = [Mock(name=f'message{i}', tp=TP1, offset=i,
+                         key=b'k', value=b'v')
+                    for i in range(3)]
+        reader.raw = True
+        reader._read_changelog = Mock(return_value=aiter(messages))
+        reader._should_stop_reading = Mock(return_value=False)
+        table.recovery_buffer_size = table.standby_buffer_size = 2
+        batches = []
+
+        async def on_batch(batch):
+            batches.append(list(batch))
+        table.apply_raw_changelog_batch_async = AsyncMock(
+            side_effect=on_batch)
+        table.apply_raw_changelog_batch = Mock()
+        table.on_changelog_event = AsyncMock()
+
+        await reader._slurp_stream()
+        assert batches == [messages[:2], messages[2:]]
+        table.apply_raw_changelog_batch.assert_not_called()
+        table.on_changelog_event.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_slurp_stream__buffer_bytes(self, *, reader, table,
+                                              event_loop):
+        events = [Mock(name=f'event{i}') for i in range(3)]
+        for i, event in enumerate(events):
+            event.message.configure_mock(
+                tp=TP1, offset=i, key=b'k' * 10, value=None)
+        reader.buffer_bytes = 10
+        reader._read_changelog = Mock(return_value=aiter(events))
+        reader._should_stop_reading = Mock(return_value=False)
+        batches = []
+
+        async def on_batch(batch):
+            batches.append(list(batch))
+        table.apply_changelog_batch_async = AsyncMock(side_effect=on_batch)
+        await reader._slurp_stream()
+        assert batches == [[event] for event in events]
+
+    @pytest.mark.asyncio
+    async def test_put_batch__applier_crashed(self, *, reader, event_loop):
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait([1])
+
+        async def crash():
+            raise KeyError()
+        applier = asyncio.ensure_future(crash())
+        with pytest.raises(KeyError):
+            await reader._put_batch(queue, applier, [2])
+
+    def test_stats(self, *, reader):
+        self.set_highwaters(reader, TP1, 1000, 900)
+        self.set_highwaters(reader, TP2, 1000, 1000)
+        reader._records_read.update({TP1: 500})
+        reader._bytes_read.update({TP1: 5000})
+        reader._update_rates(5.0, Counter(), Counter())
+        assert reader.records_per_second == 100.0
+        stats = reader.stats()
+        assert stats[TP1] == {
+            'highwater': 1000,
+            'offset': 900,
+            'remaining': 100,
+            'records_s': 100.0,
+            'bytes_s': 1000.0,
+            'eta': 1.0,
+        }
+        assert stats[TP2]['remaining'] == 0
+        assert stats[TP2]['eta'] == 0.0
+
+    def test_eta(self, *, reader):
+        assert reader.eta() is None
+        reader._remaining_total = Mock(return_value=1000)
+        reader.records_per_second = 100.0
+        assert reader.eta() == 10.0
+
+    @pytest.mark.asyncio
+    async def test_changelog_event_handler__raw(self, *, reader, table):
+        reader.raw = True
+        assert not table.wants_changelog_events
+        assert reader._changelog_event_handler() is None
+
+        table._on_changelog_event = AsyncMock(name='on_changelog_event')
+        assert table.wants_changelog_events
+        event = Mock(name='event')
+        table.changelog_topic.decode = AsyncMock(return_value=event)
+        message = Mock(name='message')
+        handler = reader._changelog_event_handler()
+        await handler(message)
+        table.changelog_topic.decode.assert_called_once_with(message)
+        table._on_changelog_event.assert_called_once_with(event)
+
+    def test_changelog_event_handler(self, *, reader, table):
+        assert reader._changelog_event_handler() == table.on_changelog_event
+
     @pytest.mark.asyncio
     async def test_local_tps(self, *, table):
 
@@ -196,8 +301,83 @@ class test_StandbyReader(test_ChangelogReader):
         assert reader._buffer_size == reader.table.standby_buffer_size
 
     @pytest.mark.asyncio
-    async def test_publish_stats(self, *, reader):
-        await reader._publish_stats(reader)
+    async def test_suspend(self, *, reader, channel):
+        reader._suspended.set()
+        await reader.suspend()
+        channel.throw.assert_called_once_with(TypeEq(StopAsyncIteration))
+        assert not reader._resumed.is_set()
+        # already suspended
+        await reader.suspend()
+        channel.throw.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_suspend__not_reading(self, *, reader, channel):
+        reader._stop_event.set()
+        assert not reader.reading
+        await reader.suspend()
+        channel.throw.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_resume(self, *, app, reader):
+        TP3 = TP('foo', 2)
+        app.consumer = Mock(
+            name='consumer',
+            autospec=Consumer,
+            pause_partitions=AsyncMock(),
+            resume_partitions=AsyncMock(),
+        )
+        reader._seek_tps = AsyncMock(name='_seek_tps')
+        reader.offsets[TP1], reader.offsets[TP2] = 10, 20
+        reader._resumed.clear()
+        reader._suspended.set()
+        await reader.resume({TP2, TP3}, Counter({TP3: 30}))
+        assert reader.tps == {TP2, TP3}
+        assert dict(reader.offsets) == {TP2: 20, TP3: 30}
+        reader._seek_tps.assert_called_once_with()
+        app.consumer.resume_partitions.assert_called_once_with({TP2, TP3})
+        assert reader._resumed.is_set()
+        assert not reader._suspended.is_set()
+
+    @pytest.mark.asyncio
+    async def test_resume__offsets_ahead(self, *, app, reader):
+        app.consumer = Mock(
+            name='consumer',
+            autospec=Consumer,
+            pause_partitions=AsyncMock(),
+            resume_partitions=AsyncMock(),
+        )
+        reader._seek_tps = AsyncMock(name='_seek_tps')
+        reader.offsets[TP1], reader.offsets[TP2] = 10, 20
+        # e.g. global table partitions recovered during the rebalance.
+        await reader.resume({TP1, TP2}, Counter({TP1: 15, TP2: 5}))
+        assert dict(reader.offsets) == {TP1: 15, TP2: 20}
+
+    @pytest.mark.asyncio
+    async def test_slurp_stream__suspended(self, *, reader, monkeypatch,
+                                           event_loop):
+        calls = []
+
+        async def slurp(self):
+            calls.append(1)
+            if len(calls) == 1:
+                reader._resumed.clear()
+                event_loop.call_soon(reader._resumed.set)
+        monkeypatch.setattr(ChangelogReader, '_slurp_stream', slurp)
+        await reader._slurp_stream()
+        assert len(calls) == 2
+        assert reader._suspended.is_set()
+
+    def test_report_stats(self, *, app, reader):
+        app.consumer = Mock(name='consumer')
+        app.consumer.assignment.return_value = {TP1, TP2}
+        app.consumer.highwater.side_effect = lambda tp: (
+            10 if tp == TP1 else None)
+        app.sensors.on_table_recovery = Mock(name='on_table_recovery')
+        reader._report_stats()
+        table, kind, stats = app.sensors.on_table_recovery.call_args[0]
+        assert kind == 'standby'
+        assert stats[TP1]['highwater'] == 9
+        assert TP2 not in stats
 
     def test_should_start_reading(self, *, reader):
         assert reader._should_start_reading()
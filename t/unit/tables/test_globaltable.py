@@ -0,0 +1,48 @@
+import pytest
+from faust import GlobalTable, Table
+from faust.types import TP
+from mode.utils.mocks import AsyncMock, Mock
+from yarl import URL
+
+
+class test_GlobalTable:
+
+    @pytest.fixture
+    def table(self, *, app):
+        return app.GlobalTable('rates', default=float)
+
+    @pytest.fixture
+    def tables(self, *, app, table):
+        tables = app.tables
+        tables._changelogs[table.changelog_topic.get_topic_name()] = table
+        tables._changelogs['foo-changelog'] = app.Table('foo')
+        return tables
+
+    def test_app_GlobalTable(self, *, app, table):
+        assert isinstance(table, GlobalTable)
+        assert isinstance(table, Table)
+        assert app.tables['rates'] is table
+        assert table.default is float
+
+    def test_global_changelog_topics(self, *, tables, table):
+        assert tables.global_changelog_topics == {
+            table.changelog_topic.get_topic_name()}
+
+    def test_key_store(self, *, app, table):
+        assert app.router.key_store('rates', 'USD') == URL(
+            app.conf.canonical_url)
+
+    @pytest.mark.asyncio
+    async def test_recover__global_standbys(self, *, app, tables, table):
+        topic = table.changelog_topic.get_topic_name()
+        gtp1, gtp2, other = TP(topic, 0), TP(topic, 1), TP('foo-changelog', 1)
+        app.assignor.assigned_actives = Mock(return_value={gtp1})
+        app.assignor.assigned_standbys = Mock(return_value={gtp2, other})
+        tables._on_recovery_started = AsyncMock(name='_on_recovery_started')
+        tables._recover_changelogs = AsyncMock(return_value=False)
+        for t in tables.values():
+            t.on_partitions_assigned = AsyncMock(name='assigned')
+        await tables._recover({gtp1, gtp2, other})
+        # global standbys are recovered before processing starts,
+        # other standbys are not.
+        tables._recover_changelogs.assert_called_once_with({gtp1, gtp2})
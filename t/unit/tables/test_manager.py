@@ -0,0 +1,90 @@
+from collections import Counter
+import pytest
+from faust.types import TP
+from mode.utils.mocks import AsyncMock, Mock
+
+TP1 = TP('foo-table-changelog', 0)
+TP2 = TP('foo-table-changelog', 1)
+
+
+class test_TableManager:
+
+    @pytest.fixture
+    def table(self, *, app):
+        return app.Table('table')
+
+    @pytest.fixture
+    def tables(self, *, app, table):
+        tables = app.tables
+        tables._changelogs[TP1.topic] = table
+        tables.app.rebalancing = False
+        app.assignor.assigned_warmups = Mock(return_value={TP1, TP2})
+        return tables
+
+    @pytest.fixture
+    def standby(self, *, tables, table):
+        standby = tables._standbys[table] = Mock(name='standby')
+        standby.stats.return_value = {
+            TP1: {'remaining': 10},
+            TP2: {'remaining': 5},
+        }
+        return standby
+
+    def test_warmups_caught_up(self, *, tables, standby):
+        assert tables._warmups_caught_up()
+
+    def test_warmups_caught_up__lagging(self, *, app, tables, standby):
+        standby.stats.return_value[TP2]['remaining'] = (
+            app.conf.table_acceptable_recovery_lag + 1)
+        assert not tables._warmups_caught_up()
+
+    def test_warmups_caught_up__no_stats(self, *, tables, standby):
+        del standby.stats.return_value[TP2]
+        assert not tables._warmups_caught_up()
+
+    def test_warmups_caught_up__no_standby(self, *, tables):
+        assert not tables._warmups_caught_up()
+
+    def test_warmups_caught_up__no_warmups(self, *, app, tables, standby):
+        app.assignor.assigned_warmups.return_value = set()
+        assert not tables._warmups_caught_up()
+
+    def test_warmups_caught_up__rebalancing(self, *, app, tables, standby):
+        app.rebalancing = True
+        assert not tables._warmups_caught_up()
+
+    @pytest.mark.asyncio
+    async def test_start_standbys__resumes(self, *, tables, table, standby):
+        standby.reading = True
+        standby.resume = AsyncMock(name='resume')
+        tables._sync_offsets = Mock(name='_sync_offsets')
+        await tables._start_standbys({TP1})
+        standby.resume.assert_called_once_with({TP1}, Counter())
+        assert tables._standbys[table] is standby
+
+    @pytest.mark.asyncio
+    async def test_start_standbys__no_partitions(self, *, tables, table,
+                                                 standby):
+        standby.reading = True
+        standby.resume = AsyncMock(name='resume')
+        standby.stop = AsyncMock(name='stop')
+        tables._sync_offsets = Mock(name='_sync_offsets')
+        await tables._start_standbys(set())
+        standby.resume.assert_not_called()
+        standby.stop.assert_called_once_with()
+        tables._sync_offsets.assert_called_once_with(standby)
+        assert table not in tables._standbys
+
+    def test_sync_persisted_offsets__only_open(self, *, tables, table):
+        table._data = Mock(name='data')
+        table._data.persisted_offset_if_open.return_value = 30
+        tables._sync_persisted_offsets(table, {TP1}, only_open=True)
+        table._data.persisted_offset_if_open.assert_called_once_with(TP1)
+        table._data.persisted_offset.assert_not_called()
+        assert tables._table_offsets[TP1] == 30
+
+    @pytest.mark.asyncio
+    async def test_on_commit(self, *, tables, table):
+        table.on_commit = AsyncMock(name='on_commit')
+        await tables.on_commit({TP1: 3})
+        table.on_commit.assert_called_once_with({TP1: 3})
@@ -0,0 +1,77 @@
+import pytest
+from faust import NumericTable
+from mode.utils.mocks import Mock, call
+
+
+class test_NumericTable:
+
+    @pytest.fixture
+    def table(self, *, app):
+        table = app.NumericTable('counts')
+        table._send_changelog = Mock(name='_send_changelog')
+        return table
+
+    @pytest.fixture
+    def current_event(self, *, patching):
+        current_event = patching('faust.tables.numeric.current_event')
+        current_event.return_value.message.partition = 1
+        return current_event
+
+    def test_app_NumericTable(self, *, app, table):
+        assert isinstance(table, NumericTable)
+        assert app.tables['counts'] is table
+        assert table.value_type is int
+        assert table['missing'] == 0
+        assert app.NumericTable('amounts', value_type=float).default is float
+
+    def test_value_type(self, *, app):
+        with pytest.raises(TypeError):
+            app.NumericTable('foo', value_type=str)
+
+    def test_increment_many(self, *, table, current_event):
+        table.increment_many(['a', 'b', 'a'])
+        table.increment_many(['a', 'c'], [10, 5])
+        table.increment('c')
+        assert dict(table) == {'a': 12, 'b': 1, 'c': 6}
+        assert table.data.partition_sizes() == {1: 3}
+        # one changelog message for every key changed.
+        event = current_event.return_value
+        assert table._send_changelog.call_args_list == [
+            call('a', 2, event=event), call('b', 1, event=event),
+            call('a', 12, event=event), call('c', 5, event=event),
+            call('c', 6, event=event),
+        ]
+        assert table.version == 3
+
+    def test_increment_many__events(self, *, table, current_event):
+        events = [Mock(name=f'event{i}') for i in range(3)]
+        for event, partition in zip(events, [1, 2, 1]):
+            event.message.partition = partition
+        table.data.increment_many = Mock(
+            name='increment_many', wraps=table.data.increment_many)
+        assert table.increment_many(
+            ['a', 'b', 'a'], [1, 2, 3], events=events) == {'a': 4, 'b': 2}
+        # one increment for every partition.
+        assert table.data.increment_many.call_args_list == [
+            call(['a', 'a'], [1, 3], 1),
+            call(['b'], [2], 2),
+        ]
+        assert table.data.partition_sizes() == {1: 1, 2: 1}
+        # changelog sent with the last event of the key.
+        assert table._send_changelog.call_args_list == [
+            call('a', 4, event=events[2]),
+            call('b', 2, event=events[1]),
+        ]
+
+    def test_increment_many__events_length(self, *, table, current_event):
+        with pytest.raises(ValueError):
+            table.increment_many(['a', 'b'], events=[Mock(name='event')])
+
+    def test_increment_many__outside_stream(self, *, table, current_event):
+        current_event.return_value = None
+        with pytest.raises(TypeError):
+            table.increment_many(['a'])
+
+    def test_using_window(self, *, table):
+        with pytest.raises(NotImplementedError):
+            table.tumbling(10)
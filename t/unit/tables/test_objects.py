@@ -0,0 +1,274 @@
+import json
+from collections import Counter
+import pytest
+from faust import CounterTable, Event, ListTable, SetTable
+from faust.stores.base import SerializedStore
+from mode.utils.mocks import Mock, call
+
+
+def changelog_event(app, key, value, partition=0):
+    message = Mock(name='message', partition=partition)
+    if value is None:
+        message.value = None
+    return Event(app, key, value, message)
+
+
+class DictStore(SerializedStore):
+    # Keeps serialized keys and values, like the RocksDB store.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.keep = {}
+
+    def _get(self, key):
+        return self.keep.get(key)
+
+    def _set(self, key, value):
+        self.keep[key] = value
+
+    def _del(self, key):
+        self.keep.pop(key, None)
+
+    def _iterkeys(self):
+        return iter(list(self.keep))
+
+    def _itervalues(self):
+        return iter(list(self.keep.values()))
+
+    def _iteritems(self):
+        return iter(list(self.keep.items()))
+
+    def _size(self):
+        return len(self.keep)
+
+    def _contains(self, key):
+        return key in self.keep
+
+    def _clear(self):
+        self.keep.clear()
+
+    def reset_state(self):
+        ...
+
+
+class test_SetTable:
+
+    @pytest.fixture
+    def table(self, *, app):
+        table = app.SetTable('subscribers', snapshot_interval=2)
+        table._send_changelog = Mock(name='_send_changelog')
+        return table
+
+    def test_app_SetTable(self, *, table):
+        assert isinstance(table, SetTable)
+        assert table.snapshot_interval == 2
+        assert not table.raw_changelog
+
+    def test_add_discard(self, *, table):
+        table['t'].add('a')
+        table['t'].add('a')  # already member
+        table['t'].update(['b', 'c'])
+        table['t'].discard('a')
+        table['t'].discard('x')  # not member
+        table['t'].add('d')
+        assert set(table['t']) == {'b', 'c', 'd'}
+        assert 'b' in table['t']
+        assert len(table['t']) == 3
+        send = table._send_changelog
+        # full value first, then operations until the next full value.
+        assert send.call_args_list[:3] == [
+            call(['t'], {'op': 'set', 'args': ['a']}),
+            call(['t', 0], {'op': 'add', 'args': ['b', 'c']}),
+            call(['t', 1], {'op': 'discard', 'args': ['a']}),
+        ]
+        key, value = send.call_args_list[3][0]
+        assert key == ['t']
+        assert sorted(value['args']) == ['b', 'c', 'd']
+        assert send.call_count == 4
+
+    def test_setitem(self, *, table):
+        table['t'] = ['a', 'a']
+        assert table.data['t'] == {'a'}
+        table._send_changelog.assert_called_once_with(
+            ['t'], {'op': 'set', 'args': ['a']})
+        # next change can be an operation.
+        table['t'].add('c')
+        table._send_changelog.assert_called_with(
+            ['t', 0], {'op': 'add', 'args': ['c']})
+
+    def test_delitem(self, *, table):
+        table['t'] = ['a']
+        table['t'].add('b')
+        del table['t']
+        assert 't' not in table
+        assert table._send_changelog.call_args_list[2:] == [
+            call(key, value=None, value_serializer='raw')
+            for key in (['t'], ['t', 0])
+        ]
+        table['t'].add('b')
+        table._send_changelog.assert_called_with(
+            ['t'], {'op': 'set', 'args': ['b']})
+
+    def test_delitem__new_key(self, *, table):
+        table['t'] = ['a']
+        del table['t']
+        assert table._send_changelog.call_args_list[1:] == [
+            call(['t'], value=None, value_serializer='raw'),
+        ]
+
+    def test_delitem__all_slots_used(self, *, table):
+        table['t'] = ['a']
+        for member in 'bcd':
+            table['t'].add(member)
+        # full value sent again, slots reused from the start.
+        assert table._deltas['t'] == 0
+        del table['t']
+        assert table._send_changelog.call_args_list[4:] == [
+            call(key, value=None, value_serializer='raw')
+            for key in (['t'], ['t', 0], ['t', 1])
+        ]
+
+    def test_delitem__recovered_key(self, *, table):
+        table.data['t'] = {'a'}
+        table['t'].add('b')
+        del table['t']
+        assert table._send_changelog.call_args_list[1:] == [
+            call(key, value=None, value_serializer='raw')
+            for key in (['t'], ['t', 0], ['t', 1])
+        ]
+
+    def test_apply_changelog_batch(self, *, app, table):
+        table.data['u'] = {'x'}
+        table._deltas['u'] = 1
+        table.apply_changelog_batch([
+            changelog_event(app, ['t'], {'op': 'set', 'args': ['a', 'b']}),
+            changelog_event(app, ['t', 0], {'op': 'add', 'args': ['c']}),
+            changelog_event(app, ['t', 1], {'op': 'discard', 'args': ['a']}),
+            changelog_event(app, ['u', 0], {'op': 'add', 'args': ['y']}),
+            changelog_event(app, ['v'], {'op': 'set', 'args': ['a']}),
+            changelog_event(app, ['v'], None),
+            changelog_event(app, ['v', 0], None),
+            changelog_event(app, ['w', 0], None),
+        ])
+        assert table.data['t'] == {'b', 'c'}
+        assert table.data['u'] == {'x', 'y'}
+        assert 'v' not in table
+        assert 'w' not in table
+        # written to by another worker.
+        assert 'u' not in table._deltas
+
+    def test_apply_changelog_batch__delete_then_add(self, *, app, table):
+        table.data['t'] = {'a'}
+        table.apply_changelog_batch([
+            changelog_event(app, ['t'], None),
+            changelog_event(app, ['t', 0], {'op': 'add', 'args': ['b']}),
+        ])
+        assert table.data['t'] == {'b'}
+
+    def test_apply_changelog_batch__tuple_keys(self, *, app, table):
+        table.apply_changelog_batch([
+            changelog_event(app, [['a', 1]], {'op': 'set', 'args': ['x']}),
+        ])
+        assert table.data[('a', 1)] == {'x'}
+
+    def test_serialized_store(self, *, app, table):
+        store = table._data = DictStore(
+            'dict://', app, table_name=table.name)
+        table['t'] = ['a']
+        table['t'].add('b')
+        assert sorted(json.loads(store.keep[b'"t"'])) == ['a', 'b']
+
+    def test_apply_changelog_batch__serialized_store(self, *, app, table):
+        store = table._data = DictStore(
+            'dict://', app, table_name=table.name)
+        table.apply_changelog_batch([
+            changelog_event(app, ['k'], {'op': 'set', 'args': ['a']}),
+            changelog_event(app, ['k', 0], {'op': 'add', 'args': ['b']}),
+        ])
+        assert set(table['k']) == {'a', 'b'}
+        # operations are not stored, only the replayed value.
+        assert list(store.keep) == [b'"k"']
+        table.apply_changelog_batch([
+            changelog_event(app, ['k', 1], {'op': 'discard', 'args': ['a']}),
+        ])
+        assert set(table['k']) == {'b'}
+        table.apply_changelog_batch([
+            changelog_event(app, ['k'], None),
+            changelog_event(app, ['k', 0], None),
+        ])
+        assert not store.keep
+
+    def test_using_window(self, *, table):
+        with pytest.raises(NotImplementedError):
+            table.tumbling(10)
+
+    def test_value_type(self, *, app):
+        with pytest.raises(TypeError):
+            app.SetTable('foo', value_type=int)
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_revoked(self, *, table):
+        table._deltas['t'] = 1
+        await table.on_partitions_revoked(set())
+        assert not table._deltas
+
+
+class test_ListTable:
+
+    @pytest.fixture
+    def table(self, *, app):
+        table = app.ListTable('events')
+        table._send_changelog = Mock(name='_send_changelog')
+        return table
+
+    def test_append(self, *, table):
+        assert isinstance(table, ListTable)
+        table['k'].append(1)
+        table['k'].extend([2, 3])
+        table['k'].extend([])
+        assert list(table['k']) == [1, 2, 3]
+        assert table['k'][1:] == [2, 3]
+        assert table._send_changelog.call_args_list == [
+            call(['k'], {'op': 'set', 'args': [1]}),
+            call(['k', 0], {'op': 'append', 'args': [2, 3]}),
+        ]
+
+    def test_apply_changelog_batch(self, *, app, table):
+        table.apply_changelog_batch([
+            changelog_event(app, ['k'], {'op': 'set', 'args': [1]}),
+            changelog_event(app, ['k', 0], {'op': 'append', 'args': [2]}),
+        ])
+        assert table.data['k'] == [1, 2]
+        with pytest.raises(ValueError):
+            table.apply_operation([], 'insert', [])
+
+
+class test_CounterTable:
+
+    @pytest.fixture
+    def table(self, *, app):
+        table = app.CounterTable('views')
+        table._send_changelog = Mock(name='_send_changelog')
+        return table
+
+    def test_incr(self, *, table):
+        assert isinstance(table, CounterTable)
+        table['k'].incr('a')
+        table['k'].incr('b', 3)
+        table['k'].update(['a', 'a'])
+        assert table['k']['a'] == 3
+        assert table['k']['missing'] == 0
+        assert table['k'].most_common(1) == [('a', 3)]
+        assert dict(table['k']) == {'a': 3, 'b': 3}
+        assert table._send_changelog.call_args_list == [
+            call(['k'], {'op': 'set', 'args': [['a', 1]]}),
+            call(['k', 0], {'op': 'incr', 'args': [['b', 3]]}),
+            call(['k', 1], {'op': 'incr', 'args': [['a', 2]]}),
+        ]
+
+    def test_apply_changelog_batch(self, *, app, table):
+        table.apply_changelog_batch([
+            changelog_event(app, ['k'], {'op': 'set', 'args': [[1, 2]]}),
+            changelog_event(app, ['k', 0], {'op': 'incr', 'args': [[1, 1]]}),
+        ])
+        assert table.data['k'] == Counter({1: 3})
@@ -0,0 +1,107 @@
+import operator
+import pytest
+from faust import Event, HyperLogLog, SketchTable, TopK
+from faust.types import TP, WindowRange
+from mode.utils.mocks import AsyncMock, Mock, call, patch
+
+TP1 = TP('views', 1)
+
+
+class test_SketchTable:
+
+    @pytest.fixture
+    def table(self, *, app):
+        table = app.SketchTable('visitors', sketch=HyperLogLog)
+        table._send_changelog = Mock(name='_send_changelog')
+        return table
+
+    def test_app_SketchTable(self, *, app, table):
+        assert isinstance(table, SketchTable)
+        assert app.tables['visitors'] is table
+        assert table.value_type is HyperLogLog
+        assert table['missing'] == HyperLogLog()
+        table2 = app.SketchTable('pages', sketch=TopK(k=3))
+        assert table2['missing'] is not table2.sketch
+        assert table2['missing'].k == 3
+
+    def test_iadd(self, *, table, patching):
+        patching('faust.tables.table.current_event')
+        table['/'] += 'alice'
+        table['/'] += 'bob'
+        table['/'] += 'alice'
+        assert table['/'].count() == 2
+        table._send_changelog.assert_called_with('/', table['/'])
+
+    @pytest.mark.asyncio
+    async def test_changelog_on_commit(self, *, app, patching):
+        table = app.SketchTable('pages', sketch=HyperLogLog)
+        TP2 = TP('views', 2)
+        event = patching('faust.tables.sketches.current_event').return_value
+        event.message.tp = TP1
+        patching('faust.tables.table.current_event')
+        topic = table.changelog_topic = Mock(name='changelog_topic')
+        topic.publish_message = AsyncMock(name='publish_message')
+        app.producer = Mock(name='producer', wait_many=AsyncMock())
+        table['/'] += 'alice'
+        table['/about'] += 'alice'
+        table['/'] += 'bob'
+        event.message.tp = TP2
+        table['/faq'] += 'bob'
+        topic.as_future_message.assert_not_called()
+        await table.on_commit({TP1: 10})
+        # the latest value of every key changed, in the order changed.
+        assert topic.as_future_message.call_args_list == [
+            call(key, table[key], partition=1,
+                 key_serializer='json', value_serializer='json',
+                 callback=table._on_changelog_sent)
+            for key in ('/about', '/')
+        ]
+        assert topic.publish_message.call_count == 2
+        app.producer.wait_many.assert_called_once()
+        await table.on_commit({TP1: 11})
+        assert topic.publish_message.call_count == 2
+        await table.on_partitions_revoked({TP2})
+        await table.on_commit({TP2: 3})
+        assert topic.publish_message.call_count == 2
+
+    def test_changelog_delete(self, *, app, patching):
+        table = app.SketchTable('pages', sketch=HyperLogLog)
+        patching('faust.tables.sketches.current_event')
+        patching('faust.tables.table.current_event')
+        event = Mock(name='event')
+        event.message.tp = TP1
+        table['/'] += 'alice'
+        with patch('faust.tables.table.Table._send_changelog') as send:
+            table._send_changelog('/', None, value_serializer='raw',
+                                  event=event)
+            send.assert_called_once_with(
+                '/', None, 'json', 'raw', event=event)
+        assert not table._changed[TP1]
+
+    def test_changelog_value(self, *, app, table):
+        sketch = HyperLogLog()
+        sketch.add('alice')
+        value = app.serializers.dumps_value(
+            None, sketch, serializer='json')
+        assert len(value) < 8000
+        assert table.changelog_topic.value_type is HyperLogLog
+        assert app.serializers.loads_value(
+            HyperLogLog, value, serializer='json') == sketch
+
+    def test_apply_changelog_batch(self, *, app, table):
+        sketch = HyperLogLog()
+        sketch.add('alice')
+        message = Mock(name='message', partition=0)
+        table.apply_changelog_batch([Event(app, '/', sketch, message)])
+        assert table['/'] == sketch
+
+    def test_paned(self, *, table, patching):
+        patching('faust.tables.table.current_event')
+        table.paned(10, 5, expires=60)
+        assert table.pane_combiner is operator.or_
+        for timestamp, user in ((6.0, 'a'), (12.0, 'b'), (13.0, 'a')):
+            table._apply_window_op(operator.add, '/', user, timestamp)
+        # window 5-15 merges the panes 5-10 and 10-15.
+        assert table._windowed_timestamp('/', 12.0).count() == 2
+        assert table._get_window(
+            '/', WindowRange(10.0, 20.0)).count() == 2
@@ -1,7 +1,10 @@
+import asyncio
+import operator
 import faust
 import pytest
 from faust.tables.wrappers import WindowWrapper
-from mode.utils.mocks import Mock, patch
+from faust.types import WindowRange
+from mode.utils.mocks import AsyncMock, Mock, patch
 
 
 class TableKey(faust.Record):
@@ -95,8 +98,229 @@ class test_Table:
             table._send_changelog.asssert_called_once_with('foo', None)
             assert 'foo' not in table.data
 
+    @pytest.mark.asyncio
+    async def test_get_async__set_async__del_async(self, *, table):
+        with patch('faust.tables.table.current_event'):
+            table._send_changelog = Mock(name='_send_changelog')
+            assert await table.get_async('foo') == 0
+            await table.set_async('foo', 'val')
+            table._send_changelog.assert_called_once_with('foo', 'val')
+            assert await table.get_async('foo') == 'val'
+            await table.del_async('foo')
+            assert 'foo' not in table.data
+
+    @pytest.mark.asyncio
+    async def test_get_async__no_default(self, *, strict_table):
+        with pytest.raises(KeyError):
+            await strict_table.get_async('foo')
+
     def test_as_ansitable(self, *, table):
         table.data['foo'] = 'bar'
         table.data['bar'] = 'baz'
         assert table.as_ansitable(sort=True)
         assert table.as_ansitable(sort=False)
+
+    @pytest.fixture
+    def hopping_table(self, *, app):
+        table = self.create_table(
+            app, name='hopping', key_type=None, value_type=None, default=int)
+        table.hopping(10, 5, expires=60)
+        return table
+
+    def test_apply_window_op__batched(self, *, hopping_table, patching):
+        table = hopping_table
+        current_event = patching('faust.tables.table.current_event')
+        current_event.return_value.message.partition = 2
+        table._send_changelog = Mock(name='_send_changelog')
+        table.data['k', WindowRange(5.0, 15.0)] = 3
+        version = table.version
+        table._apply_window_op(operator.add, 'k', 1, 12.0)
+        table._send_changelog.assert_called_once_with(
+            ('k', 10.0), [4, 1, 1])
+        assert table.version == version + 1
+        assert table.data.data.partitions[2] == {
+            ('k', WindowRange(5.0, 15.0)): 4,
+            ('k', WindowRange(10.0, 20.0)): 1,
+            ('k', WindowRange(15.0, 25.0)): 1,
+        }
+        assert table._partition_latest_timestamp[2] == 25.0
+        assert table.data.expire(2, 15.0) == 1
+
+    def test_apply_window_op__outside_stream(self, *, hopping_table):
+        with pytest.raises(TypeError):
+            hopping_table._apply_window_op(operator.add, 'k', 1, 12.0)
+
+    def test_apply_window_op__typed_value(self, *, app, patching):
+        table = self.create_table(
+            app, name='typed', key_type=None, default=int)
+        table.hopping(10, 5, expires=60)
+        patching('faust.tables.table.current_event')
+        table._send_changelog = Mock(name='_send_changelog')
+        table._apply_window_op(lambda a, b: b, 'k', VALUE1, 12.0)
+        table._send_changelog.assert_any_call(
+            ('k', WindowRange(5.0, 15.0)), VALUE1)
+        assert table._send_changelog.call_count == 3
+
+    def test_apply_changelog_batch__window_update(self, *, hopping_table):
+        table = hopping_table
+        message = Mock(name='message', partition=1)
+        events = [
+            Mock(name='event1', key=['k', 10.0], value=[4, 1, 1],
+                 message=message),
+            Mock(name='event2', key=['k', [0.0, 10.0]], value=2,
+                 message=message),
+        ]
+        table.apply_changelog_batch(events)
+        assert table.data.data.partitions[1] == {
+            ('k', (5.0, 15.0)): 4,
+            ('k', (10.0, 20.0)): 1,
+            ('k', (15.0, 25.0)): 1,
+            ('k', (0.0, 10.0)): 2,
+        }
+
+    @pytest.fixture
+    def paned_table(self, *, app):
+        table = self.create_table(
+            app, name='paned', key_type=None, value_type=None, default=int)
+        table.paned(10, 5, operator.add, expires=60)
+        return table
+
+    def test_sliding(self, *, table):
+        table.sliding(10, 5, expires=20)
+        window = table.window
+        assert isinstance(window, faust.SlidingWindow)
+        assert window.ranges(100.0) == [WindowRange(90.0, 105.0)]
+        assert window.current(100.0) == WindowRange(90.0, 105.0)
+        assert window.delta(100.0, 10) == WindowRange(80.0, 95.0)
+        assert window.stale_before(105.0) == 85.0
+
+    def test_paned(self, *, paned_table):
+        table = paned_table
+        assert isinstance(table.window, faust.PanedWindow)
+        assert table.pane_combiner is operator.add
+        assert callable(table.combine)  # join method not shadowed
+        assert table.window.ranges(12.0) == [WindowRange(10.0, 15.0)]
+        assert table.window.panes(WindowRange(10.0, 20.0)) == [
+            WindowRange(10.0, 15.0), WindowRange(15.0, 20.0)]
+
+    def test_paned__combines_panes(self, *, paned_table, patching):
+        table = paned_table
+        patching('faust.tables.table.current_event')
+        table._send_changelog = Mock(name='_send_changelog')
+        for timestamp in (6.0, 12.0, 13.0, 17.0):
+            table._apply_window_op(operator.add, 'k', 1, timestamp)
+        table._send_changelog.assert_any_call(
+            ('k', WindowRange(10.0, 15.0)), 2)
+        assert len(table.data) == 3
+        assert table._windowed_timestamp('k', 10.0) == 3
+        assert table._windowed_timestamp('k', 5.0) == 3
+        assert table._windowed_timestamp('k', 30.0) == 0
+        assert table._windowed_contains('k', 15.0)
+        assert not table._windowed_contains('k', 30.0)
+        assert not table._windowed_contains('other', 10.0)
+
+    def test_paned__expires(self, *, paned_table, patching):
+        table = paned_table
+        current_event = patching('faust.tables.table.current_event')
+        current_event.return_value.message.partition = 0
+        table._send_changelog = Mock(name='_send_changelog')
+        for timestamp in (12.0, 17.0):
+            table._apply_window_op(operator.add, 'k', 1, timestamp)
+        # the last window containing pane 10-15 ends at 20.
+        assert table._partition_latest_timestamp[0] == 25.0
+        assert table.data.expire(0, 17.0) == 0
+        assert table._get_window('k', WindowRange(10.0, 20.0)) == 2
+        assert table.data.expire(0, 20.0) == 1
+        assert table._get_window('k', WindowRange(15.0, 25.0)) == 1
+
+    def test_paned__no_default(self, *, app):
+        table = self.create_table(app, name='strict_paned', key_type=None)
+        table.paned(10, 5, operator.add)
+        with pytest.raises(KeyError):
+            table._windowed_timestamp('k', 10.0)
+
+    def closed_windows(self, table):
+        closed = []
+        while not table._closed_windows.empty():
+            closed.append(table._closed_windows.get_nowait())
+        return closed
+
+    def test_on_window_close(self, *, app, patching):
+        table = self.create_table(
+            app, name='closing', key_type=None, value_type=None,
+            default=int, allowed_lateness=5.0)
+        table.tumbling(10)
+        for path in ('faust.tables.table.current_event',
+                     'faust.tables.base.current_event'):
+            patching(path).return_value.message.partition = 0
+        table._send_changelog = Mock(name='_send_changelog')
+        assert not table.wants_window_close
+        table._on_window_close = AsyncMock(name='on_window_close')
+        assert table.wants_window_close
+        for timestamp in (1.0, 3.0, 12.0):
+            table._apply_window_op(operator.add, 'k', 1, timestamp)
+        assert table.watermark(0) == 7.0
+        assert not self.closed_windows(table)
+        table._apply_window_op(operator.add, 'k', 1, 16.0)
+        assert self.closed_windows(table) == [
+            ('k', WindowRange(0.0, 10.0), 2)]
+        # late event for closed window does not close it again
+        table._apply_window_op(operator.add, 'k', 1, 2.0)
+        table._apply_window_op(operator.add, 'k', 1, 30.0)
+        assert self.closed_windows(table) == [
+            ('k', WindowRange(10.0, 20.0), 2)]
+
+    def test_on_window_close__queue_full(self, *, paned_table, patching):
+        table = paned_table
+        for path in ('faust.tables.table.current_event',
+                     'faust.tables.base.current_event'):
+            patching(path).return_value.message.partition = 0
+        table._send_changelog = Mock(name='_send_changelog')
+        table._on_window_close = AsyncMock(name='on_window_close')
+        table._closed_windows = asyncio.Queue(maxsize=2)
+        for timestamp in (6.0, 12.0, 13.0, 21.0):
+            table._apply_window_op(operator.add, 'k', 1, timestamp)
+        # window 10-20 waits for room in the queue.
+        assert table._closing_partitions == {0}
+        assert self.closed_windows(table) == [
+            ('k', WindowRange(0.0, 10.0), 1),
+            ('k', WindowRange(5.0, 15.0), 3),
+        ]
+        table._close_deferred_windows()
+        assert self.closed_windows(table) == [
+            ('k', WindowRange(10.0, 20.0), 2)]
+        assert not table._closing_partitions
+        assert not table._pending_windows[0].get(20.0)
+
+    def test_on_window_close__paned(self, *, paned_table, patching):
+        table = paned_table
+        for path in ('faust.tables.table.current_event',
+                     'faust.tables.base.current_event'):
+            patching(path).return_value.message.partition = 0
+        table._send_changelog = Mock(name='_send_changelog')
+        table._on_window_close = AsyncMock(name='on_window_close')
+        for timestamp in (6.0, 12.0, 13.0, 21.0):
+            table._apply_window_op(operator.add, 'k', 1, timestamp)
+        assert self.closed_windows(table) == [
+            ('k', WindowRange(0.0, 10.0), 1),
+            ('k', WindowRange(5.0, 15.0), 3),
+            ('k', WindowRange(10.0, 20.0), 2),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_on_window_close__callback(self, *, table):
+        table._on_window_close = AsyncMock(name='on_window_close')
+        await table.on_window_close('k', WindowRange(0.0, 10.0), 3)
+        table._on_window_close.assert_called_once_with(
+            'k', WindowRange(0.0, 10.0), 3)
+
+    @pytest.mark.asyncio
+    async def test_on_partitions_assigned__drops_pending_windows(
+            self, *, app, table):
+        table._data = Mock(name='data', on_partitions_assigned=AsyncMock())
+        topic = table.changelog_topic.get_topic_name()
+        app.assignor._assignment.actives.update({topic: [0]})
+        table._pending_windows[0][10.0] = {('k', WindowRange(0.0, 10.0))}
+        table._pending_windows[1][10.0] = {('k', WindowRange(0.0, 10.0))}
+        await table.on_partitions_assigned(set())
+        assert set(table._pending_windows) == {0}
@@ -118,6 +118,18 @@ class test_WindowSet:
         table._windowed_delta.assert_called_once_with('k', 30.3, wset.event)
         assert ret is table._windowed_delta()
 
+    def test_range(self, *, table, wset):
+        table._windowed_range = Mock(name='_windowed_range')
+        ret = wset.range(10.0, 20.0)
+        table._windowed_range.assert_called_once_with('k', 10.0, 20.0)
+        assert ret is table._windowed_range()
+
+    def test_latest(self, *, table, wset):
+        table._windowed_latest = Mock(name='_windowed_latest')
+        ret = wset.latest(3)
+        table._windowed_latest.assert_called_once_with('k', 3)
+        assert ret is table._windowed_latest()
+
     def test_getitem(self, *, wset):
         wset.table = {(wset.key, 30.3): 101.1}
         assert wset[30.3] == 101.1
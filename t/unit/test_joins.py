@@ -1,7 +1,10 @@
+from contextlib import ExitStack
 import pytest
-from faust import Event, Record, Stream
+from faust import Event, Record, Stream, joins
+from faust.exceptions import ImproperlyConfigured
 from faust.joins import InnerJoin, Join, LeftJoin, OuterJoin, RightJoin
-from mode.utils.mocks import Mock
+from faust.stores.base import SerializedStore
+from mode.utils.mocks import Mock, patch
 
 
 class User(Record):
@@ -25,3 +28,297 @@ async def test_Join(join_cls, fields):
 
     with pytest.raises(NotImplementedError):
         await j.process(Mock(name='event', autospec=Event))
+
+
+class Order(Record):
+    id: str
+    user_id: str
+
+
+class test_TableJoin:
+
+    @pytest.fixture
+    def table(self, *, app):
+        table = app.Table('users')
+        table.data['u1'] = 'Alice'
+        table.data['u2'] = 'Bob'
+        return table
+
+    @pytest.fixture
+    def topic(self, *, app):
+        return app.topic('orders', value_type=Order)
+
+    def event(self, app, value, key=None):
+        return Event(app, key, value, Mock(name='message'))
+
+    async def start(self, join, topic):
+        stream = topic.stream()
+        await join.on_stream_start(stream)
+        return stream
+
+    @pytest.mark.asyncio
+    async def test_left_join(self, *, app, table, topic):
+        j = LeftJoin(stream=table, fields=(Order.user_id,))
+        await self.start(j, topic)
+        o1, o2 = Order('o1', 'u1'), Order('o2', 'missing')
+        assert await j.process(o1) == (o1, 'Alice')
+        assert await j.process(o2) == (o2, None)
+
+    @pytest.mark.asyncio
+    async def test_inner_join__event_key(self, *, app, table, topic):
+        j = InnerJoin(stream=table, fields=())
+        stream = await self.start(j, topic)
+        stream.current_event = self.event(app, 'value', key='u2')
+        assert await j.process('value') == ('value', 'Bob')
+        stream.current_event = self.event(app, 'value', key='missing')
+        assert await j.process('value') is None
+
+    @pytest.mark.asyncio
+    async def test_prefetch(self, *, app, table, topic):
+        j = LeftJoin(stream=table, fields=(Order.user_id,))
+        await self.start(j, topic)
+        o1, o2, o3 = Order('o1', 'u1'), Order('o2', 'u2'), Order('o3', 'x')
+        table.data.get_many_async = Mock(
+            name='get_many_async', wraps=table.data.get_many_async)
+        await j.prefetch([self.event(app, o) for o in (o1, o2, o3)] + [4])
+        table.data.get_many_async.assert_called_once_with(['u1', 'u2', 'x'])
+        assert await j.process(o1) == (o1, 'Alice')
+        assert await j.process(o2) == (o2, 'Bob')
+        assert await j.process(o3) == (o3, None)
+        assert await j.process(o1) == (o1, 'Alice')
+        assert table.data.get_many_async.call_count == 1
+        # rows not prefetched are fetched one at a time.
+        assert await j.process(Order('o4', 'u2')) == (Order('o4', 'u2'), 'Bob')
+        assert table.data.get_many_async.call_count == 1
+        assert await j.process(Order('o5', 'y')) == (Order('o5', 'y'), None)
+        table.data.get_many_async.assert_called_with(['y'])
+        # the next batch replaces the prefetched rows.
+        await j.prefetch([self.event(app, o3)])
+        assert j._prefetched == {'x': joins._MISSING}
+
+    @pytest.mark.asyncio
+    async def test_prefetch__table_changed(self, *, app, table, topic):
+        j = LeftJoin(stream=table, fields=(Order.user_id,))
+        await self.start(j, topic)
+        o1, o2 = Order('o1', 'u1'), Order('o2', 'u2')
+        await j.prefetch([self.event(app, o1), self.event(app, o2)])
+        assert await j.process(o1) == (o1, 'Alice')
+        table.data['u2'] = 'Robert'
+        table.version += 1
+        assert await j.process(o2) == (o2, 'Robert')
+
+    @pytest.mark.asyncio
+    async def test_prefetch__table_changed_by_changelog(
+            self, *, app, table, topic):
+        j = LeftJoin(stream=table, fields=(Order.user_id,))
+        await self.start(j, topic)
+        o2 = Order('o2', 'u2')
+        await j.prefetch([self.event(app, o2)])
+        table.apply_changelog_batch([self.event(app, 'Robert', key='u2')])
+        assert await j.process(o2) == (o2, 'Robert')
+
+    @pytest.mark.asyncio
+    async def test_prefetch__windowed_join(self, *, app, table):
+        j = InnerJoin(stream=Mock(name='stream'),
+                      fields=(Order.id, Order.user_id), buffer=table)
+        await j.prefetch([self.event(app, Order('o1', 'u1'))])
+        assert not j._prefetched
+
+    @pytest.mark.asyncio
+    async def test_not_copartitioned(self, *, app, table):
+        topic = app.topic('orders', partitions=table.partitions or 3)
+        table.partitions = 4
+        with pytest.raises(ImproperlyConfigured):
+            await LeftJoin(stream=table, fields=()).on_stream_start(
+                topic.stream())
+
+    @pytest.mark.asyncio
+    async def test_windowed_table(self, *, table, topic):
+        table.tumbling(10)
+        with pytest.raises(ImproperlyConfigured):
+            await LeftJoin(stream=table, fields=()).on_stream_start(
+                topic.stream())
+
+    def test_stream_join_methods(self, *, table, topic):
+        stream = topic.stream()
+        left = stream.left_join(Order.user_id, table=table)
+        assert isinstance(left.join_strategy, LeftJoin)
+        assert left.join_strategy.stream is table
+        inner = stream.inner_join(table=table)
+        assert isinstance(inner.join_strategy, InnerJoin)
+        assert stream.inner_join().join_strategy.stream is stream
+
+
+class Payment(Record):
+    id: str
+    order_id: str
+
+
+class DictStore(SerializedStore):
+    # Keeps serialized keys and values, like the RocksDB store.
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.keep = {}
+
+    def _get(self, key):
+        return self.keep.get(key)
+
+    def _set(self, key, value):
+        self.keep[key] = value
+
+    def _del(self, key):
+        self.keep.pop(key, None)
+
+    def _iterkeys(self):
+        return iter(list(self.keep))
+
+    def _itervalues(self):
+        return iter(list(self.keep.values()))
+
+    def _iteritems(self):
+        return iter(list(self.keep.items()))
+
+    def _size(self):
+        return len(self.keep)
+
+    def _contains(self, key):
+        return key in self.keep
+
+    def _clear(self):
+        self.keep.clear()
+
+    def reset_state(self):
+        ...
+
+
+class test_WindowedJoin:
+
+    @pytest.fixture
+    def buffer(self, *, app):
+        return app.Table('order_payments').sliding(10, 5, expires=20).table
+
+    @pytest.fixture
+    def stream(self, *, app):
+        return app.topic('orders', 'payments').stream()
+
+    async def start(self, join, stream):
+        await join.on_stream_start(stream)
+        return join
+
+    async def send(self, app, stream, join, value, timestamp):
+        message = Mock(name='message', partition=0, timestamp=timestamp)
+        event = stream.current_event = Event(app, None, value, message)
+        with ExitStack() as stack:
+            for module in ('base', 'table'):
+                stack.enter_context(patch(
+                    f'faust.tables.{module}.current_event',
+                    return_value=event))
+            stack.enter_context(patch(
+                'faust.stores.memory.current_event', return_value=event))
+            return await join.process(value)
+
+    @pytest.mark.asyncio
+    async def test_inner_join(self, *, app, buffer, stream):
+        j = await self.start(InnerJoin(
+            stream=stream, fields=(Order.id, Payment.order_id),
+            buffer=buffer), stream)
+        o1, o2 = Order('o1', 'u1'), Order('o2', 'u1')
+        p1, p2 = Payment('p1', 'o1'), Payment('p2', 'o1')
+        assert await self.send(app, stream, j, o1, 100.0) is None
+        assert await self.send(app, stream, j, o2, 101.0) is None
+        # payments up to 5s after and 10s before the order match.
+        assert await self.send(app, stream, j, p1, 105.0) == [(o1, p1)]
+        assert await self.send(app, stream, j, p2, 105.1) is None
+        assert await self.send(app, stream, j, Payment('p3', 'o2'), 91.0) \
+            == [(o2, Payment('p3', 'o2'))]
+        # orders arriving after the payment
+        o3 = Order('o3', 'u2')
+        p4 = Payment('p4', 'o3')
+        assert await self.send(app, stream, j, p4, 200.0) is None
+        assert await self.send(app, stream, j, o3, 194.9) is None
+        assert await self.send(app, stream, j, o3, 195.0) == [(o3, p4)]
+        assert await self.send(app, stream, j, o3, 210.0) == [(o3, p4)]
+        assert await self.send(app, stream, j, o3, 210.1) is None
+
+    @pytest.mark.asyncio
+    async def test_inner_join__same_timestamp(self, *, app, buffer, stream):
+        j = await self.start(InnerJoin(
+            stream=stream, fields=(Order.id, Payment.order_id),
+            buffer=buffer), stream)
+        p1, p2 = Payment('p1', 'o1'), Payment('p2', 'o1')
+        o1 = Order('o1', 'u1')
+        assert await self.send(app, stream, j, p1, 100.0) is None
+        assert await self.send(app, stream, j, p2, 100.0) is None
+        # each value is stored (and sent to the changelog) by itself.
+        assert buffer.data[((1, 'o1', 0), (90.0, 105.0))] == p1
+        assert buffer.data[((1, 'o1', 1), (90.0, 105.0))] == p2
+        assert await self.send(app, stream, j, o1, 100.0) == [
+            (o1, p1), (o1, p2)]
+
+    @pytest.mark.asyncio
+    async def test_inner_join__reconstructs_values(self, *, app, buffer,
+                                                   stream):
+        j = await self.start(InnerJoin(
+            stream=stream, fields=(Order.id, Payment.order_id),
+            buffer=buffer), stream)
+        o1 = Order('o1', 'u1')
+        # as read from the changelog, or a serialized store
+        buffer.data[((0, 'o1', 0), (90.0, 105.0))] = o1.to_representation()
+        p1 = Payment('p1', 'o1')
+        assert await self.send(app, stream, j, p1, 100.0) == [(o1, p1)]
+
+    @pytest.mark.asyncio
+    async def test_inner_join__serialized_store(self, *, app, buffer,
+                                                stream):
+        store = buffer._data = DictStore(
+            'dict://', app, table_name=buffer.name)
+        store.windowed = True
+        j = await self.start(InnerJoin(
+            stream=stream, fields=(Order.id, Payment.order_id),
+            buffer=buffer), stream)
+        o1, p1 = Order('o1', 'u1'), Payment('p1', 'o1')
+        assert await self.send(app, stream, j, o1, 100.0) is None
+        assert store.keep
+        assert all(isinstance(value, bytes) for value in store.keep.values())
+        result = await self.send(app, stream, j, p1, 105.0)
+        assert result == [(o1, p1)]
+        assert isinstance(result[0][0], Order)
+
+    @pytest.mark.asyncio
+    async def test_buffer_not_sliding(self, *, app, stream):
+        buffer = app.Table('order_payments').tumbling(10)
+        with pytest.raises(ImproperlyConfigured):
+            await self.start(InnerJoin(
+                stream=stream, fields=(Order.id, Payment.order_id),
+                buffer=buffer.table), stream)
+
+    @pytest.mark.asyncio
+    async def test_buffer_expires_too_soon(self, *, app, stream):
+        buffer = app.Table('order_payments').sliding(10, 5, expires=5)
+        with pytest.raises(ImproperlyConfigured):
+            await self.start(InnerJoin(
+                stream=stream, fields=(Order.id, Payment.order_id),
+                buffer=buffer.table), stream)
+
+    @pytest.mark.asyncio
+    async def test_buffer_never_expires(self, *, app, stream):
+        buffer = app.Table('order_payments').sliding(10, 5, expires=None)
+        with pytest.raises(ImproperlyConfigured):
+            await self.start(InnerJoin(
+                stream=stream, fields=(Order.id, Payment.order_id),
+                buffer=buffer.table), stream)
+
+    @pytest.mark.asyncio
+    async def test_needs_two_fields(self, *, buffer, stream):
+        with pytest.raises(ImproperlyConfigured):
+            await self.start(InnerJoin(
+                stream=stream, fields=(Order.id,),
+                buffer=buffer), stream)
+
+    def test_stream_inner_join(self, *, buffer, stream):
+        joined = stream.inner_join(
+            Order.id, Payment.order_id, buffer=buffer.using_window(
+                buffer.window))
+        assert joined.join_strategy.buffer is buffer
+        assert joined.join_strategy.sides == (Order, Payment)
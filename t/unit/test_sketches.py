@@ -0,0 +1,126 @@
+import pytest
+from faust.sketches import CountMinSketch, HyperLogLog, TopK
+
+
+class test_HyperLogLog:
+
+    def test_count(self):
+        sketch = HyperLogLog()
+        assert sketch.count() == 0
+        sketch.update(['a', 'b', 'a', 1, '1'])
+        assert sketch.count() == 4
+        sketch.update(range(100000))
+        assert sketch.count() == pytest.approx(100004, rel=0.05)
+        assert len(sketch.to_bytes()) == 4097
+
+    def test_merge(self):
+        a, b = HyperLogLog(precision=10), HyperLogLog(precision=10)
+        a.update(range(0, 3000))
+        b.update(range(2000, 5000))
+        assert (a | b).count() == pytest.approx(5000, rel=0.1)
+        assert (a | b) == (b | a)
+        assert (a | b) | a == a | (b | a)
+        with pytest.raises(ValueError):
+            a | HyperLogLog(precision=11)
+        with pytest.raises(ValueError):
+            a | CountMinSketch()
+
+    def test_precision(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=3)
+
+    def test_add_operators(self):
+        a = HyperLogLog()
+        b = a + 'x'
+        assert a.count() == 0
+        assert b.count() == 1
+        b += 'y'
+        assert b.count() == 2
+
+    def test_from_data(self):
+        sketch = HyperLogLog(precision=8)
+        sketch.add('x')
+        copy = HyperLogLog.from_data(sketch.__json__())
+        assert copy == sketch
+        assert copy.precision == 8
+        assert HyperLogLog.from_data(sketch) is sketch
+        assert repr(sketch) == '<HyperLogLog(8)>'
+
+
+class test_CountMinSketch:
+
+    def test_estimate(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(1000):
+            sketch.add(i % 10)
+        sketch.add('x', 5)
+        assert sketch.total == 1005
+        assert sketch['x'] >= 5
+        assert all(sketch[i] >= 100 for i in range(10))
+        assert sketch['missing'] <= 2 * 1005 / 64
+
+    def test_merge(self):
+        a, b = CountMinSketch(), CountMinSketch()
+        a.add('x', 3)
+        b.add('x', 4)
+        merged = a | b
+        assert merged['x'] == 7
+        assert merged.total == 7
+        assert a['x'] == 3
+        with pytest.raises(ValueError):
+            a | CountMinSketch(width=10)
+
+    def test_to_bytes(self):
+        sketch = CountMinSketch(width=8, depth=2)
+        sketch.add('x', 2)
+        data = sketch.to_bytes()
+        assert len(data) == 16 + 8 * 8 * 2
+        assert CountMinSketch.from_bytes(data) == sketch
+        assert CountMinSketch.from_bytes(data)['x'] == 2
+
+    def test_dimensions(self):
+        with pytest.raises(ValueError):
+            CountMinSketch(width=0)
+
+
+class test_TopK:
+
+    def test_top(self):
+        sketch = TopK(k=2, capacity=3)
+        sketch.update(['a', 'a', 'a', 'b', 'b', 'c', 'd'])
+        # 'c' was replaced by 'd', counting it too.
+        assert sketch.top() == [('a', 3), ('b', 2)]
+        assert sketch.counts['d'] == [2, 1]
+        assert sketch.top(1) == [('a', 3)]
+        assert sketch.top(5) == sketch.top()
+
+    def test_merge(self):
+        a, b = TopK(k=1, capacity=2), TopK(k=1, capacity=2)
+        a.update(['x', 'x', 'y'])
+        b.update(['z', 'z', 'z', 'x'])
+        merged = a | b
+        # items missing from a full sketch may have been counted
+        # up to its lowest count there.
+        assert merged.counts == {'z': [4, 1], 'x': [3, 0]}
+        assert merged.top() == [('z', 4)]
+        with pytest.raises(ValueError):
+            a | TopK(k=2)
+
+    def test_capacity(self):
+        with pytest.raises(ValueError):
+            TopK(k=3, capacity=2)
+
+    def test_from_bytes(self):
+        sketch = TopK(k=2)
+        sketch.add('x', 2)
+        assert TopK.from_bytes(sketch.to_bytes()) == sketch
+        assert TopK.from_data(sketch.__json__()).top() == [('x', 2)]
+
+    def test_from_bytes__tuple_items(self):
+        sketch = TopK(k=2)
+        sketch.add(('/', ('a', 1)), 2)
+        sketch.add(('/', ('a', 1)))
+        copy = TopK.from_bytes(sketch.to_bytes())
+        assert copy.top() == [(('/', ('a', 1)), 3)]
+        copy.add(('/', ('a', 1)))
+        assert copy.top() == [(('/', ('a', 1)), 4)]
@@ -218,6 +218,7 @@ class test_Consumer:
     async def test_commit_tps(self, *, consumer):
         consumer._handle_attached = AsyncMock(name='_handle_attached')
         consumer._commit_offsets = AsyncMock(name='_commit_offsets')
+        consumer.app.tables.on_commit = AsyncMock(name='on_commit')
         consumer._filter_committable_offsets = Mock(name='filt')
         consumer._filter_committable_offsets.return_value = {
             TP1: 4,
@@ -229,6 +230,10 @@ class test_Consumer:
             TP1: 4,
             TP2: 30,
         })
+        consumer.app.tables.on_commit.assert_called_once_with({
+            TP1: 4,
+            TP2: 30,
+        })
         consumer._commit_offsets.assert_called_once_with({
             TP1: 4,
             TP2: 30,
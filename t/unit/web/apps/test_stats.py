@@ -0,0 +1,38 @@
+import pytest
+from mode.utils.mocks import Mock
+from faust.types import TP
+from faust.web.apps.stats import Site, TableRecovery
+from faust.web.base import Request, Web
+
+
+class test_TableRecovery:
+
+    @pytest.fixture
+    def web(self):
+        return Mock(name='web', autospec=Web)
+
+    @pytest.fixture
+    def view(self, *, app, web):
+        return TableRecovery(app, web)
+
+    def test_route(self):
+        assert Site.views['/tables/recovery/'] is TableRecovery
+
+    @pytest.mark.asyncio
+    async def test_get(self, *, app, web, view):
+        table = app.Table('foo')
+        app.monitor.on_table_recovery(table, 'active', {
+            TP('app-foo-changelog', 3): {'offset': 10, 'highwater': 30},
+        })
+        response = await view.get(Mock(name='request', autospec=Request))
+        assert response is web.json.return_value
+        web.json.assert_called_once_with({
+            'active': {'foo': {3: {'offset': 10, 'highwater': 30}}},
+            'standby': {},
+        }, status=200)
+
+    @pytest.mark.asyncio
+    async def test_get__nothing_recovered(self, *, web, view):
+        await view.get(Mock(name='request', autospec=Request))
+        web.json.assert_called_once_with(
+            {'active': {}, 'standby': {}}, status=200)